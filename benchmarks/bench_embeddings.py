@@ -0,0 +1,66 @@
+"""Embedding pipeline and vector search benchmark.
+
+Embeds every class and function under ``--root`` twice (the second run
+should encode nothing), then times exact and IVF search over ``--vectors``
+random unit vectors::
+
+    python -m benchmarks.bench_embeddings --root /path/to/checkout --vectors 200000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from hoh_parser.core.embeddings import EmbeddingPipeline, HashingEncoder, iter_files_with_source
+from hoh_parser.core.vector_store import VectorStore, normalize
+from hoh_parser.utils.discovery import iter_source_files
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--root", help="embed this checkout")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--vectors", type=int, default=200_000)
+    ap.add_argument("--dimension", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=100)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.root:
+            encoder = HashingEncoder(args.dimension)
+            pipeline = EmbeddingPipeline(encoder, VectorStore(encoder.dimension, directory, encoder.name))
+            paths = list(iter_source_files(args.root))
+            for run in ("first", "again"):
+                start = time.perf_counter()
+                counts = pipeline.embed_files(iter_files_with_source(paths, workers=args.workers, max_chunk_lines=200))
+                print(f"embed ({run}): {counts} in {time.perf_counter() - start:.2f} s")
+
+        rng = np.random.default_rng(0)
+        # Clustered data, as real embeddings are; uniform noise has no neighbours worth finding.
+        centres = normalize(rng.normal(size=(256, args.dimension)))
+        vectors = normalize(centres[rng.integers(0, 256, args.vectors)] + 0.3 * rng.normal(size=(args.vectors, args.dimension)) / np.sqrt(args.dimension))
+        store = VectorStore(args.dimension, directory + "/search", model="random")
+        start = time.perf_counter()
+        for i, vector in enumerate(vectors):
+            store.put(str(i), str(i), vector, {"path": ""})
+        print(f"store {args.vectors} vectors: {time.perf_counter() - start:.2f} s")
+        start = time.perf_counter()
+        store.ivf()
+        print(f"build IVF: {time.perf_counter() - start:.2f} s")
+        queries = vectors[rng.integers(0, args.vectors, args.queries)]
+        exact = []
+        for nprobe in (None, 8, 32):
+            start = time.perf_counter()
+            results = [[meta["id"] for meta, _ in store.search(q, 10, nprobe)] for q in queries]
+            elapsed = (time.perf_counter() - start) / len(queries)
+            if nprobe is None:
+                exact = results
+            recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(results, exact)])
+            print(f"search {'exact' if nprobe is None else f'ivf nprobe={nprobe}':<16} {elapsed * 1e3:7.2f} ms/query  recall@10 {recall:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,70 @@
+"""Graph engine benchmark.
+
+Builds a random relationship graph (or the resolved graph of a checkout)
+and times construction and the first and repeated queries: reverse
+reachability, import cycles and PageRank::
+
+    python -m benchmarks.bench_graph --nodes 200000 --edges 1000000
+    python -m benchmarks.bench_graph --root /path/to/checkout
+"""
+import argparse
+import sys
+import time
+from typing import Any, Callable, List
+
+import numpy as np
+
+from hoh_parser.core.graph import Edge, RelationshipGraph
+from hoh_parser.core.symbols import SymbolIndex
+
+
+def random_edges(nodes: int, edges: int, seed: int) -> List[Edge]:
+    rng = np.random.default_rng(seed)
+    # Skewed targets, like real call graphs: a few nodes are called a lot.
+    sources = rng.integers(0, nodes, edges)
+    targets = np.minimum(rng.zipf(1.3, edges) - 1, nodes - 1)
+    types = rng.choice(["calls", "calls", "calls", "imports", "inherits"], edges)
+    names = [f"pkg.mod{i // 100}.f{i}" for i in range(nodes)]
+    return [(names[s], names[t], k) for s, t, k in zip(sources.tolist(), targets.tolist(), types.tolist())]
+
+
+def timed(label: str, func: Callable[[], Any], repeat: int = 3) -> Any:
+    result = None
+    times: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    print(f"{label:<28} first {times[0] * 1e3:9.1f} ms   repeat {min(times[1:] or times) * 1e3:9.2f} ms")
+    return result
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--root", help="index this checkout instead of a random graph")
+    ap.add_argument("--nodes", type=int, default=200_000)
+    ap.add_argument("--edges", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    if args.root:
+        edges = SymbolIndex.build(args.root).graph_edges()
+    else:
+        edges = random_edges(args.nodes, args.edges, args.seed)
+    start = time.perf_counter()
+    graph = RelationshipGraph.from_edges(edges)
+    print(f"graph: {graph.stats()} built in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    if not graph.edge_count:
+        sys.exit("no edges: nothing to query")
+    # The most referenced node: the worst case for "what reaches X".
+    name = graph.names[int(np.bincount(graph.targets).argmax())]
+    reached, _ = timed("callers of a hub (reverse)", lambda: graph.reachable(name, ["calls"], reverse=True, limit=1000))
+    timed("callees, depth <= 3", lambda: graph.reachable(name, ["calls"], max_depth=3))
+    cycles = timed("import cycles (Tarjan)", lambda: graph.cycles(["imports"]))
+    top = timed("top 10 by PageRank", lambda: graph.top_ranked(None, 10))
+    print(f"{reached} callers, {len(cycles)} cycles, top node {top[0][0] if top else None}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,51 @@
+"""Start-up benchmark: wall time of fresh interpreters importing each entry point.
+
+Every command runs in a new process ``--repeat`` times; medians are
+reported next to a bare interpreter's, so the difference is what the
+import (or the parse) costs::
+
+    python -m benchmarks.bench_import --repeat 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+import hoh_parser
+
+SMALL_FILE = os.path.join(os.path.dirname(hoh_parser.__file__), "core", "workers.py")
+
+COMMANDS: List[Tuple[str, List[str]]] = [
+    ("python (bare)", ["-c", "pass"]),
+    ("import hoh_parser.cli", ["-c", "import hoh_parser.cli"]),
+    ("hoh-parse one file", ["-m", "hoh_parser.cli", SMALL_FILE]),
+    ("import core.parser", ["-c", "import hoh_parser.core.parser"]),
+    ("import main (server)", ["-c", "import main"]),
+]
+
+
+def wall_time(args: List[str]) -> float:
+    begin = time.perf_counter()
+    subprocess.run([sys.executable, *args], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - begin
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    bare = 0.0
+    print(f"{'':22} {'median':>9} {'over bare':>10}  (ms)")
+    for label, command in COMMANDS:
+        wall_time(command)  # warm the page cache and bytecode
+        median = statistics.median(wall_time(command) for _ in range(args.repeat)) * 1e3
+        bare = bare or median
+        print(f"{label:22} {median:9.1f} {median - bare:10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
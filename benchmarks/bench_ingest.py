@@ -0,0 +1,60 @@
+"""ArangoDB ingestion throughput against a local stub server.
+
+Parses a corpus (the standard library by default) and ingests it with
+``ArangoBulkWriter`` into an in-process HTTP server that accepts bulk
+imports and discards them, so the figure measures document building,
+serialization and HTTP overhead rather than the database::
+
+    python -m benchmarks.bench_ingest --batch-size 10000 --concurrency 4
+"""
+import argparse
+import json
+import sys
+import sysconfig
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from hoh_parser.ingestion.arangodb import ArangoBulkWriter, ingest_directory
+
+
+class _DiscardHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as ArangoDB serves it
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        data = json.dumps({"error": False, "created": body.count(b"\n") + 1, "errors": 0}).encode()
+        self.send_response(201)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("root", nargs="?", default=sysconfig.get_paths()["stdlib"])
+    ap.add_argument("--batch-size", type=int, default=10000)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--workers", type=int, default=None, help="parse processes")
+    args = ap.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DiscardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        start = time.perf_counter()
+        with ArangoBulkWriter(url=url, batch_size=args.batch_size, concurrency=args.concurrency) as writer:
+            stats = ingest_directory(args.root, writer, workers=args.workers)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    print(f"{stats['documents']} documents in {stats['requests']} requests, {elapsed:.2f}s "
+          f"({stats['documents'] / elapsed:,.0f} docs/s, parsing included)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
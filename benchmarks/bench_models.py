@@ -0,0 +1,86 @@
+"""Memory and throughput of the compact representation versus pydantic models.
+
+Extracts a corpus once per representation and reports wall time and the
+memory retained by the results (tracemalloc):
+
+- compact:   CompactFile (slotted records, columnar EdgeTable)
+- mcpfile:   MCPFile validated from the compact form in one call
+- per-model: MCPFile built from individually constructed models, as
+             extraction did before the compact representation
+
+    python -m benchmarks.bench_models --limit 500
+"""
+import argparse
+import ast
+import gc
+import sys
+import sysconfig
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from benchmarks.bench_parser import load_corpus
+from hoh_parser.core.extract import CompactFile, extract_compact
+from hoh_parser.core.models import MCPClass, MCPFile, MCPFunction, MCPRelationship
+
+
+def per_model(tree: ast.Module, path: str) -> MCPFile:
+    compact = extract_compact(tree, path)
+    return MCPFile(
+        path=path,
+        classes=[
+            MCPClass(
+                name=c.name, lineno=c.lineno, col_offset=c.col_offset, end_lineno=c.end_lineno,
+                bases=c.bases, docstring=c.docstring,
+                methods=[MCPFunction(**m.to_dict()) for m in c.methods]
+            )
+            for c in compact.classes
+        ],
+        functions=[MCPFunction(**f.to_dict()) for f in compact.functions],
+        relationships=[
+            MCPRelationship(source=s, target=t, type=ty, location=path)  # type: ignore[arg-type]
+            for s, t, ty in compact.edges
+        ],
+        docstring=compact.docstring
+    )
+
+
+def mcpfile(tree: ast.Module, path: str) -> MCPFile:
+    return MCPFile.model_validate(extract_compact(tree, path).to_dict())
+
+
+def compact(tree: ast.Module, path: str) -> CompactFile:
+    return extract_compact(tree, path)
+
+
+def measure(build: Callable[[ast.Module, str], Any], corpus: List[Tuple[str, ast.Module]]) -> Tuple[float, int]:
+    gc.collect()
+    start = time.perf_counter()
+    results = [build(tree, path) for path, tree in corpus]
+    elapsed = time.perf_counter() - start
+    del results
+    gc.collect()
+    tracemalloc.start()
+    results = [build(tree, path) for path, tree in corpus]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return elapsed, retained
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("root", nargs="?", default=sysconfig.get_paths()["stdlib"])
+    ap.add_argument("--limit", type=int, default=500, help="maximum number of files")
+    args = ap.parse_args(argv)
+
+    corpus = load_corpus(args.root, args.limit)
+    edges = sum(len(extract_compact(tree, path).edges) for path, tree in corpus)
+    print(f"corpus: {len(corpus)} files, {edges} relationships")
+    for name, build in (("compact", compact), ("mcpfile", mcpfile), ("per-model", per_model)):
+        elapsed, retained = measure(build, corpus)
+        print(f"{name:<10} {elapsed:7.3f}s  {len(corpus) / elapsed:8.1f} files/s  {retained / 2**20:8.1f} MiB retained")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
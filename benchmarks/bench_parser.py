@@ -0,0 +1,93 @@
+"""Extraction throughput benchmark.
+
+Times symbol and relationship extraction over a corpus of Python files (the
+standard library by default). ``--against <git-ref>`` loads
+``hoh_parser/core/parser.py`` from that revision and times it on the same
+pre-parsed trees, so the speedup of a change can be read off directly::
+
+    python -m benchmarks.bench_parser --against HEAD~1
+"""
+import argparse
+import ast
+import subprocess
+import sys
+import sysconfig
+import time
+import types
+from typing import Callable, List, Tuple
+
+from hoh_parser.core import parser as current_parser
+from hoh_parser.utils.file_ops import list_py_files
+
+Corpus = List[Tuple[str, ast.Module]]
+
+
+def load_corpus(root: str, limit: int) -> Corpus:
+    corpus: Corpus = []
+    for path in sorted(list_py_files(root)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                corpus.append((path, ast.parse(f.read(), filename=path)))
+        except (SyntaxError, UnicodeDecodeError, ValueError):
+            continue
+        if len(corpus) >= limit:
+            break
+    return corpus
+
+
+def load_parser_at(ref: str) -> types.ModuleType:
+    """Import hoh_parser/core/parser.py as it was at a git revision."""
+    source = subprocess.run(
+        ["git", "show", f"{ref}:hoh_parser/core/parser.py"],
+        check=True, capture_output=True, text=True
+    ).stdout
+    module = types.ModuleType(f"hoh_parser.core._parser_{ref}")
+    module.__package__ = "hoh_parser.core"
+    exec(compile(source, f"{ref}:parser.py", "exec"), module.__dict__)
+    return module
+
+
+def extractor_for(module: types.ModuleType) -> Callable[[str, ast.Module], int]:
+    visitor_cls = getattr(module, "ExtractionVisitor", None)
+    if visitor_cls is not None:
+        def extract(path: str, tree: ast.Module) -> int:
+            visitor = visitor_cls(path)
+            visitor.visit(tree)
+            return len(visitor.finish())
+    else:
+        def extract(path: str, tree: ast.Module) -> int:
+            module.extract_functions_and_classes(tree, parent=None)
+            return len(module.extract_relationships(tree, filename=path))
+    return extract
+
+
+def run(extract: Callable[[str, ast.Module], int], corpus: Corpus, repeat: int) -> Tuple[float, int]:
+    best = float("inf")
+    edges = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        edges = sum(extract(path, tree) for path, tree in corpus)
+        best = min(best, time.perf_counter() - start)
+    return best, edges
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("root", nargs="?", default=sysconfig.get_paths()["stdlib"])
+    ap.add_argument("--limit", type=int, default=1000, help="maximum number of files")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--against", help="git revision to compare with")
+    args = ap.parse_args(argv)
+
+    corpus = load_corpus(args.root, args.limit)
+    print(f"corpus: {len(corpus)} files from {args.root}")
+    current, edges = run(extractor_for(current_parser), corpus, args.repeat)
+    print(f"current:   {current:8.3f}s  {len(corpus) / current:8.1f} files/s  {edges} relationships")
+    if args.against:
+        reference, ref_edges = run(extractor_for(load_parser_at(args.against)), corpus, args.repeat)
+        print(f"{args.against:<10} {reference:8.3f}s  {len(corpus) / reference:8.1f} files/s  {ref_edges} relationships")
+        print(f"speedup:   {reference / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+"""Start-up benchmark: time to the first directory parse of a fresh server process.
+
+Each run is a new interpreter that imports the server (``main``) and then
+parses a directory twice, either
+
+- per-call (fork):  a process pool started by the call, forked from the server
+- per-call (spawn): the same with fresh interpreters, which re-import the parser
+- warm pool:        ``WorkerPool`` started as at server start-up, then used
+
+and reports medians over ``--repeat`` runs::
+
+    python -m benchmarks.bench_startup /path/to/checkout --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.corpus import generate_corpus
+
+MODES = ("per-call (fork)", "per-call (spawn)", "warm pool")
+
+
+def run_once(mode: str, root: str, workers: int) -> Dict[str, float]:
+    """One fresh process's timings; runs in the child."""
+    begin = time.perf_counter()
+    import main  # noqa: F401  # the server's imports, as uvicorn pays them
+    from hoh_parser.core.directory import parse_directory
+    from hoh_parser.core.workers import WorkerPool
+    timings = {"import": time.perf_counter() - begin, "start": 0.0}
+    pool = None
+    if mode == "warm pool":
+        pool = WorkerPool(processes=workers)
+        timings["start"] = pool.start()
+    elif mode == "per-call (spawn)":
+        multiprocessing.set_start_method("spawn")
+    for label in ("first", "second"):
+        begin = time.perf_counter()
+        parse_directory(root, workers=workers, pool=pool)
+        timings[label] = time.perf_counter() - begin
+    if pool is not None:
+        pool.shutdown(wait=True)
+    return timings
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("root", nargs="?", help="directory to parse (default: a synthetic corpus)")
+    ap.add_argument("--files", type=int, default=200, help="synthetic corpus size")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_once(args.child, args.root, args.workers)))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        root = args.root
+        if root is None:
+            root = directory
+            generate_corpus(root, args.files, "mixed")
+        print(f"{root}, {args.workers} workers, median of {args.repeat} fresh processes (ms)")
+        print(f"{'':18} {'import':>8} {'start':>8} {'1st parse':>10} {'2nd parse':>10} {'start+1st':>10}")
+        for mode in MODES:
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_startup", root, "--workers", str(args.workers), "--child", mode],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                runs.append(json.loads(out.splitlines()[-1]))
+            median = {key: statistics.median(run[key] for run in runs) * 1e3 for key in runs[0]}
+            # Time to first parse once the server is importable: start-up work plus the parse.
+            print(
+                f"{mode:18} {median['import']:8.1f} {median['start']:8.1f} {median['first']:10.1f} "
+                f"{median['second']:10.1f} {median['start'] + median['first']:10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+"""Point lookup benchmark: one symbol of a very large module.
+
+Compares a full symbol table of the file with ``get_symbol``'s first touch
+(parse and keep the tree) and later lookups of other symbols in it::
+
+    python -m benchmarks.bench_symbol --lines 20000
+"""
+import argparse
+import ast
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.corpus import huge_module
+from hoh_parser.core.outline import OutlineCache
+from hoh_parser.core.parser import parse_python_file
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--lines", type=int, default=20_000)
+    ap.add_argument("--lookups", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(0)
+    source = ""
+    while source.count("\n") < args.lines:
+        source += huge_module(rng, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "huge.py")
+        with open(path, "w") as f:
+            f.write(source)
+        tree = ast.parse(source)
+        classes = [f"{c.name}.{m.name}" for c in tree.body if isinstance(c, ast.ClassDef) for m in c.body if isinstance(m, ast.FunctionDef)]
+        print(f"{source.count(chr(10))} lines, {len(classes)} methods")
+
+        start = time.perf_counter()
+        parse_python_file(path, max_bytes=None)
+        print(f"full symbol table      {(time.perf_counter() - start) * 1e3:8.2f} ms")
+        cache = OutlineCache(max_file_bytes=None)
+        start = time.perf_counter()
+        cache.get_symbol(path, classes[len(classes) // 2])
+        print(f"get_symbol, first      {(time.perf_counter() - start) * 1e3:8.2f} ms")
+        names = rng.sample(classes, min(args.lookups, len(classes)))
+        start = time.perf_counter()
+        for name in names:
+            cache.get_symbol(path, name)
+        print(f"get_symbol, new symbol {(time.perf_counter() - start) / len(names) * 1e3:8.3f} ms")
+        start = time.perf_counter()
+        for name in names:
+            cache.get_symbol(path, name)
+        print(f"get_symbol, repeated   {(time.perf_counter() - start) / len(names) * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,124 @@
+"""Synthetic corpus generator for the parser benchmarks.
+
+Writes a reproducible tree of Python modules shaped to stress one part of
+extraction at a time:
+
+- mixed:     ordinary modules, a few classes and functions each
+- nested:    deeply nested classes and inner functions
+- huge:      few, very large modules (thousands of definitions)
+- call-heavy: functions made almost entirely of calls and attribute calls
+
+    python -m benchmarks.corpus /tmp/corpus --shape nested --files 200
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Callable, Dict, List
+
+SHAPES = ("mixed", "nested", "huge", "call-heavy")
+
+
+def _function(rng: random.Random, name: str, indent: str, calls: int) -> List[str]:
+    lines = [f"{indent}def {name}(self, x, y=None):", f'{indent}    """Docstring for {name}."""']
+    for i in range(calls):
+        target = rng.choice(("helper", "os.path.join", "self.method_a", "len", "obj.attr.call"))
+        lines.append(f"{indent}    v{i} = {target}(x, {i})")
+    lines.append(f"{indent}    return x")
+    return lines
+
+
+def _class(rng: random.Random, name: str, indent: str, methods: int, calls: int) -> List[str]:
+    lines = [f"{indent}class {name}(Base{rng.randrange(3)}):", f'{indent}    """Docstring for {name}."""']
+    for i in range(methods):
+        if i == 0:
+            lines.append(f"{indent}    @property")
+        lines.extend(_function(rng, f"method_{chr(97 + i % 26)}{i}", indent + "    ", calls))
+        lines.append(f"{indent}    def __init__(self):")
+        lines.append(f"{indent}        self.part = Part{i}()")
+    return lines
+
+
+def _header(index: int) -> List[str]:
+    return [
+        f'"""Synthetic module {index}."""',
+        "import os",
+        "from collections import OrderedDict",
+        f"from pkg.mod{index % 7} import helper",
+        "",
+    ]
+
+
+def mixed_module(rng: random.Random, index: int) -> str:
+    lines = _header(index)
+    for c in range(rng.randint(1, 4)):
+        lines.extend(_class(rng, f"Class{c}", "", rng.randint(2, 6), rng.randint(1, 5)))
+    for f in range(rng.randint(2, 8)):
+        lines.extend(_function(rng, f"func_{f}", "", rng.randint(1, 6)))
+    return "\n".join(lines) + "\n"
+
+
+def nested_module(rng: random.Random, index: int) -> str:
+    lines = _header(index)
+    depth = rng.randint(8, 20)
+    for level in range(depth):
+        lines.extend(_class(rng, f"Level{level}", "    " * level, 2, 2)[:-2])
+    for level in range(depth):
+        indent = "    " * level
+        lines.append(f"{indent}def outer_{level}():")
+    lines.append("    " * depth + "return 1")
+    return "\n".join(lines) + "\n"
+
+
+def huge_module(rng: random.Random, index: int) -> str:
+    lines = _header(index)
+    for c in range(300):
+        lines.extend(_class(rng, f"Class{c}", "", 5, 3))
+    for f in range(1500):
+        lines.extend(_function(rng, f"func_{f}", "", 4))
+    return "\n".join(lines) + "\n"
+
+
+def call_heavy_module(rng: random.Random, index: int) -> str:
+    lines = _header(index)
+    for f in range(40):
+        lines.extend(_function(rng, f"func_{f}", "", 60))
+    return "\n".join(lines) + "\n"
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int], str]] = {
+    "mixed": mixed_module,
+    "nested": nested_module,
+    "huge": huge_module,
+    "call-heavy": call_heavy_module,
+}
+
+
+def generate_corpus(out_dir: str, files: int = 100, shape: str = "mixed", seed: int = 0) -> List[str]:
+    """Write ``files`` modules of the given shape under ``out_dir``; same seed, same bytes."""
+    generate = GENERATORS[shape]
+    rng = random.Random(seed)
+    paths: List[str] = []
+    for index in range(files):
+        package = os.path.join(out_dir, f"pkg{index // 50}")
+        os.makedirs(package, exist_ok=True)
+        path = os.path.join(package, f"mod{index}.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate(rng, index))
+        paths.append(path)
+    return paths
+
+
+def main(argv: List[str]) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("out_dir")
+    ap.add_argument("--shape", choices=SHAPES, default="mixed")
+    ap.add_argument("--files", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    paths = generate_corpus(args.out_dir, args.files, args.shape, args.seed)
+    print(f"wrote {len(paths)} {args.shape} modules to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
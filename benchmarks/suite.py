@@ -0,0 +1,160 @@
+"""Per-stage parser benchmark with baseline comparison.
+
+Times every file of a corpus through each stage of a parse:
+
+- parse:         ``ast.parse`` of the file's bytes
+- symbols:       ``extract_functions_and_classes``
+- relationships: ``extract_relationships``
+- serialize:     ``MCPFile`` validated from the compact extraction and dumped to JSON
+
+and reports files/s, AST nodes/s and p50/p99 per-file latency per stage,
+plus the peak RSS of the run. The corpus is a local checkout or a
+synthetic one (see ``benchmarks.corpus``). Results can be saved as a
+baseline and later runs compared against it; the exit status is 1 when a
+stage's throughput dropped by more than ``--max-regression``::
+
+    python -m benchmarks.suite --synthetic call-heavy --files 200 --save-baseline base.json
+    python -m benchmarks.suite --synthetic call-heavy --files 200 --baseline base.json
+    python -m benchmarks.suite /path/to/checkout --limit 2000
+"""
+import argparse
+import ast
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.corpus import SHAPES, generate_corpus
+from hoh_parser.core.extract import extract_compact
+from hoh_parser.core.models import MCPFile
+from hoh_parser.core.parser import extract_functions_and_classes, extract_relationships
+from hoh_parser.utils.file_ops import list_py_files
+
+# (path, source, tree, number of AST nodes)
+Item = Tuple[str, bytes, ast.Module, int]
+
+STAGES: Dict[str, Callable[[Item], Any]] = {
+    "parse": lambda item: ast.parse(item[1], filename=item[0]),
+    "symbols": lambda item: extract_functions_and_classes(item[2]),
+    "relationships": lambda item: extract_relationships(item[2], item[0]),
+    "serialize": lambda item: MCPFile.model_validate(extract_compact(item[2], item[0]).to_dict()).model_dump_json(),
+}
+
+
+def load_items(root: str, limit: int) -> List[Item]:
+    items: List[Item] = []
+    for path in sorted(list_py_files(root)):
+        with open(path, "rb") as f:
+            source = f.read()
+        try:
+            tree = ast.parse(source, filename=path)
+        except (SyntaxError, ValueError):
+            continue
+        items.append((path, source, tree, sum(1 for _ in ast.walk(tree))))
+        if len(items) >= limit:
+            break
+    return items
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_stage(stage: Callable[[Item], Any], items: List[Item], repeat: int) -> Dict[str, float]:
+    nodes = sum(item[3] for item in items)
+    best = float("inf")
+    latencies: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            t0 = time.perf_counter()
+            stage(item)
+            latencies.append(time.perf_counter() - t0)
+        best = min(best, time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "seconds": best,
+        "files_per_s": len(items) / best,
+        "nodes_per_s": nodes / best,
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "mean_ms": statistics.fmean(latencies) * 1e3,
+    }
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print stage-by-stage changes; return the stages that regressed."""
+    regressed: List[str] = []
+    for name, stage in result["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        change = stage["files_per_s"] / base["files_per_s"] - 1
+        flag = ""
+        if change < -max_regression:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<14} {change:+7.1%} files/s   p99 {base['p99_ms']:8.3f} -> {stage['p99_ms']:8.3f} ms{flag}")
+    print(f"{'peak RSS':<14} {baseline['peak_rss_mib']:.1f} -> {result['peak_rss_mib']:.1f} MiB")
+    return regressed
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("root", nargs="?", help="checkout to benchmark (default: a synthetic corpus)")
+    ap.add_argument("--synthetic", choices=SHAPES, default="mixed", help="corpus shape when no root is given")
+    ap.add_argument("--files", type=int, default=200, help="synthetic corpus size")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--limit", type=int, default=1000, help="maximum number of files from root")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    ap.add_argument("--save-baseline", metavar="JSON")
+    ap.add_argument("--baseline", metavar="JSON", help="compare against a saved result")
+    ap.add_argument("--max-regression", type=float, default=0.10, help="tolerated throughput drop (fraction)")
+    args = ap.parse_args(argv)
+
+    if args.root:
+        corpus = {"root": args.root, "limit": args.limit}
+        items = load_items(args.root, args.limit)
+    else:
+        corpus = {"synthetic": args.synthetic, "files": args.files, "seed": args.seed}
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_corpus(tmp, args.files, args.synthetic, args.seed)
+            items = load_items(tmp, args.files)
+    nodes = sum(item[3] for item in items)
+    size = sum(len(item[1]) for item in items)
+    print(f"corpus: {len(items)} files, {size / 2**20:.1f} MiB, {nodes} AST nodes ({corpus})")
+
+    result: Dict[str, Any] = {"corpus": corpus, "files": len(items), "nodes": nodes, "stages": {}}
+    print(f"{'stage':<14} {'files/s':>10} {'nodes/s':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for name in args.stages:
+        stage = result["stages"][name] = run_stage(STAGES[name], items, args.repeat)
+        print(f"{name:<14} {stage['files_per_s']:10.1f} {stage['nodes_per_s']:12.0f} "
+              f"{stage['p50_ms']:9.3f} {stage['p99_ms']:9.3f}")
+    result["peak_rss_mib"] = peak_rss_mib()
+    print(f"peak RSS: {result['peak_rss_mib']:.1f} MiB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != corpus:
+            print(f"warning: baseline corpus {baseline.get('corpus')} differs from {corpus}")
+        if compare(result, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
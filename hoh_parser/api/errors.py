@@ -0,0 +1,28 @@
+# JSON-RPC errors for requests the client can correct. Core modules raise
+# plain exceptions; the methods translate them here so clients get a
+# specific code and the detail instead of -32603 "Internal error".
+from fastapi_jsonrpc import BaseError
+
+
+class InvalidSelectionError(BaseError):
+    """The selection names a symbol or relationship type the file does not have."""
+    CODE = -32602
+    MESSAGE = "Invalid selection"
+
+
+class UnknownSymbolError(BaseError):
+    """The file has no class or function with the requested qualified name."""
+    CODE = -32602
+    MESSAGE = "No such symbol"
+
+
+class InvalidLineRangeError(BaseError):
+    """The edited line range given to reparse_file is not within the file."""
+    CODE = -32602
+    MESSAGE = "Invalid line range"
+
+
+class StaleStateError(BaseError):
+    """A diff cannot be applied to the server's copy of the file; call reparse_file without ``diff``."""
+    CODE = -32002
+    MESSAGE = "Stale reparse state; send the whole file"
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi_jsonrpc import BaseError
+
+from hoh_parser.utils.metrics import SamplingProfiler
+
+T = TypeVar("T")
+
+
+class ServerBusyError(BaseError):
+    """Too many parse requests are running or queued; retry later."""
+    CODE = -32001
+    MESSAGE = "Server busy"
+
+
+class BoundedExecutor:
+    """Runs blocking parse work off the event loop, refusing work when saturated.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a worker; any call beyond that fails immediately with
+    ``ServerBusyError`` instead of queueing without bound, so the event loop
+    (and cheap methods such as ``health_check``) stays responsive under load.
+    ``run`` must be awaited from the event loop thread. A call holds its slot
+    until its thread finishes, even if the awaiting request is cancelled
+    (e.g. the client disconnected) first. With a ``profiler`` every call is
+    offered to it for sampling.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, profiler: Optional[SamplingProfiler] = None) -> None:
+        self.max_workers = max_workers
+        self.profiler = profiler
+        self.limit = max_workers + max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()  # in_flight is released from worker threads
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hoh-parse")
+
+    def _admit(self, count: int = 1) -> None:
+        with self._lock:
+            if self.in_flight + count > self.limit:
+                self.rejected += 1
+                raise ServerBusyError({"in_flight": self.in_flight, "limit": self.limit})
+            self.in_flight += count
+
+    def _release(self, _: object = None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _submit(self, func: Callable[..., T], args: Tuple[Any, ...]) -> "Future[T]":
+        """Submit a call whose slot is already taken."""
+        call = partial(func, *args)
+        if self.profiler is not None:
+            call = partial(self.profiler.call, getattr(func, "__name__", "call"), func, *args)
+        try:
+            future = self._pool.submit(call)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the thread is done, not when the awaiting coroutine
+        # is: a cancelled caller does not stop a call that is already running.
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        self._admit()
+        return await asyncio.wrap_future(self._submit(func, args))
+
+    async def run_all(self, func: Callable[..., T], calls: Sequence[Tuple[Any, ...]]) -> List[T]:
+        """``func(*args)`` for each of ``calls``, admitted together.
+
+        Either every call gets a slot or ``ServerBusyError`` is raised before
+        any starts. When one call fails, or the caller is cancelled, the calls
+        that have not started yet are cancelled.
+        """
+        self._admit(len(calls))
+        futures: "List[Future[T]]" = []
+        try:
+            for i, args in enumerate(calls):
+                try:
+                    futures.append(self._submit(func, args))
+                except BaseException:
+                    for _ in calls[i + 1:]:
+                        self._release()
+                    raise
+            return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in futures)))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def stream(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Produce the items of ``iterator`` on the worker threads.
+
+        Admission is decided now, so ``ServerBusyError`` is raised before a
+        response starts; the stream then holds one slot until it is exhausted
+        or closed, and a closed stream closes ``iterator`` too.
+        """
+        self._admit()
+        return self._drain(iterator)
+
+    async def _drain(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        done = object()
+        future: "Optional[Future[Any]]" = None
+
+        def finish(_: object = None) -> None:
+            try:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+            finally:
+                self._release()
+
+        try:
+            while True:
+                future = self._pool.submit(next, iterator, done)
+                item = await asyncio.wrap_future(future)
+                if item is done:
+                    return
+                yield item
+        finally:
+            # Closing may wait for worker processes, so it happens on the thread.
+            if future is not None and not future.done():
+                future.add_done_callback(finish)
+            else:
+                try:
+                    self._pool.submit(finish)
+                except RuntimeError:  # shut down
+                    finish()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,27 +1,102 @@
 from fastapi_jsonrpc import Entrypoint
-from hoh_parser.core.parser import parse_python_file
-from hoh_parser.core.models import MCPFile
-from pydantic import BaseModel
-import tempfile
+from hoh_parser.api.errors import InvalidLineRangeError, InvalidSelectionError, StaleStateError, UnknownSymbolError
+from hoh_parser.api.executor import BoundedExecutor
+from hoh_parser.api.responses import FastJSONResponse
+from hoh_parser.config import settings
+from hoh_parser.core.cache import ParseCache
+from hoh_parser.core.directory import parse_directory as parse_python_directory
+from hoh_parser.core.embeddings import EmbeddingPipeline, iter_files_with_source, load_encoder
+from hoh_parser.core.extract import PARSE_ERRORS, Selection, SelectionError
+from hoh_parser.core.graph import RelationshipGraph
+from hoh_parser.core.incremental import DiffError, IncrementalCache, IncrementalFile, LineRangeError
+from hoh_parser.core.models import (
+    MCPCallSite, MCPDefinition, MCPDirectory, MCPFile, MCPGraphNode, MCPParseResult, MCPRankedNode,
+    MCPReachability, MCPSelection, MCPSimilarSymbol, MCPSymbol, RelationshipType
+)
+from hoh_parser.core.outline import OutlineCache, SymbolNotFoundError
+from hoh_parser.core.symbols import SymbolIndex, collect_module_facts
+from hoh_parser.core.vector_store import VectorStore
+from hoh_parser.core.wire import WireFile, WireFormat, to_wire
+from hoh_parser.core.workers import WorkerPool
+from hoh_parser.utils.discovery import iter_source_files
+from hoh_parser.utils.file_ops import open_source
+from hoh_parser.utils.metrics import REQUEST_SECONDS, SamplingProfiler, timed
+from pydantic import BaseModel, PositiveInt
+import asyncio
+import functools
+import os
+import threading
 import base64
+import binascii
 
-from typing import Any, cast
+from typing import Any, Iterable, Iterator, List, Literal
 
 _method_registry = []
 
 from typing import Callable, TypeVar, Optional
 
+parse_cache = ParseCache(
+    max_entries=settings.cache_max_entries,
+    cache_dir=settings.cache_dir,
+    max_file_bytes=settings.max_file_bytes
+)
+# Text and per-statement results of recently edited files, for reparse_file.
+incremental_cache = IncrementalCache(max_entries=settings.incremental_cache_entries)
+# Parsed trees of recently used files, for get_symbol.
+outline_cache = OutlineCache(max_entries=settings.outline_cache_entries, max_file_bytes=settings.max_file_bytes)
+profiler = SamplingProfiler(every=settings.profile_every, directory=settings.profile_dir)
+# CPU-bound work runs here so the event loop keeps serving other requests.
+parse_executor = BoundedExecutor(
+    max_workers=settings.parse_concurrency,
+    max_queue=settings.parse_queue_size,
+    profiler=profiler
+)
+# Directory-wide parsing runs here once the server has started it (see main.py);
+# until then each call starts a pool of its own.
+worker_pool = WorkerPool(
+    processes=settings.worker_processes or None,
+    max_tasks=settings.worker_max_tasks,
+    max_rss_bytes=settings.worker_max_rss_mb * 1024 * 1024 or None
+)
+
+def started_worker_pool() -> Optional[WorkerPool]:
+    """The shared worker pool once the server has started it, else None."""
+    return worker_pool if worker_pool.started else None
+
 F = TypeVar("F", bound=Callable)
 def register_jsonrpc_method(name: Optional[str] = None) -> Callable[[F], F]:
+    """Register ``func`` as a JSON-RPC method, timed under ``hoh_request_seconds``."""
     def decorator(func: F) -> F:
-        _method_registry.append((name or func.__name__, func))
+        method = name or func.__name__
+        wrapper: Callable
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with REQUEST_SECONDS.time(method):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with REQUEST_SECONDS.time(method):
+                    return func(*args, **kwargs)
+        _method_registry.append((method, wrapper))
         return func
     return decorator
 
 @register_jsonrpc_method()
-def health_check() -> dict[str, Any]:
+async def health_check() -> dict[str, Any]:
     """MCP-compliant health check method."""
-    return {"status": "ok", "server_time": __import__('datetime').datetime.utcnow().isoformat() + 'Z'}
+    return {
+        "status": "ok",
+        "server_time": __import__('datetime').datetime.utcnow().isoformat() + 'Z',
+        "cache": parse_cache.stats(),
+        "outline_cache": outline_cache.stats(),
+        "incremental_cache": incremental_cache.stats(),
+        "executor": parse_executor.stats(),
+        "workers": worker_pool.stats(),
+        "profiler": profiler.stats(),
+        "embeddings": embedding_pipeline.stats() if embedding_pipeline is not None else None
+    }
 
 @register_jsonrpc_method()
 def get_capabilities() -> dict[str, Any]:
@@ -32,9 +107,22 @@ def get_capabilities() -> dict[str, Any]:
         "version": "0.1.0",
         "capabilities": [
             "parse_file",
+            "parse_files",
             "symbol_table",
+            "get_symbol",
+            "reparse_file",
+            "parse_directory",
+            "index_directory",
+            "find_definition",
+            "find_callers",
+            "graph_reachable",
+            "graph_cycles",
+            "graph_centrality",
+            "embed_directory",
+            "search_similar",
             "health_check",
-            "get_capabilities"
+            "get_capabilities",
+            "configure_profiling"
         ],
         "resource_types": [
             "python",
@@ -48,27 +136,386 @@ def get_capabilities() -> dict[str, Any]:
         ]
     }
 
+def to_selection(selection: Optional[MCPSelection]) -> Optional[Selection]:
+    """The extractor's form of a request's ``selection``."""
+    if selection is None:
+        return None
+    types = selection.relationship_types
+    converted = Selection(
+        relationships=frozenset() if selection.symbols_only else None if types is None else frozenset(types),
+        start_line=selection.start_line,
+        end_line=selection.end_line,
+        symbol=selection.symbol
+    )
+    # Selecting everything shares the cache entry of a plain parse.
+    return None if converted == Selection() else converted
+
+def _parse_b64(filename: str, content_b64: str, selection: Optional[Selection] = None) -> MCPFile:
+    with timed("decode"):
+        content = base64.b64decode(content_b64)
+    return parse_cache.parse_source(content, filename, selection)
+
+class ParseFileItem(BaseModel):
+    filename: str
+    content_b64: str
+    selection: Optional[MCPSelection] = None
+
+def _parse_items(items: List[ParseFileItem]) -> List[MCPParseResult]:
+    results: List[MCPParseResult] = []
+    for item in items:
+        try:
+            results.append(MCPParseResult(path=item.filename, file=_parse_b64(item.filename, item.content_b64, to_selection(item.selection))))
+        except (binascii.Error, *PARSE_ERRORS) as exc:
+            results.append(MCPParseResult(path=item.filename, error=f"{type(exc).__name__}: {exc}"))
+    return results
+
+def _symbol_table(filepath: str, format: WireFormat, selection: Optional[Selection]) -> WireFile:
+    result = parse_cache.parse_file(filepath, selection)
+    with timed("wire"):
+        return to_wire(result, format)
+
+@register_jsonrpc_method()
+async def parse_file(filename: str, content_b64: str, selection: Optional[MCPSelection] = None) -> MCPFile:
+    """Parse base64 source; ``selection`` limits extraction to what the caller needs."""
+    try:
+        return await parse_executor.run(_parse_b64, filename, content_b64, to_selection(selection))
+    except SelectionError as exc:
+        raise InvalidSelectionError({"message": str(exc)}) from exc
+
+@register_jsonrpc_method()
+async def parse_files(items: List[ParseFileItem]) -> List[MCPParseResult]:
+    """Parse many files in one call; a file that fails only fails its own result."""
+    # One executor task per slice keeps a large batch from flooding the queue;
+    # the slices are admitted together, so a busy server refuses the whole
+    # batch up front rather than after parsing part of it.
+    size = max(1, -(-len(items) // parse_executor.max_workers))
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    parsed = await parse_executor.run_all(_parse_items, [(chunk,) for chunk in chunks])
+    return [result for chunk_results in parsed for result in chunk_results]
+
 @register_jsonrpc_method()
-def parse_file(filename: str, content_b64: str) -> MCPFile:
-    # Decode and write the file to a temp file
-    content = base64.b64decode(content_b64)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".py") as tmp:
-        tmp.write(content)
-        tmp_path = tmp.name
-    result = parse_python_file(tmp_path)
-    return result
+async def symbol_table(
+    filepath: str,
+    format: WireFormat = "full",
+    selection: Optional[MCPSelection] = None
+) -> WireFile:
+    """Symbol table of a file; ``format="compact"`` sends relationships as string-table indexes."""
+    # The models are returned as they are and serialized once, by pydantic,
+    # instead of being dumped to dicts and re-encoded.
+    try:
+        return await parse_executor.run(_symbol_table, filepath, format, to_selection(selection))
+    except SelectionError as exc:
+        raise InvalidSelectionError({"message": str(exc)}) from exc
 
 @register_jsonrpc_method()
-def symbol_table(filepath: str) -> dict[str, Any]:
-    result = parse_python_file(filepath)
-    return cast(dict[str, Any], result.model_dump())
+async def get_symbol(filepath: str, qualified_name: str, include_source: bool = False) -> MCPSymbol:
+    """One class or function (``"Class.method"``) of a file, extracted on its own.
+
+    The file's tree is parsed once and kept, so later lookups in it do not
+    depend on the file's size.
+    """
+    try:
+        return await parse_executor.run(outline_cache.get_symbol, filepath, qualified_name, include_source)
+    except SymbolNotFoundError as exc:
+        raise UnknownSymbolError({"qualified_name": exc.qualified_name, "path": exc.path}) from exc
+
+def _reparse_file(
+    filepath: str,
+    diff: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None
+) -> MCPFile:
+    state = incremental_cache.get(filepath)
+    if diff is not None:
+        if state is None:
+            raise DiffError(f"no earlier parse of {filepath} to apply the diff to")
+        state = state.apply_diff(diff)
+    else:
+        with open_source(filepath, settings.max_file_bytes) as source:
+            content = bytes(source.data)
+            text = content.decode(source.encoding)
+        state = IncrementalFile.parse(filepath, text) if state is None else state.update(text, start_line, end_line)
+        # Later parse_file / symbol_table calls for this content are cache hits.
+        parse_cache.put(ParseCache.key_for(filepath, content), state.result)
+    incremental_cache.put(state)
+    return state.result
+
+@register_jsonrpc_method()
+async def reparse_file(
+    filepath: str,
+    diff: Optional[str] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None
+) -> MCPFile:
+    """Symbol table of a file after an edit, re-extracting only the statements it touched.
+
+    Without ``diff`` the file is read from disk; ``start_line``..``end_line``
+    (line numbers before the edit) may say where it changed. A unified
+    ``diff`` against the previous ``reparse_file`` result is applied to the
+    text kept from it instead. The first call for a file parses it in full.
+    A diff that does not apply, or comes before any parse of the file, fails
+    with ``StaleStateError``: the client should resend without ``diff``. A
+    line range outside the file fails with ``InvalidLineRangeError``.
+    """
+    try:
+        return await parse_executor.run(_reparse_file, filepath, diff, start_line, end_line)
+    except DiffError as exc:
+        raise StaleStateError({"path": filepath, "reason": str(exc)}) from exc
+    except LineRangeError as exc:
+        raise InvalidLineRangeError({"path": filepath, "message": str(exc)}) from exc
+
+def discover_files(root: str) -> Iterator[str]:
+    """Files under ``root`` selected by the discovery settings."""
+    return iter_source_files(
+        root,
+        include=settings.discovery_include,
+        exclude=settings.discovery_exclude,
+        gitignore=settings.discovery_gitignore,
+        threads=settings.discovery_threads
+    )
+
+def _parse_directory(root: str, workers: Optional[int]) -> MCPDirectory:
+    return parse_python_directory(
+        root,
+        workers,
+        max_bytes=settings.max_file_bytes,
+        oversize=settings.oversize_files,
+        paths=discover_files(root),
+        pool=started_worker_pool()
+    )
+
+@register_jsonrpc_method()
+async def parse_directory(root: str, workers: Optional[int] = None) -> MCPDirectory:
+    return await parse_executor.run(_parse_directory, root, workers)
+
+# Symbol indexes built by index_directory, keyed by real_root(root).
+symbol_indexes: dict[str, SymbolIndex] = {}
+
+# Resolved relationship graphs, keyed like symbol_indexes; dropped whenever the root's index changes.
+graphs: dict[str, RelationshipGraph] = {}
+
+def real_root(root: str) -> str:
+    """The form roots are stored in: however a client spells a directory
+    (relative, trailing slash, through a symlink), its files get the same
+    paths, and the watcher's paths are compared against those."""
+    return os.path.realpath(root)
+
+def _index_directory(root: str, workers: Optional[int]) -> dict[str, int]:
+    root = real_root(root)
+    index = SymbolIndex.build(root, workers=workers, pool=started_worker_pool(), paths=discover_files(root))
+    symbol_indexes[root] = index
+    graphs.pop(root, None)
+    return index.stats()
+
+def _symbol_index(root: str) -> SymbolIndex:
+    root = real_root(root)
+    index = symbol_indexes.get(root)
+    if index is None:
+        _index_directory(root, None)
+        index = symbol_indexes[root]
+    return index
+
+def refresh_paths(changed: List[str], deleted: List[str]) -> None:
+    """Re-parse changed files into the parse cache and any symbol index covering them.
+
+    Called by the file watcher from its own thread.
+    """
+    # Caches are keyed by the paths clients send; indexes and embeddings by real paths.
+    refreshed: List[str] = []
+    for path in changed:
+        try:
+            if incremental_cache.get(path) is not None:
+                _reparse_file(path)
+            else:
+                parse_cache.parse_file(path)
+        except PARSE_ERRORS as exc:
+            logger.debug("not refreshing %s: %s", path, exc)
+            continue
+        real = os.path.realpath(path)
+        refreshed.append(real)
+        for root, index in list(symbol_indexes.items()):
+            if real.startswith(os.path.join(root, "")):
+                index.add(collect_module_facts(real))
+                graphs.pop(root, None)
+    gone: List[str] = []
+    for path in deleted:
+        outline_cache.discard(path)
+        incremental_cache.discard(path)
+        real = os.path.realpath(path)
+        gone.append(real)
+        for root, index in list(symbol_indexes.items()):
+            if real in index:
+                index.remove_path(real)
+                graphs.pop(root, None)
+    if embedding_pipeline is not None:
+        # Only files that were embedded before are kept up to date.
+        embedded = [path for path in refreshed if path in embedding_pipeline.store.paths]
+        if embedded:
+            embedding_pipeline.embed_files(_files_with_source(embedded, workers=1))
+        embedding_pipeline.remove_paths(gone)
+        # Write index.json now, so the ids on disk match the vectors if the server dies.
+        if embedded or gone:
+            embedding_pipeline.store.flush()
+    logger.debug("refreshed %d changed, %d deleted files", len(changed), len(deleted))
+
+def _find_definition(root: str, name: str) -> List[MCPDefinition]:
+    return _symbol_index(root).find_definition(name)
+
+def _find_callers(root: str, qualified_name: str) -> List[MCPCallSite]:
+    return _symbol_index(root).find_callers(qualified_name)
+
+@register_jsonrpc_method()
+async def index_directory(root: str, workers: Optional[int] = None) -> dict[str, int]:
+    """(Re)build the cross-file symbol index for ``root``."""
+    return await parse_executor.run(_index_directory, root, workers)
+
+@register_jsonrpc_method()
+async def find_definition(root: str, name: str) -> List[MCPDefinition]:
+    """Definitions matching a qualified name (``pkg.mod.Class.method``) or a bare name."""
+    return await parse_executor.run(_find_definition, root, name)
+
+@register_jsonrpc_method()
+async def find_callers(root: str, qualified_name: str) -> List[MCPCallSite]:
+    return await parse_executor.run(_find_callers, root, qualified_name)
+
+def _graph(root: str) -> RelationshipGraph:
+    root = real_root(root)
+    graph = graphs.get(root)
+    if graph is None:
+        graph = graphs[root] = RelationshipGraph.from_edges(_symbol_index(root).graph_edges())
+    return graph
+
+def _graph_reachable(
+    root: str,
+    name: str,
+    relationship_types: Optional[List[RelationshipType]],
+    reverse: bool,
+    max_depth: Optional[int],
+    limit: int
+) -> MCPReachability:
+    total, nodes = _graph(root).reachable(name, relationship_types, reverse, max_depth, limit)
+    return MCPReachability(name=name, total=total, nodes=[MCPGraphNode(name=n, depth=d) for n, d in nodes])
+
+def _graph_cycles(root: str, relationship_types: List[RelationshipType]) -> List[List[str]]:
+    return _graph(root).cycles(relationship_types)
+
+def _graph_centrality(
+    root: str,
+    relationship_types: Optional[List[RelationshipType]],
+    kind: Optional[str],
+    top: int
+) -> List[MCPRankedNode]:
+    among = None
+    if kind is not None:
+        among = [name for name, k in _symbol_index(root).kinds().items() if k == kind]
+    return [MCPRankedNode(name=n, score=s) for n, s in _graph(root).top_ranked(relationship_types, top, among)]
+
+@register_jsonrpc_method()
+async def graph_reachable(
+    root: str,
+    name: str,
+    relationship_types: Optional[List[RelationshipType]] = None,
+    reverse: bool = False,
+    max_depth: Optional[int] = None,
+    limit: int = 1000
+) -> MCPReachability:
+    """Everything ``name`` transitively reaches; with ``reverse``, everything reaching it.
+
+    ``graph_reachable(root, "pkg.mod.f", ["calls"], reverse=True)`` answers
+    "what transitively calls pkg.mod.f".
+    """
+    return await parse_executor.run(_graph_reachable, root, name, relationship_types, reverse, max_depth, limit)
+
+@register_jsonrpc_method()
+async def graph_cycles(root: str, relationship_types: List[RelationshipType] = ["imports"]) -> List[List[str]]:
+    """Strongly connected components, largest first; import cycles by default."""
+    return await parse_executor.run(_graph_cycles, root, relationship_types)
+
+@register_jsonrpc_method()
+async def graph_centrality(
+    root: str,
+    relationship_types: Optional[List[RelationshipType]] = None,
+    kind: Optional[Literal["class", "function", "method"]] = None,
+    top: PositiveInt = 20
+) -> List[MCPRankedNode]:
+    """Most depended-on definitions by PageRank, optionally only one ``kind``."""
+    return await parse_executor.run(_graph_centrality, root, relationship_types, kind, top)
+
+# Created on first use: loading a model is slow and most servers never embed.
+embedding_pipeline: Optional[EmbeddingPipeline] = None
+_embedding_lock = threading.Lock()
+
+def get_embedding_pipeline() -> EmbeddingPipeline:
+    global embedding_pipeline
+    with _embedding_lock:
+        if embedding_pipeline is None:
+            encoder = load_encoder(settings.embedding_model, settings.embedding_dimension, settings.embedding_max_tokens)
+            store = VectorStore(encoder.dimension, settings.embedding_dir, model=encoder.name)
+            embedding_pipeline = EmbeddingPipeline(encoder, store, settings.embedding_batch_tokens)
+        return embedding_pipeline
+
+def _files_with_source(paths: Iterable[str], workers: Optional[int]) -> Iterator[MCPFile]:
+    return iter_files_with_source(
+        paths,
+        workers=workers,
+        max_chunk_lines=settings.embedding_chunk_lines,
+        max_bytes=settings.max_file_bytes,
+        pool=started_worker_pool()
+    )
+
+def _embed_directory(root: str, workers: Optional[int]) -> dict[str, int]:
+    pipeline = get_embedding_pipeline()
+    root = real_root(root)
+    paths = list(discover_files(root))
+    counts = pipeline.embed_files(_files_with_source(paths, workers))
+    # Files deleted since the last run.
+    present = set(paths)
+    gone = [path for path in pipeline.store.paths if path.startswith(os.path.join(root, "")) and path not in present]
+    pipeline.remove_paths(gone)
+    pipeline.store.flush()
+    return counts
+
+def _search_similar(query: str, top: int, method: str) -> List[MCPSimilarSymbol]:
+    pipeline = get_embedding_pipeline()
+    use_ivf = method == "ivf" or (method == "auto" and len(pipeline.store) >= settings.embedding_ivf_threshold)
+    hits = pipeline.search(query, top, settings.embedding_nprobe if use_ivf else None)
+    return [MCPSimilarSymbol(score=score, **{k: meta[k] for k in MCPSimilarSymbol.model_fields if k in meta}) for meta, score in hits]
+
+@register_jsonrpc_method()
+async def embed_directory(root: str, workers: Optional[int] = None) -> dict[str, int]:
+    """Embed every class and function under ``root``; unchanged ones are not encoded again."""
+    return await parse_executor.run(_embed_directory, root, workers)
+
+@register_jsonrpc_method()
+async def search_similar(
+    query: str,
+    top: PositiveInt = 10,
+    method: Literal["auto", "exact", "ivf"] = "auto"
+) -> List[MCPSimilarSymbol]:
+    """Embedded symbols most similar to ``query`` (text or code).
+
+    ``exact`` scores every vector; ``ivf`` only those in the nearest clusters,
+    which ``auto`` picks for large stores.
+    """
+    return await parse_executor.run(_search_similar, query, top, method)
+
+@register_jsonrpc_method()
+async def configure_profiling(every: int) -> dict[str, Any]:
+    """Profile one parse request in every ``every`` (0 turns sampling off), without a restart.
+
+    Profiles go to ``settings.profile_dir``; clients cannot choose where the
+    server writes.
+    """
+    settings.profile_every = every
+    profiler.configure(settings.profile_every, settings.profile_dir)
+    return profiler.stats()
 
 from hoh_parser.utils.logging import get_logger
 
 logger = get_logger("hoh_parser.api.jsonrpc")
 
 def get_jsonrpc_router() -> Entrypoint:
-    jsonrpc_router = Entrypoint('/')  # Mount at root of /jsonrpc
+    jsonrpc_router = Entrypoint('/', response_class=FastJSONResponse)  # Mount at root of /jsonrpc
     logger.debug("Registered methods: %s", [name for name, _ in _method_registry])
     for name, func in _method_registry:
         jsonrpc_router.method(name=name)(func)
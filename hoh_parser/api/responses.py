@@ -0,0 +1,27 @@
+"""JSON responses encoded without the standard library encoder.
+
+``json.dumps`` is the slowest step of returning a large symbol table;
+orjson is used when installed, pydantic-core's encoder otherwise.
+"""
+from types import ModuleType
+from typing import Any, Optional, cast
+
+from pydantic_core import to_json, to_jsonable_python
+from starlette.responses import JSONResponse
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return cast(bytes, orjson.dumps(content, default=to_jsonable_python))
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1 +1,153 @@
-# REST API endpoints have been removed. All functionality is now provided via JSON-RPC.
+# Plain HTTP endpoints for payloads that do not fit a single JSON-RPC
+# response (streams, raw uploads). Everything else is served via JSON-RPC.
+import json
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+
+from hoh_parser.api.executor import ServerBusyError
+from hoh_parser.api.jsonrpc import discover_files, parse_cache, parse_executor, started_worker_pool, to_selection
+from hoh_parser.config import settings
+from hoh_parser.core.directory import iter_parse_directory
+from hoh_parser.core.extract import Selection, SelectionError
+from hoh_parser.core.models import MCPFile, MCPSelection, RelationshipType
+from hoh_parser.core.wire import WireFormat, dump_json
+from hoh_parser.utils.file_ops import FileTooLargeError
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+StreamFormat = Literal["files", "records"]
+
+# Source that cannot be parsed (bad syntax or coding cookie, invalid UTF-8,
+# null bytes, nesting too deep): the request's content is at fault, 422.
+_UNPARSABLE = (SyntaxError, UnicodeDecodeError, ValueError, RecursionError, MemoryError)
+
+
+def _json_line(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _file_records(payload: str) -> Iterator[bytes]:
+    """Split one serialized MCPFile into node and edge records."""
+    mcp_file = json.loads(payload)
+    path = mcp_file["path"]
+    yield _json_line({"kind": "file", "path": path, "docstring": mcp_file["docstring"]})
+    for cls in mcp_file["classes"]:
+        methods = cls.pop("methods")
+        yield _json_line({"kind": "class", "path": path, **cls})
+        for method in methods:
+            yield _json_line({"kind": "function", "path": path, **method})
+    for function in mcp_file["functions"]:
+        yield _json_line({"kind": "function", "path": path, **function})
+    for rel in mcp_file["relationships"]:
+        yield _json_line({"kind": "relationship", "path": path, **rel})
+
+
+def iter_ndjson(root: str, workers: Optional[int] = None, format: StreamFormat = "files") -> Iterator[bytes]:
+    """Parse ``root`` and yield NDJSON lines as soon as each file is parsed.
+
+    In ``files`` format every line is one MCPFile; in ``records`` format every
+    file becomes a ``file`` record followed by its ``class``, ``function`` and
+    ``relationship`` records. Files that fail to parse produce an
+    ``{"path": ..., "error": ...}`` line (with ``"kind": "error"`` in records
+    format). Only a bounded number of files is held in memory at a time.
+    """
+    for path, payload, error in iter_parse_directory(
+        root,
+        workers=workers,
+        max_bytes=settings.max_file_bytes,
+        oversize=settings.oversize_files,
+        paths=discover_files(root),
+        pool=started_worker_pool()
+    ):
+        if payload is None:
+            record: Dict[str, Any] = {"path": path, "error": error}
+            if format == "records":
+                record = {"kind": "error", **record}
+            yield _json_line(record)
+        elif format == "records":
+            yield from _file_records(payload)
+        else:
+            yield payload.encode("utf-8") + b"\n"
+
+
+def _symbol_table_json(filepath: str, format: WireFormat, selection: Optional[Selection] = None) -> bytes:
+    return dump_json(parse_cache.parse_file(filepath, selection), format)
+
+
+def get_http_router() -> APIRouter:
+    router = APIRouter()
+
+    # Streams take a parse_executor slot for as long as they run, like the
+    # JSON-RPC parse_directory, and parse on the shared worker pool.
+    @router.get("/stream/parse_directory")
+    async def stream_parse_directory(
+        root: str,
+        workers: Optional[int] = None,
+        format: StreamFormat = "files"
+    ) -> StreamingResponse:
+        try:
+            lines: AsyncIterator[bytes] = parse_executor.stream(iter_ndjson(root, workers=workers, format=format))
+        except ServerBusyError:
+            raise HTTPException(status_code=503, detail="Server busy")
+        return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+    # symbol_table without the JSON-RPC envelope: the cached result is
+    # serialized once, straight from the models to the response body.
+    # The selection is spread over query parameters, as in the JSON-RPC
+    # method's ``selection`` object.
+    @router.get("/symbol_table")
+    async def get_symbol_table(
+        filepath: str,
+        format: WireFormat = "full",
+        relationship_types: Optional[List[RelationshipType]] = Query(None),
+        symbols_only: bool = False,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        symbol: Optional[str] = None
+    ) -> Response:
+        selection = to_selection(MCPSelection(
+            relationship_types=relationship_types,
+            symbols_only=symbols_only,
+            start_line=start_line,
+            end_line=end_line,
+            symbol=symbol
+        ))
+        try:
+            body = await parse_executor.run(_symbol_table_json, filepath, format, selection)
+        except SelectionError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        except ServerBusyError:
+            raise HTTPException(status_code=503, detail="Server busy")
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"No such file: {filepath}")
+        except OSError as exc:
+            # A directory, an unreadable file and the like: the request is at fault.
+            raise HTTPException(status_code=400, detail=f"{type(exc).__name__}: {exc.strerror or exc}")
+        except FileTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        except _UNPARSABLE as exc:
+            raise HTTPException(status_code=422, detail=f"{type(exc).__name__}: {exc}")
+        return Response(body, media_type="application/json")
+
+    # Upload variants of the parse_file JSON-RPC method: the source is sent as
+    # raw bytes instead of inflating it by a third with base64.
+    @router.post("/parse_file", response_model=MCPFile)
+    async def parse_uploaded_file(file: UploadFile) -> MCPFile:
+        return await _parse_upload(await file.read(), file.filename or "<upload>")
+
+    @router.post("/parse_file/raw", response_model=MCPFile)
+    async def parse_raw_file(request: Request, filename: str) -> MCPFile:
+        return await _parse_upload(await request.body(), filename)
+
+    return router
+
+
+async def _parse_upload(content: bytes, filename: str) -> MCPFile:
+    try:
+        return await parse_executor.run(parse_cache.parse_source, content, filename)
+    except ServerBusyError:
+        raise HTTPException(status_code=503, detail="Server busy")
+    except _UNPARSABLE as exc:
+        raise HTTPException(status_code=422, detail=f"{type(exc).__name__}: {exc}")
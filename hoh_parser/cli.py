@@ -0,0 +1,121 @@
+"""``hoh-parse``: parse Python from the shell, one JSON result per line.
+
+    hoh-parse src/ scripts/tool.py             # files and directories
+    git ls-files '*.py' | hoh-parse --paths-from -
+    cat module.py | hoh-parse -                # source on stdin
+
+Each output line is an ``MCPFile`` (as served by ``/stream/parse_directory``)
+or ``{"path": ..., "error": ...}`` for a file that could not be parsed; the
+exit status is 1 when any file failed. Files are parsed across worker
+processes once there are more than ``--chunksize`` of them.
+
+Only the parser is imported: not the server, its settings or pydantic.
+Results are written straight from the compact extraction, as the worker
+processes already do, so a run costs little more than starting Python.
+"""
+import argparse
+import ast
+import io
+import json
+import os
+import sys
+import tokenize
+from contextlib import nullcontext
+from itertools import chain, islice
+from typing import IO, Iterable, Iterator, List, Optional
+
+from hoh_parser.core.directory import DEFAULT_CHUNKSIZE, ParsedPath, iter_parse_paths
+from hoh_parser.core.extract import PARSE_ERRORS, extract_compact
+from hoh_parser.utils.discovery import iter_source_files
+from hoh_parser.utils.file_ops import DEFAULT_MAX_FILE_BYTES
+
+STDIN = "-"
+
+
+def _iter_paths(targets: Iterable[str], exclude: List[str], gitignore: bool) -> Iterator[str]:
+    for target in targets:
+        if os.path.isdir(target):
+            yield from iter_source_files(target, exclude=exclude, gitignore=gitignore)
+        else:
+            yield target
+
+
+def _listed_paths(listing: str) -> Iterator[str]:
+    """Non-blank lines of the file ``listing`` (stdin for ``-``)."""
+    stream = nullcontext(sys.stdin) if listing == STDIN else open(listing, encoding="utf-8")
+    with stream as f:
+        for line in f:
+            if line := line.strip():
+                yield line
+
+
+def parse_source(data: bytes, path: str = "<stdin>") -> ParsedPath:
+    """Parse the source ``data`` as ``_parse_chunk`` parses a file."""
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        compact = extract_compact(ast.parse(data, filename=path), path, encoding=encoding)
+    except PARSE_ERRORS as exc:
+        return path, None, f"{type(exc).__name__}: {exc}"
+    return path, json.dumps(compact.to_dict(), separators=(",", ":")), None
+
+
+def write_results(results: Iterable[ParsedPath], out: IO[bytes]) -> bool:
+    """Write one NDJSON line per result; False if any failed."""
+    ok = True
+    for path, payload, error in results:
+        if payload is None:
+            ok = False
+            payload = json.dumps({"path": path, "error": error}, separators=(",", ":"))
+        out.write(payload.encode("utf-8") + b"\n")
+    return ok
+
+
+def run(args: argparse.Namespace, out: IO[bytes]) -> int:
+    ok = True
+    targets = [target for target in args.targets if target != STDIN]
+    if STDIN in args.targets:
+        ok = write_results([parse_source(sys.stdin.buffer.read())], out)
+    paths: Iterable[str] = _iter_paths(targets, args.exclude, args.gitignore)
+    if args.paths_from is not None:
+        paths = chain(paths, _iter_paths(_listed_paths(args.paths_from), args.exclude, args.gitignore))
+    # A handful of files is parsed faster in-process than by starting a pool.
+    head = list(islice(paths, args.chunksize + 1))
+    workers = args.workers if len(head) > args.chunksize else 1
+    results = iter_parse_paths(
+        chain(head, paths),
+        workers=workers,
+        chunksize=args.chunksize,
+        max_bytes=args.max_bytes or None,
+        oversize=args.oversize
+    )
+    ok = write_results(results, out) and ok
+    return 0 if ok else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="hoh-parse", description=__doc__.splitlines()[0].split(": ", 1)[1])
+    ap.add_argument("targets", nargs="*", metavar="PATH", help=f"file or directory; {STDIN} reads source from stdin")
+    ap.add_argument("--paths-from", metavar="FILE", help=f"also parse the paths listed in FILE ({STDIN}: stdin)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="files per worker task")
+    ap.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_FILE_BYTES, help="larger files are not parsed; 0: no limit")
+    ap.add_argument("--oversize", choices=("skip", "outline"), default="skip", help="outline: top-level names of larger files")
+    ap.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help="gitignore-style, for directories")
+    ap.add_argument("--no-gitignore", dest="gitignore", action="store_false", help="do not honour .gitignore files")
+    args = ap.parse_args(argv)
+    if not args.targets and args.paths_from is None:
+        ap.error("nothing to parse: give paths, - or --paths-from")
+    if args.targets.count(STDIN) > 1 or (STDIN in args.targets and args.paths_from == STDIN):
+        ap.error("stdin can only be read once")
+    try:
+        status = run(args, sys.stdout.buffer)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. ``| head``); do not complain about it at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
-from typing import Any
+from typing import Any, List, Literal, Optional
 
 load_dotenv()
 
@@ -11,6 +11,41 @@ class Settings(BaseSettings):
     arangodb_url: str = "http://localhost:8529"
     arangodb_user: str = "root"
     arangodb_password: str = ""
+    arangodb_database: str = "_system"
+    arangodb_batch_size: int = 10000  # documents per bulk import request
+    arangodb_concurrency: int = 4  # bulk imports in flight at once
+    arangodb_max_retries: int = 5
+    cache_max_entries: int = 1024
+    cache_dir: Optional[str] = None  # persist parse results here when set
+    parse_concurrency: int = 4  # parses running at once
+    parse_queue_size: int = 64  # parses waiting before requests get "busy"
+    worker_pool: bool = True  # start directory-parsing processes with the server rather than per request
+    worker_processes: int = 0  # 0: CPU count
+    worker_max_tasks: int = 1000  # chunks per worker before the workers are replaced
+    worker_max_rss_mb: int = 1024  # replace the workers once one grows past this; 0: no limit
+    incremental_cache_entries: int = 64  # files kept for reparse_file
+    outline_cache_entries: int = 32  # parsed files kept for get_symbol lookups
+    max_file_bytes: int = 32 * 1024 * 1024  # larger files are not parsed
+    oversize_files: Literal["skip", "outline"] = "skip"  # outline: top-level names only
+    discovery_include: List[str] = ["*.py"]
+    discovery_exclude: List[str] = []  # gitignore-style, on top of .gitignore files
+    discovery_gitignore: bool = True
+    discovery_threads: int = 0  # list directories concurrently when > 0
+    watch_roots: List[str] = []  # re-parse changed files under these in the background
+    watch_backend: Literal["auto", "inotify", "polling"] = "auto"
+    watch_debounce: float = 0.2  # seconds without events before a batch is processed
+    watch_max_delay: float = 2.0  # upper bound on how long a batch is held back
+    watch_poll_interval: float = 1.0
+    profile_every: int = 0  # cProfile one parse request in every N; 0 disables
+    profile_dir: str = "profiles"  # where sampled .prof files are written
+    embedding_model: str = "hashing"  # or a sentence-transformers model name or path
+    embedding_dimension: int = 256  # hashing encoder only; models have their own
+    embedding_max_tokens: int = 512  # longer texts are truncated
+    embedding_batch_tokens: int = 8192  # padded tokens per encoder call
+    embedding_chunk_lines: int = 200  # longer symbols are embedded in parts
+    embedding_dir: Optional[str] = None  # persist vectors here when set
+    embedding_ivf_threshold: int = 50_000  # search an IVF index above this many vectors
+    embedding_nprobe: int = 8  # IVF lists scored per query
     # Add more config options as needed
 
     model_config = {
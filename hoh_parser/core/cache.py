@@ -0,0 +1,126 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .extract import Selection
+from .models import MCPFile
+from .parser import PARSER_VERSION, parse_python_source
+from hoh_parser.utils.file_ops import DEFAULT_MAX_FILE_BYTES, SourceData, open_source
+
+CACHE_DB_NAME = "parse_cache.sqlite3"
+
+
+class ParseCache:
+    """Content-addressed cache of parse results.
+
+    Entries are keyed by parser version, SHA-256 of the source and the path
+    the result was produced for (the path is embedded in ``MCPFile``), so an
+    edited file or a parser upgrade can never return a stale result. The most
+    recently used ``max_entries`` results are kept in memory; when
+    ``cache_dir`` is set, every result is also stored in a SQLite database
+    there so a restarted server starts warm. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        cache_dir: Optional[str] = None,
+        max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES
+    ) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_file_bytes = max_file_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, MCPFile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(cache_dir, CACHE_DB_NAME), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache (key TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key_for(path: str, content: SourceData, selection: Optional[Selection] = None) -> str:
+        key = f"{PARSER_VERSION}:{hashlib.sha256(content).hexdigest()}:{path}"
+        # Partial results are cached apart from the full one.
+        return f"{key}:{selection.key()}" if selection is not None else key
+
+    def get(self, key: str) -> Optional[MCPFile]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            if self._db is not None:
+                row = self._db.execute("SELECT payload FROM parse_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    result = MCPFile.model_validate_json(row[0])
+                    self._remember(key, result)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: MCPFile) -> None:
+        with self._lock:
+            self._remember(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parse_cache (key, payload) VALUES (?, ?)",
+                    (key, result.model_dump_json())
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, result: MCPFile) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def parse_file(self, filepath: str, selection: Optional[Selection] = None) -> MCPFile:
+        """Cached equivalent of ``parse_python_file``; files over ``max_file_bytes`` raise."""
+        with open_source(filepath, self.max_file_bytes) as source:
+            return self.parse_source(source.data, filepath, selection)
+
+    def parse_source(self, content: SourceData, filepath: str, selection: Optional[Selection] = None) -> MCPFile:
+        """Cached equivalent of ``parse_python_source``."""
+        key = self.key_for(filepath, content, selection)
+        result = self.get(key)
+        if result is None:
+            result = parse_python_source(content, filepath, selection=selection)
+            self.put(key, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM parse_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
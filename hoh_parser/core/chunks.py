@@ -0,0 +1,140 @@
+"""Exact source text for classes and functions.
+
+The file is indexed once: a table of the byte offset at which every line
+starts. Each symbol's span (``lineno``/``col_offset`` through
+``end_lineno``/``end_col_offset``, widened to cover its decorators) then
+maps to a byte range, decoded straight from a ``memoryview`` of the one
+buffer, so nothing is copied per symbol except the resulting text. AST
+column offsets count UTF-8 bytes, which is why the index works on bytes.
+"""
+import codecs
+import io
+import re
+import tokenize
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+# Line terminators as the tokenizer counts them.
+_NEWLINE = re.compile(rb"\r\n|\r|\n")
+
+
+@dataclass(slots=True)
+class SourceSpan:
+    kind: str  # "class" or "function"
+    name: str
+    parent: Optional[str]
+    lineno: int  # first line, including decorators
+    col_offset: int
+    end_lineno: int
+    end_col_offset: int
+
+
+@dataclass(slots=True)
+class ChunkRecord:
+    name: str
+    kind: str
+    parent: Optional[str]
+    lineno: int
+    end_lineno: int
+    source_code: str
+    part: int = 0
+    parts: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "parent": self.parent,
+            "lineno": self.lineno,
+            "end_lineno": self.end_lineno,
+            "source_code": self.source_code,
+            "part": self.part,
+            "parts": self.parts,
+        }
+
+
+def utf8_source(source: Any, encoding: Optional[str] = None) -> Any:
+    """The source as a UTF-8 buffer without a BOM, matching AST column offsets.
+
+    ``source`` is text or any bytes-like buffer (bytes, mmap) in ``encoding``,
+    detected from the BOM or PEP 263 cookie when not given. UTF-8 buffers are
+    returned as they are, or as a view past the BOM; other encodings are
+    re-encoded.
+    """
+    if isinstance(source, str):
+        return source.encode("utf-8")
+    view = memoryview(source)
+    if encoding is None:
+        # The cookie can only be on the first two lines.
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(bytes(view[:4096])).readline)
+    if encoding in ("utf-8", "utf-8-sig"):
+        if bytes(view[:len(codecs.BOM_UTF8)]) == codecs.BOM_UTF8:
+            return view[len(codecs.BOM_UTF8):]
+        return source
+    return str(view, encoding).encode("utf-8")
+
+
+class LineIndex:
+    """Byte offsets of line starts over one buffer (bytes or mmap)."""
+
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, buffer: Any) -> None:
+        self.buffer = memoryview(buffer)
+        self.offsets = array("Q", [0])
+        self.offsets.extend(m.end() for m in _NEWLINE.finditer(buffer))
+
+    def offset(self, lineno: int, col_offset: int) -> int:
+        return self.offsets[lineno - 1] + col_offset
+
+    def line_end(self, lineno: int) -> int:
+        """Offset just past the last character of a line, before its newline."""
+        if lineno < len(self.offsets):
+            end = self.offsets[lineno]
+            while end > self.offsets[lineno - 1] and self.buffer[end - 1] in b"\r\n":
+                end -= 1
+            return end
+        return len(self.buffer)
+
+    def text(self, start: int, end: int) -> str:
+        return str(self.buffer[start:end], "utf-8")
+
+
+def iter_chunks(index: LineIndex, span: SourceSpan, max_lines: Optional[int] = None) -> Iterator[ChunkRecord]:
+    """Chunks for one span; spans longer than ``max_lines`` are split by lines."""
+    total = span.end_lineno - span.lineno + 1
+    if not max_lines or total <= max_lines:
+        yield ChunkRecord(
+            name=span.name,
+            kind=span.kind,
+            parent=span.parent,
+            lineno=span.lineno,
+            end_lineno=span.end_lineno,
+            source_code=index.text(
+                index.offset(span.lineno, span.col_offset),
+                index.offset(span.end_lineno, span.end_col_offset)
+            )
+        )
+        return
+    parts = -(-total // max_lines)
+    for part in range(parts):
+        first = span.lineno + part * max_lines
+        last = min(first + max_lines - 1, span.end_lineno)
+        start = index.offset(first, span.col_offset if part == 0 else 0)
+        end = index.offset(last, span.end_col_offset) if last == span.end_lineno else index.line_end(last)
+        yield ChunkRecord(
+            name=span.name,
+            kind=span.kind,
+            parent=span.parent,
+            lineno=first,
+            end_lineno=last,
+            source_code=index.text(start, end),
+            part=part,
+            parts=parts
+        )
+
+
+def source_chunks(buffer: Any, spans: List[SourceSpan], max_lines: Optional[int] = None) -> List[ChunkRecord]:
+    index = LineIndex(buffer)
+    return [chunk for span in spans for chunk in iter_chunks(index, span, max_lines)]
@@ -0,0 +1,166 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .extract import PARSE_ERRORS, extract_file
+from .workers import WorkerPool
+from hoh_parser.utils.discovery import iter_source_files
+from hoh_parser.utils.file_ops import DEFAULT_MAX_FILE_BYTES
+
+# (path, MCPFile as JSON, error message); exactly one of the last two is set.
+ParsedPath = Tuple[str, Optional[str], Optional[str]]
+
+DEFAULT_CHUNKSIZE = 32
+
+T = TypeVar("T")
+
+if TYPE_CHECKING:
+    from .models import MCPDirectory
+
+
+def _parse_chunk(
+    paths: List[str],
+    max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+    oversize: str = "skip"
+) -> List[ParsedPath]:
+    """Worker entry point: parse a chunk of files and serialize each result.
+
+    Results cross the process boundary as JSON strings rather than pickled
+    pydantic objects, which are far larger and slower to rebuild; they are
+    serialized straight from the compact extraction result, so workers never
+    build models at all.
+    """
+    results: List[ParsedPath] = []
+    for path in paths:
+        try:
+            compact = extract_file(path, max_bytes=max_bytes, oversize=oversize)
+            payload = json.dumps(compact.to_dict(), separators=(",", ":"))
+            results.append((path, payload, None))
+        except PARSE_ERRORS as exc:
+            results.append((path, None, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def _chunks(paths: Iterable[str], chunksize: int) -> Iterator[List[str]]:
+    it = iter(paths)
+    while chunk := list(islice(it, chunksize)):
+        yield chunk
+
+
+def map_path_chunks(
+    func: Callable[[List[str]], List[T]],
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    pool: Optional[WorkerPool] = None
+) -> Iterator[T]:
+    """Apply ``func`` to chunks of ``paths`` across a process pool.
+
+    Results are yielded in input order. ``workers`` defaults to the CPU
+    count (or the size of ``pool``); with one worker (or fewer) the chunks
+    are processed in the calling process. The chunks run on ``pool`` when
+    one is given, otherwise on a pool started for this call. Only
+    ``2 * workers`` chunks are in flight at a time, so memory stays bounded
+    however many paths there are. ``func`` must be a picklable module-level
+    function.
+    """
+    if workers is None:
+        workers = pool.processes if pool is not None else os.cpu_count() or 1
+    chunks = _chunks(paths, chunksize)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from func(chunk)
+        return
+    if pool is not None:
+        yield from _map_submitted(pool.submit, func, chunks, workers)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _map_submitted(executor.submit, func, chunks, workers)
+
+
+def _map_submitted(
+    submit: Callable[..., "Future[List[T]]"],
+    func: Callable[[List[str]], List[T]],
+    chunks: Iterable[List[str]],
+    workers: int
+) -> Iterator[T]:
+    pending: Deque["Future[List[T]]"] = deque()
+    for chunk in chunks:
+        pending.append(submit(func, chunk))
+        if len(pending) >= 2 * workers:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def iter_parse_paths(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+    oversize: str = "skip",
+    pool: Optional[WorkerPool] = None
+) -> Iterator[ParsedPath]:
+    """Parse files across a process pool (``pool`` when given), yielding results in input order.
+
+    Files over ``max_bytes`` are reported as errors, or outlined with
+    ``oversize="outline"`` (see ``extract_file``).
+    """
+    func = partial(_parse_chunk, max_bytes=max_bytes, oversize=oversize)
+    return map_path_chunks(func, paths, workers=workers, chunksize=chunksize, pool=pool)
+
+
+def iter_parse_directory(
+    root: str,
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+    oversize: str = "skip",
+    paths: Optional[Iterable[str]] = None,
+    pool: Optional[WorkerPool] = None
+) -> Iterator[ParsedPath]:
+    """Parse every Python file under ``root``; see ``iter_parse_paths``.
+
+    Files are parsed while discovery is still walking the tree. ``paths``
+    replaces the default discovery (``iter_source_files(root)``), e.g. to
+    apply other include/exclude rules.
+    """
+    if paths is None:
+        paths = iter_source_files(root)
+    return iter_parse_paths(
+        paths, workers=workers, chunksize=chunksize, max_bytes=max_bytes, oversize=oversize, pool=pool
+    )
+
+
+def parse_directory(
+    root: str,
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+    oversize: str = "skip",
+    paths: Optional[Iterable[str]] = None,
+    pool: Optional[WorkerPool] = None
+) -> "MCPDirectory":
+    """Parse every Python file under ``root`` using ``workers`` processes.
+
+    Files that cannot be read or parsed are reported in ``errors`` instead of
+    failing the whole directory.
+    """
+    # The models (and pydantic) are only needed here; the streaming functions
+    # above hand out JSON, so importing this module does not load them.
+    from .models import MCPDirectory, MCPFile, MCPParseError
+    files: List[MCPFile] = []
+    errors: List[MCPParseError] = []
+    results = iter_parse_directory(
+        root, workers=workers, chunksize=chunksize, max_bytes=max_bytes, oversize=oversize, paths=paths, pool=pool
+    )
+    for path, payload, error in results:
+        if payload is not None:
+            files.append(MCPFile.model_validate_json(payload))
+        else:
+            errors.append(MCPParseError(path=path, error=error or ""))
+    return MCPDirectory(root=root, files=files, errors=errors)
@@ -0,0 +1,235 @@
+"""Embeddings of classes and functions.
+
+Each source chunk of a parse result (see ``chunks``) is one text: its kind
+and qualified name followed by its exact source. Texts are keyed by a hash
+of the encoder and the text, so a symbol whose source did not change (or
+that duplicates one already embedded) is never encoded again. The rest
+are encoded in batches grouped by token count, so short functions are not
+padded to the length of the longest one in the batch.
+
+``HashingEncoder`` is a deterministic, dependency-free stand-in (signed
+feature hashing of identifier parts); ``SentenceTransformerEncoder`` runs a
+local sentence-transformers model when that package is installed.
+"""
+import hashlib
+import json
+import re
+import threading
+import zlib
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from .directory import map_path_chunks
+from .extract import PARSE_ERRORS, extract_file
+from .models import MCPFile
+from .vector_store import VectorStore, normalize
+from .workers import WorkerPool
+from hoh_parser.utils.file_ops import DEFAULT_MAX_FILE_BYTES
+from hoh_parser.utils.metrics import timed
+
+try:
+    import sentence_transformers
+except ImportError:  # optional
+    sentence_transformers = None
+
+# Identifiers split at underscores and case changes, numbers, and any other single character.
+_TOKEN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+|[^\sA-Za-z\d_]")
+
+
+class Encoder(Protocol):
+    name: str  # identifies the model; part of every content hash
+    dimension: int
+
+    def count_tokens(self, text: str) -> int: ...
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), dimension)`` float32 unit vectors."""
+        ...
+
+
+class HashingEncoder:
+    """Signed feature hashing of lower-cased identifier parts; deterministic across processes."""
+
+    def __init__(self, dimension: int = 256, max_tokens: int = 512) -> None:
+        self.dimension = dimension
+        self.max_tokens = max_tokens
+        self.name = f"hashing-{dimension}"
+
+    def count_tokens(self, text: str) -> int:
+        return min(len(_TOKEN.findall(text)), self.max_tokens)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(token.lower().encode()) for token in _TOKEN.findall(text)[:self.max_tokens]),
+                dtype=np.uint32
+            )
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+            vectors[i] = np.bincount(hashes % self.dimension, weights=signs, minlength=self.dimension)
+        return normalize(vectors)
+
+
+class SentenceTransformerEncoder:
+    """A local sentence-transformers model (``pip install sentence-transformers``)."""
+
+    def __init__(self, model: str, max_tokens: int = 512) -> None:
+        if sentence_transformers is None:
+            raise RuntimeError(f"embedding model {model!r} needs the sentence-transformers package")
+        self.model = sentence_transformers.SentenceTransformer(model, device="cpu")
+        self.model.max_seq_length = max_tokens
+        self.max_tokens = max_tokens
+        self.dimension = int(self.model.get_sentence_embedding_dimension())
+        self.name = model
+
+    def count_tokens(self, text: str) -> int:
+        return min(len(self.model.tokenizer.tokenize(text)), self.max_tokens)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def load_encoder(model: str, dimension: int = 256, max_tokens: int = 512) -> Encoder:
+    """``"hashing"`` for ``HashingEncoder``, otherwise a sentence-transformers model name or path."""
+    if model == "hashing":
+        return HashingEncoder(dimension, max_tokens)
+    return SentenceTransformerEncoder(model, max_tokens)
+
+
+def token_batches(lengths: Sequence[int], max_batch_tokens: int) -> List[List[int]]:
+    """Group indexes of ``lengths`` so each batch, padded to its longest text, fits ``max_batch_tokens``.
+
+    Texts are taken shortest first, so each batch holds texts of similar
+    length; a text longer than the budget gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Sorted ascending, so the newest text is the longest in the batch.
+        if batch and (len(batch) + 1) * max(lengths[i], 1) > max_batch_tokens:
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# (id, text, metadata) of one chunk
+EmbeddingItem = Tuple[str, str, Dict[str, Any]]
+
+
+def embedding_items(file: MCPFile) -> List[EmbeddingItem]:
+    """One item per source chunk of ``file`` (parsed with ``include_source``)."""
+    items: List[EmbeddingItem] = []
+    seen = set()
+    for chunk in file.chunks:
+        qualname = f"{chunk.parent}.{chunk.name}" if chunk.parent else chunk.name
+        id = f"{file.path}::{qualname}" if chunk.parts == 1 else f"{file.path}::{qualname}#{chunk.part}"
+        if id in seen:
+            # Redefinitions (e.g. per-platform variants) each keep their own vector.
+            id = f"{id}@{chunk.lineno}"
+        seen.add(id)
+        meta = {
+            "path": file.path,
+            "name": qualname,
+            "kind": chunk.kind,
+            "lineno": chunk.lineno,
+            "end_lineno": chunk.end_lineno,
+        }
+        items.append((id, f"{chunk.kind} {qualname}\n{chunk.source_code}", meta))
+    return items
+
+
+class EmbeddingPipeline:
+    """Keeps a ``VectorStore`` in step with parse results. Safe to share between threads."""
+
+    def __init__(self, encoder: Encoder, store: VectorStore, max_batch_tokens: int = 8192) -> None:
+        self.encoder = encoder
+        self.store = store
+        self.max_batch_tokens = max_batch_tokens
+        self.encoded = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def content_hash(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.encoder.name}\0{text}".encode(), digest_size=16).hexdigest()
+
+    def embed_files(self, files: Iterable[MCPFile]) -> Dict[str, int]:
+        """Embed the chunks of ``files``, replacing whatever was stored for those paths."""
+        with self._lock:
+            counts = {"symbols": 0, "encoded": 0, "reused": 0, "unchanged": 0, "removed": 0}
+            pending: List[Tuple[str, str, str, Dict[str, Any]]] = []
+            for file in files:
+                stale = set(self.store.paths.get(file.path, ()))
+                for id, text, meta in embedding_items(file):
+                    counts["symbols"] += 1
+                    stale.discard(id)
+                    hash = self.content_hash(text)
+                    if self.store.hash_of(id) == hash:
+                        self.store.update_meta(id, meta)  # it may have moved
+                        counts["unchanged"] += 1
+                        continue
+                    vector = self.store.vector_for_hash(hash)
+                    if vector is not None:
+                        self.store.put(id, hash, vector, meta)
+                        counts["reused"] += 1
+                        continue
+                    pending.append((id, hash, text, meta))
+                for id in stale:
+                    self.store.remove(id)
+                counts["removed"] += len(stale)
+            with timed("embed"):
+                lengths = [self.encoder.count_tokens(text) for _, _, text, _ in pending]
+                for batch in token_batches(lengths, self.max_batch_tokens):
+                    vectors = self.encoder.encode([pending[i][2] for i in batch])
+                    for i, vector in zip(batch, vectors):
+                        id, hash, _, meta = pending[i]
+                        self.store.put(id, hash, vector, meta)
+            counts["encoded"] = len(pending)
+            self.encoded += counts["encoded"]
+            self.reused += counts["reused"]
+            return counts
+
+    def remove_paths(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            self.store.remove_path(path)
+
+    def search(self, query: str, top: int = 10, nprobe: Optional[int] = None) -> List[Tuple[Dict[str, Any], float]]:
+        return self.store.search(self.encoder.encode([query])[0], top, nprobe)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model": self.encoder.name, "encoded": self.encoded, "reused": self.reused, **self.store.stats()}
+
+
+def _parse_with_source(
+    paths: List[str],
+    max_chunk_lines: Optional[int] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES
+) -> List[Optional[str]]:
+    """Worker entry point: parse results with source chunks as JSON, None for unparsable files."""
+    results: List[Optional[str]] = []
+    for path in paths:
+        try:
+            compact = extract_file(path, include_source=True, max_chunk_lines=max_chunk_lines, max_bytes=max_bytes)
+            results.append(json.dumps(compact.to_dict(), separators=(",", ":")))
+        except PARSE_ERRORS:
+            results.append(None)
+    return results
+
+
+def iter_files_with_source(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    max_chunk_lines: Optional[int] = None,
+    max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+    pool: Optional[WorkerPool] = None
+) -> Iterator[MCPFile]:
+    """Parse ``paths`` with source chunks across a process pool, skipping unparsable files."""
+    func = partial(_parse_with_source, max_chunk_lines=max_chunk_lines, max_bytes=max_bytes)
+    for payload in map_path_chunks(func, paths, workers=workers, pool=pool):
+        if payload is not None:
+            yield MCPFile.model_validate_json(payload)
@@ -0,0 +1,618 @@
+"""Extraction engine and its compact, pydantic-free result representation.
+
+A file can produce thousands of relationships, so extraction records them
+in slotted dataclasses and a columnar ``EdgeTable`` (interned strings,
+relationship types as small integer codes) instead of pydantic models.
+``CompactFile.to_dict`` yields the plain ``MCPFile`` layout; models are only
+built from it at the API boundary (see ``hoh_parser.core.parser``).
+Source chunks for the collected symbols are optional (see ``chunks``).
+A ``Selection`` restricts extraction to some relationship types or part of
+the file, skipping the rest of the tree walk rather than filtering results.
+"""
+import ast
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from .chunks import ChunkRecord, LineIndex, SourceSpan, source_chunks, utf8_source
+from hoh_parser.utils.file_ops import FileTooLargeError, open_source
+from hoh_parser.utils.metrics import timed
+
+# What to do with a file over the size limit: report it as an error, or
+# list its top-level definitions without parsing it.
+OVERSIZE_MODES = ("skip", "outline")
+
+# Top-level ``def``/``class`` statements, for the outline of oversized files.
+# ``async def`` is left out, as the full extraction does not list it either.
+_TOP_LEVEL_DEF = re.compile(rb"^(def|class)[ \t]+(\w+)", re.MULTILINE)
+
+# Failures that belong to one file: batch parsers report them for that file
+# and carry on. Valid but pathological source (say, deeply nested brackets)
+# can still exhaust the recursion limit or memory.
+PARSE_ERRORS = (OSError, SyntaxError, UnicodeDecodeError, ValueError, RecursionError, MemoryError)
+
+# Relationship type names in code order; a type's code is its index here.
+RELATIONSHIP_TYPES: Tuple[str, ...] = (
+    "defines", "calls", "inherits", "imports", "from-imports", "assigns",
+    "overrides", "property", "property_setter", "property_deleter",
+    "staticmethod", "classmethod", "composes"
+)
+RELATIONSHIP_CODES: Dict[str, int] = {name: code for code, name in enumerate(RELATIONSHIP_TYPES)}
+
+CALLS = RELATIONSHIP_CODES["calls"]
+INHERITS = RELATIONSHIP_CODES["inherits"]
+IMPORTS = RELATIONSHIP_CODES["imports"]
+FROM_IMPORTS = RELATIONSHIP_CODES["from-imports"]
+ASSIGNS = RELATIONSHIP_CODES["assigns"]
+OVERRIDES = RELATIONSHIP_CODES["overrides"]
+COMPOSES = RELATIONSHIP_CODES["composes"]
+
+# Fields of statements (and except handlers / match cases) holding statements.
+_STATEMENT_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")  # in _fields order
+
+# Nodes that may hold statements; everything else is walked as an expression.
+_STATEMENT_NODES = (ast.stmt, ast.excepthandler, ast.match_case)
+
+# Decorators that mark a method, keyed by decorator name (@property) or by
+# accessor attribute (@x.setter).
+_NAME_DECORATORS = {
+    "property": RELATIONSHIP_CODES["property"],
+    "staticmethod": RELATIONSHIP_CODES["staticmethod"],
+    "classmethod": RELATIONSHIP_CODES["classmethod"],
+}
+_ATTRIBUTE_DECORATORS = {
+    "setter": RELATIONSHIP_CODES["property_setter"],
+    "deleter": RELATIONSHIP_CODES["property_deleter"],
+}
+
+
+class SelectionError(ValueError):
+    """A selection names a symbol or relationship type the module does not have."""
+
+
+@dataclass(frozen=True, slots=True)
+class Selection:
+    """The part of a module to extract; the defaults select everything.
+
+    ``relationships`` names the relationship types to collect (``None``
+    for all, empty for symbols only). ``start_line``/``end_line`` keep the
+    statements of module, class and function bodies that overlap the
+    range; ``symbol`` (``"func"``, ``"Class.method"``) narrows the range
+    to that definition.
+    """
+    relationships: Optional[FrozenSet[str]] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    symbol: Optional[str] = None
+
+    def key(self) -> str:
+        """Stable text form, for cache keys."""
+        types = "*" if self.relationships is None else ",".join(sorted(self.relationships))
+        return f"{types}|{self.start_line}-{self.end_line}|{self.symbol or ''}"
+
+
+@dataclass(slots=True)
+class FunctionRecord:
+    name: str
+    lineno: int
+    col_offset: int
+    end_lineno: Optional[int]
+    parent: Optional[str] = None
+    docstring: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "lineno": self.lineno,
+            "col_offset": self.col_offset,
+            "end_lineno": self.end_lineno,
+            "parent": self.parent,
+            "docstring": self.docstring,
+        }
+
+
+@dataclass(slots=True)
+class ClassRecord:
+    name: str
+    lineno: int
+    col_offset: int
+    end_lineno: Optional[int]
+    bases: List[str] = field(default_factory=list)
+    methods: List[FunctionRecord] = field(default_factory=list)
+    docstring: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "lineno": self.lineno,
+            "col_offset": self.col_offset,
+            "end_lineno": self.end_lineno,
+            "bases": self.bases,
+            "methods": [m.to_dict() for m in self.methods],
+            "docstring": self.docstring,
+        }
+
+
+class EdgeTable:
+    """Columnar relationship storage.
+
+    Sources and targets are indexes into a table of interned strings and
+    types are ``RELATIONSHIP_TYPES`` codes, all held in typed arrays.
+    """
+
+    __slots__ = ("strings", "_string_ids", "sources", "targets", "types")
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.sources = array("I")
+        self.targets = array("I")
+        self.types = array("B")
+
+    def intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def add(self, source: str, target: str, code: int) -> None:
+        self.sources.append(self.intern(source))
+        self.targets.append(self.intern(target))
+        self.types.append(code)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield ``(source, target, type name)`` per relationship."""
+        strings = self.strings
+        for source, target, code in zip(self.sources, self.targets, self.types):
+            yield strings[source], strings[target], RELATIONSHIP_TYPES[code]
+
+
+@dataclass(slots=True)
+class CompactFile:
+    path: str
+    classes: List[ClassRecord]
+    functions: List[FunctionRecord]
+    edges: EdgeTable
+    docstring: Optional[str] = None
+    chunks: List[ChunkRecord] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The ``MCPFile`` layout as plain dicts and lists."""
+        path = self.path
+        return {
+            "path": path,
+            "classes": [c.to_dict() for c in self.classes],
+            "functions": [f.to_dict() for f in self.functions],
+            "relationships": [
+                {"source": source, "target": target, "type": type, "location": path}
+                for source, target, type in self.edges
+            ],
+            "docstring": self.docstring,
+            "chunks": [c.to_dict() for c in self.chunks],
+        }
+
+
+def first_line(node: Any) -> int:
+    # Decorators belong to the definition's source.
+    decorators = getattr(node, "decorator_list", None)
+    lineno: int = decorators[0].lineno if decorators else node.lineno
+    return lineno
+
+
+def definition_span(kind: str, node: Any, parent: Optional[str]) -> SourceSpan:
+    return SourceSpan(kind, node.name, parent, first_line(node), node.col_offset, node.end_lineno, node.end_col_offset)
+
+
+def _definition(tree: ast.Module, qualified_name: str) -> Optional[ast.stmt]:
+    """The (last) definition of ``Class.method``-style ``qualified_name`` in ``tree``."""
+    node: Optional[ast.stmt] = None
+    body: List[ast.stmt] = tree.body
+    for part in qualified_name.split("."):
+        node = None
+        for stmt in body:
+            if isinstance(stmt, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) and stmt.name == part:
+                node = stmt
+        if node is None:
+            return None
+        body = node.body
+    return node
+
+
+# (class name, its method names, its base names) for one ClassDef
+ClassFacts = Tuple[str, Dict[str, None], List[str]]
+
+
+def resolve_overrides(classes: Iterable[ClassFacts], known: Iterable[ClassFacts] = ()) -> Iterator[Tuple[str, str]]:
+    """``(Class.method, Base.method)`` for methods redefining one of a base in the same file.
+
+    ``classes`` are in visit order; the last definition of a class name is
+    the one its subclasses are checked against. ``known`` classes only
+    serve as bases.
+    """
+    order: List[str] = []
+    methods: Dict[str, Dict[str, None]] = {name: class_methods for name, class_methods, _ in known}
+    bases: Dict[str, List[str]] = {}
+    for name, class_methods, class_bases in classes:
+        order.append(name)
+        methods[name] = class_methods
+        bases[name] = class_bases
+    for class_name in order:
+        this_methods = methods[class_name]
+        for base_name in bases[class_name]:
+            base_methods = methods.get(base_name, {})
+            for m in this_methods:
+                if m in base_methods:
+                    yield f"{class_name}.{m}", f"{base_name}.{m}"
+
+
+def selected_lines(tree: ast.Module, selection: Selection) -> Optional[Tuple[int, int]]:
+    """The line range ``selection`` restricts ``tree`` to, if any."""
+    start, end = selection.start_line or 1, selection.end_line or 2**31
+    if selection.symbol:
+        node = _definition(tree, selection.symbol)
+        if node is None:
+            raise SelectionError(f"no definition named {selection.symbol!r}")
+        start, end = max(start, first_line(node)), min(end, node.end_lineno or end)
+    elif selection.start_line is None and selection.end_line is None:
+        return None
+    return start, end
+
+
+class ExtractionVisitor(ast.NodeVisitor):
+    """Single-pass extraction of the symbol table and relationships of a module.
+
+    Classes and functions are collected the way the symbol table has always
+    reported them: only definitions sitting directly in a module, class or
+    function body are listed, methods (and their inner functions) belong to
+    their class, and classes defined inside functions are left out.
+    Relationships are collected for the whole tree. Override edges need every
+    class of the file, so they are resolved from the collected tables in
+    ``finish``. With ``collect_spans`` the source span of every listed
+    class and function is recorded too.
+
+    ``relationships`` limits the relationship types recorded; without
+    ``calls`` only statements are walked, never expressions, as no other
+    relationship comes from inside one. ``lines`` skips body statements
+    outside that range. Expressions are walked with an explicit stack: a
+    long ``a + b + ...`` chain is as deep as it is long.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        collect_spans: bool = False,
+        relationships: Optional[FrozenSet[str]] = None,
+        lines: Optional[Tuple[int, int]] = None
+    ) -> None:
+        self.filename = filename
+        self.classes: List[ClassRecord] = []
+        self.functions: List[FunctionRecord] = []
+        self.spans: Optional[List[SourceSpan]] = [] if collect_spans else None
+        self.edges = EdgeTable()
+        self._relate: Callable[[str, str, int], None] = self.edges.add
+        self._wanted = [True] * len(RELATIONSHIP_TYPES)
+        if relationships is not None:
+            unknown = relationships.difference(RELATIONSHIP_CODES)
+            if unknown:
+                raise SelectionError(f"unknown relationship types: {', '.join(sorted(unknown))}")
+            self._wanted = [name in relationships for name in RELATIONSHIP_TYPES]
+            self._relate = self._relate_selected
+        self._expressions = self._wanted[CALLS]
+        self._lines = lines
+        # Every ClassDef seen, in visit order, plus the last definition of
+        # each class name: its method names and its base names.
+        self._class_order: List[str] = []
+        self._class_methods: Dict[str, Dict[str, None]] = {}
+        self._class_bases: Dict[str, List[str]] = {}
+        self._enclosing_class: Optional[str] = None
+        self._known: List[ClassFacts] = []  # see visit_definition
+
+    def _relate_selected(self, source: str, target: str, code: int) -> None:
+        if self._wanted[code]:
+            self.edges.add(source, target, code)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if self._expressions:
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, _STATEMENT_NODES):
+                    self.visit(child)
+                else:
+                    self._visit_expression(child)
+            return
+        # Statement bodies only; handlers and match cases hold statements too.
+        for name in _STATEMENT_FIELDS:
+            for child in getattr(node, name, ()):
+                if isinstance(child, ast.stmt):
+                    self.visit(child)
+                else:
+                    self.generic_visit(child)
+
+    def visit_body(
+        self,
+        body: List[ast.stmt],
+        class_sink: Optional[List[ClassRecord]],
+        function_sink: Optional[List[FunctionRecord]],
+        parent: Optional[str]
+    ) -> None:
+        """Visit a statement list whose direct definitions go to the given sinks.
+
+        A sink of None means definitions at that level are not part of the
+        symbol table.
+        """
+        lines = self._lines
+        for stmt in body:
+            if lines is not None and ((stmt.end_lineno or stmt.lineno) < lines[0] or first_line(stmt) > lines[1]):
+                continue
+            if isinstance(stmt, ast.ClassDef):
+                self._visit_class(stmt, class_sink, parent)
+            elif isinstance(stmt, ast.FunctionDef):
+                self._visit_function(stmt, function_sink, parent)
+            else:
+                self.visit(stmt)
+
+    def visit_definition(
+        self,
+        node: ast.stmt,
+        parent: Optional[str] = None,
+        enclosing_class: Optional[str] = None,
+        known_classes: Iterable[ast.ClassDef] = ()
+    ) -> None:
+        """Extract one definition on its own, as if met in a body listed under ``parent``.
+
+        ``known_classes`` are other classes of the module whose methods a
+        class's overrides are resolved against in ``finish``.
+        """
+        self._known = [
+            (known.name, dict.fromkeys(item.name for item in known.body if isinstance(item, ast.FunctionDef)), [])
+            for known in known_classes
+        ]
+        self._enclosing_class = enclosing_class
+        if isinstance(node, ast.ClassDef):
+            self._visit_class(node, self.classes, parent)
+        elif isinstance(node, ast.FunctionDef):
+            self._visit_function(node, self.functions, parent)
+        else:
+            self.visit(node)
+
+    def visit_Module(self, node: ast.Module) -> None:
+        self.visit_body(node.body, self.classes, self.functions, None)
+
+    # Definitions reached through any other statement (if/try/with/...) are
+    # not part of the symbol table but still contribute relationships.
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._visit_class(node, None, None)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node, None, None)
+
+    def _visit_class(
+        self,
+        node: ast.ClassDef,
+        class_sink: Optional[List[ClassRecord]],
+        parent: Optional[str]
+    ) -> None:
+        bases = [base.id for base in node.bases if isinstance(base, ast.Name)]
+        methods: Dict[str, None] = {}
+        for base_name in bases:
+            self._relate(node.name, base_name, INHERITS)
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                methods[item.name] = None
+                for deco in item.decorator_list:
+                    if isinstance(deco, ast.Name) and deco.id in _NAME_DECORATORS:
+                        self._relate(node.name, item.name, _NAME_DECORATORS[deco.id])
+                    elif isinstance(deco, ast.Attribute) and deco.attr in _ATTRIBUTE_DECORATORS:
+                        self._relate(node.name, item.name, _ATTRIBUTE_DECORATORS[deco.attr])
+        self._class_order.append(node.name)
+        self._class_methods[node.name] = methods
+        self._class_bases[node.name] = bases
+
+        if self._expressions:
+            for expr in (*node.decorator_list, *node.bases, *node.keywords):
+                self.visit(expr)
+
+        method_sink: Optional[List[FunctionRecord]] = None
+        if class_sink is not None:
+            record = ClassRecord(
+                name=node.name,
+                lineno=node.lineno,
+                col_offset=node.col_offset,
+                end_lineno=getattr(node, "end_lineno", None),
+                bases=bases,
+                docstring=ast.get_docstring(node)
+            )
+            class_sink.append(record)
+            method_sink = record.methods
+            if self.spans is not None:
+                self.spans.append(definition_span("class", node, parent))
+
+        enclosing = self._enclosing_class
+        self._enclosing_class = node.name
+        self.visit_body(node.body, class_sink, method_sink, node.name)
+        self._enclosing_class = enclosing
+
+    def _visit_function(
+        self,
+        node: ast.FunctionDef,
+        function_sink: Optional[List[FunctionRecord]],
+        parent: Optional[str]
+    ) -> None:
+        if function_sink is not None:
+            function_sink.append(FunctionRecord(
+                name=node.name,
+                lineno=node.lineno,
+                col_offset=node.col_offset,
+                end_lineno=getattr(node, "end_lineno", None),
+                parent=parent,
+                docstring=ast.get_docstring(node)
+            ))
+            if self.spans is not None:
+                self.spans.append(definition_span("function", node, parent))
+        if self._expressions:
+            for expr in (*node.decorator_list, node.args, node.returns):
+                if expr is not None:
+                    self.visit(expr)
+        # Inner functions are listed alongside the function itself; classes
+        # defined inside a function are not part of the symbol table.
+        self.visit_body(node.body, None, function_sink, parent)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self._relate(self.filename, alias.name, IMPORTS)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        for alias in node.names:
+            target = f"{node.module}.{alias.name}" if node.module else alias.name
+            self._relate(self.filename, target, FROM_IMPORTS)
+
+    def _assigned_name(self, target: ast.expr) -> Optional[str]:
+        if isinstance(target, ast.Name):
+            return target.id
+        if isinstance(target, ast.Attribute):
+            return target.attr
+        return None
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        # Composition: self.x = ClassName()
+        if isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name):
+            for t in node.targets:
+                if isinstance(t, ast.Attribute) and isinstance(t.value, ast.Name) and t.value.id == 'self':
+                    self._relate(self._enclosing_class or self.filename, node.value.func.id, COMPOSES)
+        for t in node.targets:
+            name = self._assigned_name(t)
+            if name:
+                self._relate(self.filename, name, ASSIGNS)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        name = self._assigned_name(node.target)
+        if name:
+            self._relate(self.filename, name, ASSIGNS)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        name = self._assigned_name(node.target)
+        if name:
+            self._relate(self.filename, name, ASSIGNS)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        self._visit_expression(node)
+
+    def _visit_expression(self, node: ast.AST) -> None:
+        """Record the calls in an expression, depth-first in source order."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, ast.Call):
+                self._visit_call(node)
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+    def _visit_call(self, node: ast.Call) -> None:
+        func_name = self._assigned_name(node.func)
+        if func_name:
+            self._relate(self.filename, func_name, CALLS)
+
+    def class_facts(self, start: int = 0) -> List[ClassFacts]:
+        """Facts of the classes visited from the ``start``-th on, for ``resolve_overrides``."""
+        return [(name, self._class_methods[name], self._class_bases[name]) for name in self._class_order[start:]]
+
+    def class_count(self) -> int:
+        return len(self._class_order)
+
+    def finish(self) -> EdgeTable:
+        """Resolve method override edges and return all relationships."""
+        if self._wanted[OVERRIDES]:
+            for source, target in resolve_overrides(self.class_facts(), self._known):
+                self._relate(source, target, OVERRIDES)
+        self._class_order = []
+        return self.edges
+
+
+def extract_compact(
+    tree: ast.Module,
+    path: str,
+    source: Optional[Any] = None,
+    max_chunk_lines: Optional[int] = None,
+    encoding: Optional[str] = None,
+    selection: Optional[Selection] = None
+) -> CompactFile:
+    """Extract a parsed module; pass its ``source`` to get source chunks too.
+
+    ``source`` is the text, bytes or other buffer (such as an mmap) ``tree``
+    was parsed from, in ``encoding`` if known. Chunks longer than
+    ``max_chunk_lines`` are split into parts. A ``selection`` naming a
+    symbol that is not defined raises ``SelectionError``.
+    """
+    visitor = ExtractionVisitor(
+        path,
+        collect_spans=source is not None,
+        relationships=selection.relationships if selection else None,
+        lines=selected_lines(tree, selection) if selection else None
+    )
+    visitor.visit(tree)
+    chunks: List[ChunkRecord] = []
+    if source is not None and visitor.spans:
+        chunks = source_chunks(utf8_source(source, encoding), visitor.spans, max_chunk_lines)
+    return CompactFile(
+        path=path,
+        classes=visitor.classes,
+        functions=visitor.functions,
+        edges=visitor.finish(),
+        docstring=ast.get_docstring(tree),
+        chunks=chunks
+    )
+
+
+def outline_compact(buffer: Any, path: str) -> CompactFile:
+    """Degraded extraction for files too large to parse: top-level names only.
+
+    A regex scan over the raw buffer lists classes and functions defined at
+    column 0 with their line numbers; there are no methods, docstrings, end
+    lines or relationships.
+    """
+    offsets = LineIndex(buffer).offsets
+    classes: List[ClassRecord] = []
+    functions: List[FunctionRecord] = []
+    for match in _TOP_LEVEL_DEF.finditer(buffer):
+        lineno = bisect_right(offsets, match.start())
+        name = match.group(2).decode("ascii")
+        if match.group(1) == b"class":
+            classes.append(ClassRecord(name=name, lineno=lineno, col_offset=0, end_lineno=None))
+        else:
+            functions.append(FunctionRecord(name=name, lineno=lineno, col_offset=0, end_lineno=None))
+    return CompactFile(path=path, classes=classes, functions=functions, edges=EdgeTable())
+
+
+def extract_file(
+    path: str,
+    include_source: bool = False,
+    max_chunk_lines: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    oversize: str = "skip",
+    selection: Optional[Selection] = None
+) -> CompactFile:
+    """Read, parse and extract one file without decoding it to text.
+
+    Files over ``max_bytes`` raise ``FileTooLargeError``, or with
+    ``oversize="outline"`` get ``outline_compact`` instead.
+    """
+    try:
+        with open_source(path, max_bytes) as source:
+            with timed("parse"):
+                tree = ast.parse(source.data, filename=path)
+            with timed("extract"):
+                return extract_compact(
+                    tree, path, source.data if include_source else None, max_chunk_lines, source.encoding, selection
+                )
+    except FileTooLargeError:
+        if oversize != "outline":
+            raise
+    with open_source(path, None) as source, timed("outline"):
+        return outline_compact(source.data, path)
@@ -0,0 +1,268 @@
+"""In-process analytics over the relationship graph.
+
+Nodes are interned to integer ids and edges kept as parallel arrays; for
+each direction and relationship-type subset a deduplicated CSR adjacency
+(``indptr``, ``indices``) is built on first use. Breadth-first search
+expands a whole frontier per step with array operations, strongly
+connected components use an iterative Tarjan, and centrality is PageRank
+by power iteration. Adjacency, components and ranks are cached, so repeated
+queries on an unchanged graph cost only the query itself.
+"""
+import threading
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .extract import RELATIONSHIP_CODES
+from .models import MCPFile
+
+# (source, target, relationship type)
+Edge = Tuple[str, str, str]
+
+
+class CSR(NamedTuple):
+    indptr: np.ndarray  # node id -> offset of its first neighbour in indices; length n + 1
+    indices: np.ndarray  # neighbour ids, sorted per node
+
+
+def _codes(types: Optional[Iterable[str]]) -> Optional[FrozenSet[int]]:
+    if types is None:
+        return None
+    try:
+        return frozenset(RELATIONSHIP_CODES[name] for name in types)
+    except KeyError as exc:
+        raise ValueError(f"unknown relationship type: {exc.args[0]}") from None
+
+
+class RelationshipGraph:
+    """Directed multigraph of named nodes and typed edges. Safe to share between threads."""
+
+    def __init__(self, names: List[str], sources: np.ndarray, targets: np.ndarray, types: np.ndarray) -> None:
+        self.names = names
+        self.ids = {name: node for node, name in enumerate(names)}
+        self.sources = sources
+        self.targets = targets
+        self.types = types
+        self._csr: Dict[Tuple[Optional[FrozenSet[int]], bool], CSR] = {}
+        self._components: Dict[Optional[FrozenSet[int]], List[List[int]]] = {}
+        self._ranks: Dict[Optional[FrozenSet[int]], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Edge]) -> "RelationshipGraph":
+        ids: Dict[str, int] = {}
+        intern = ids.setdefault  # first occurrence gets the next id
+        codes = RELATIONSHIP_CODES
+        sources, targets, types = array("q"), array("q"), array("B")
+        for source, target, type in edges:
+            sources.append(intern(source, len(ids)))
+            targets.append(intern(target, len(ids)))
+            types.append(codes[type])
+        return cls(
+            list(ids),
+            np.frombuffer(sources, dtype=np.int64),
+            np.frombuffer(targets, dtype=np.int64),
+            np.frombuffer(types, dtype=np.uint8)
+        )
+
+    @classmethod
+    def from_files(cls, files: Iterable[MCPFile]) -> "RelationshipGraph":
+        """Graph of the file-local relationship strings of parse results."""
+        return cls.from_edges((rel.source, rel.target, rel.type) for file in files for rel in file.relationships)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.types)
+
+    def csr(self, types: Optional[Iterable[str]] = None, reverse: bool = False) -> CSR:
+        """Adjacency over edges of ``types`` (all when None), one entry per distinct edge."""
+        codes = _codes(types)
+        key = (codes, reverse)
+        with self._lock:
+            cached = self._csr.get(key)
+        if cached is not None:
+            return cached
+        sources, targets = (self.targets, self.sources) if reverse else (self.sources, self.targets)
+        if codes is not None:
+            mask = np.isin(self.types, np.fromiter(codes, dtype=np.uint8))
+            sources, targets = sources[mask], targets[mask]
+        n = len(self.names)
+        # One sort both deduplicates and groups the edges by source.
+        pairs = np.unique(sources * n + targets)
+        sources, indices = np.divmod(pairs, n) if n else (pairs, pairs)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        built = CSR(indptr, indices)
+        with self._lock:
+            self._csr[key] = built
+        return built
+
+    def node_ids(self, names: Iterable[str]) -> List[int]:
+        return [self.ids[name] for name in names if name in self.ids]
+
+    def bfs(self, start: Sequence[int], adjacency: CSR, max_depth: Optional[int] = None) -> np.ndarray:
+        """Hop count from ``start`` to every node (-1 when unreachable; 0 for ``start``)."""
+        indptr, indices = adjacency
+        depth = np.full(len(self.names), -1, dtype=np.int64)
+        frontier = np.unique(np.asarray(start, dtype=np.int64))
+        depth[frontier] = 0
+        level = 0
+        while frontier.size and (max_depth is None or level < max_depth):
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # Positions of every neighbour of the frontier, gathered without a Python loop.
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            neighbours = indices[offsets]
+            frontier = np.unique(neighbours[depth[neighbours] < 0])
+            level += 1
+            depth[frontier] = level
+        return depth
+
+    def reachable(
+        self,
+        name: str,
+        types: Optional[Iterable[str]] = None,
+        reverse: bool = False,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[int, List[Tuple[str, int]]]:
+        """How many nodes ``name`` reaches, and the first ``limit`` as ``(node, hops)``, nearest first.
+
+        With ``reverse`` edges are followed backwards: what reaches ``name``.
+        """
+        node = self.ids.get(name)
+        if node is None:
+            return 0, []
+        depth = self.bfs([node], self.csr(types, reverse), max_depth)
+        found = np.flatnonzero(depth > 0)
+        found = found[np.argsort(depth[found], kind="stable")][:limit]
+        names = self.names
+        return int(np.count_nonzero(depth > 0)), [(names[i], d) for i, d in zip(found.tolist(), depth[found].tolist())]
+
+    def strongly_connected_components(self, types: Optional[Iterable[str]] = None) -> List[List[int]]:
+        """Components with more than one node, or a self-loop, as node id lists."""
+        codes = _codes(types)
+        with self._lock:
+            cached = self._components.get(codes)
+        if cached is not None:
+            return cached
+        indptr_array, indices_array = self.csr(types)
+        indptr, indices = indptr_array.tolist(), indices_array.tolist()
+        n = len(self.names)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+        for root in range(n):
+            if index[root] != -1 or indptr[root] == indptr[root + 1]:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            # Explicit DFS stack of (node, position of the next edge to follow).
+            work = [(root, indptr[root])]
+            while work:
+                v, position = work[-1]
+                end = indptr[v + 1]
+                while position < end:
+                    w = indices[position]
+                    position += 1
+                    if index[w] == -1:
+                        work[-1] = (v, position)
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, indptr[w]))
+                        break
+                    if on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[v] < low[parent]:
+                            low[parent] = low[v]
+                    if low[v] == index[v]:
+                        component: List[int] = []
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            component.append(w)
+                            if w == v:
+                                break
+                        if len(component) > 1 or v in indices[indptr[v]:indptr[v + 1]]:
+                            components.append(component)
+        components.sort(key=len, reverse=True)
+        with self._lock:
+            self._components[codes] = components
+        return components
+
+    def cycles(self, types: Optional[Iterable[str]] = None) -> List[List[str]]:
+        """Names in each cyclic component (largest first), e.g. import cycles."""
+        names = self.names
+        return [sorted(names[i] for i in component) for component in self.strongly_connected_components(types)]
+
+    def pagerank(
+        self,
+        types: Optional[Iterable[str]] = None,
+        damping: float = 0.85,
+        tolerance: float = 1e-9,
+        max_iterations: int = 100
+    ) -> np.ndarray:
+        """PageRank of every node over distinct edges; dangling rank is spread evenly."""
+        codes = _codes(types)
+        with self._lock:
+            cached = self._ranks.get(codes)
+        if cached is not None:
+            return cached
+        n = len(self.names)
+        if not n:
+            return np.zeros(0)
+        indptr, targets = self.csr(types)
+        out_degree = np.diff(indptr)
+        sources = np.repeat(np.arange(n), out_degree)
+        weights = 1.0 / out_degree[sources]
+        dangling = out_degree == 0
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iterations):
+            spread = np.bincount(targets, weights=rank[sources] * weights, minlength=n)
+            updated = damping * (spread + rank[dangling].sum() / n) + (1.0 - damping) / n
+            converged = np.abs(updated - rank).sum() < tolerance
+            rank = updated
+            if converged:
+                break
+        with self._lock:
+            self._ranks[codes] = rank
+        return rank
+
+    def top_ranked(
+        self,
+        types: Optional[Iterable[str]] = None,
+        top: int = 20,
+        among: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """The ``top`` nodes by PageRank, optionally only those named in ``among``."""
+        if top <= 0:
+            return []
+        rank = self.pagerank(types)
+        candidates = np.arange(len(rank)) if among is None else np.asarray(self.node_ids(among), dtype=np.int64)
+        if not candidates.size:
+            return []
+        count = min(top, candidates.size)
+        best = candidates[np.argpartition(-rank[candidates], count - 1)[:count]]
+        best = best[np.argsort(-rank[best], kind="stable")]
+        return [(self.names[i], float(rank[i])) for i in best.tolist()]
+
+    def stats(self) -> Dict[str, int]:
+        return {"nodes": len(self.names), "edges": self.edge_count}
@@ -0,0 +1,370 @@
+"""Incremental re-extraction of a file after small edits.
+
+A full parse result is kept together with the file's text and one
+``Segment`` per top-level statement: its lines and the slice of the
+result's classes, functions and relationships it produced. After an edit,
+only the segments touching the edited lines are parsed again (as a module
+of their own, line numbers shifted into place); segments before the edit
+are reused as they are, and those after it have their line numbers moved
+by the number of lines added or removed. Override edges span classes of
+the whole file, so they are resolved again from every segment's class
+facts, which is cheap.
+
+When the edited region does not parse on its own (an edit opening a string
+or bracket that a later statement closes, say) or touches the encoding
+cookie, the whole file is parsed instead, so the result is always what a
+full parse would give.
+"""
+import ast
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .extract import OVERRIDES, RELATIONSHIP_TYPES, ClassFacts, ExtractionVisitor, first_line, resolve_overrides
+from .models import MCPClass, MCPFile, MCPFunction, MCPRelationship
+from hoh_parser.utils.metrics import timed
+
+# Lines as the tokenizer counts them, each with its terminator.
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+\Z")
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class DiffError(ValueError):
+    """A diff does not apply to the text it was given for."""
+
+
+class LineRangeError(ValueError):
+    """An edit's line range is not within the text it was given for."""
+
+
+def split_lines(text: str) -> List[str]:
+    return _LINE.findall(text)
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    start: int  # first line, including decorators
+    end: int
+    classes: int  # how many entries of the result's lists this statement produced
+    functions: int
+    relationships: int
+    class_facts: Tuple[ClassFacts, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class LineEdit:
+    """Old lines ``start``..``end`` (1-based, inclusive) became ``lines``.
+
+    ``end == start - 1`` inserts before ``start``.
+    """
+    start: int
+    end: int
+    lines: Tuple[str, ...]
+
+
+def parse_unified_diff(diff: str, old_lines: Sequence[str]) -> Tuple[List[str], LineEdit]:
+    """Apply a unified diff to ``old_lines``; the new lines and one edit spanning every hunk.
+
+    Context and removed lines must match ``old_lines`` (``DiffError`` if not).
+    """
+    new_lines: List[str] = []
+    position = 0  # old lines copied so far
+    first: Optional[int] = None
+    last = 0
+    tag_before = " "
+    lines = split_lines(diff)
+    i = 0
+    while i < len(lines):
+        match = _HUNK.match(lines[i])
+        i += 1
+        if match is None:
+            continue  # ---/+++ headers and anything else outside hunks
+        old_start, old_count = int(match.group(1)), int(match.group(2) or 1)
+        # A hunk removing nothing names the line it inserts after.
+        hunk_start = old_start if old_count else old_start + 1
+        if hunk_start - 1 < position:
+            raise DiffError("diff hunks overlap or are out of order")
+        new_lines.extend(old_lines[position:hunk_start - 1])
+        position = hunk_start - 1
+        first = hunk_start if first is None else first
+        while i < len(lines) and not lines[i].startswith("@@"):
+            line = lines[i]
+            i += 1
+            tag, body = line[:1], line[1:]
+            if tag == "\\":  # "\ No newline at end of file" for the line before
+                if new_lines and tag_before in " +":
+                    new_lines[-1] = new_lines[-1].rstrip("\r\n")
+                continue
+            tag_before = tag
+            if tag in " -":
+                if position >= len(old_lines) or old_lines[position].rstrip("\r\n") != body.rstrip("\r\n"):
+                    raise DiffError(f"diff does not apply at line {position + 1}")
+                if tag == " ":
+                    new_lines.append(old_lines[position])
+                position += 1
+            elif tag == "+":
+                new_lines.append(body)
+            elif line.strip():
+                raise DiffError(f"unexpected diff line: {line!r}")
+        last = position
+    if first is None:
+        return list(old_lines), LineEdit(1, 0, ())
+    new_lines.extend(old_lines[position:])
+    added = len(new_lines) - len(old_lines)
+    return new_lines, LineEdit(first, last, tuple(new_lines[first - 1:last + added]))
+
+
+def changed_lines(old_lines: Sequence[str], new_lines: Sequence[str]) -> LineEdit:
+    """The smallest single edit turning ``old_lines`` into ``new_lines``."""
+    prefix = 0
+    limit = min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    return LineEdit(prefix + 1, len(old_lines) - suffix, tuple(new_lines[prefix:len(new_lines) - suffix]))
+
+
+def _shift_function(function: MCPFunction, delta: int) -> MCPFunction:
+    return function.model_copy(update={
+        "lineno": function.lineno + delta,
+        "end_lineno": None if function.end_lineno is None else function.end_lineno + delta,
+    })
+
+
+def _shift_class(cls: MCPClass, delta: int) -> MCPClass:
+    return cls.model_copy(update={
+        "lineno": cls.lineno + delta,
+        "end_lineno": None if cls.end_lineno is None else cls.end_lineno + delta,
+        "methods": [_shift_function(m, delta) for m in cls.methods],
+    })
+
+
+class IncrementalFile:
+    """A file's text, its parse result and the per-statement segments of that result."""
+
+    def __init__(
+        self,
+        path: str,
+        lines: List[str],
+        result: MCPFile,
+        segments: List[Segment],
+        overrides: int
+    ) -> None:
+        self.path = path
+        self.lines = lines
+        self.result = result
+        self.segments = segments
+        self.overrides = overrides  # override edges at the end of result.relationships
+        self.reparsed_lines = len(lines)  # lines parsed to produce this state
+
+    @property
+    def text(self) -> str:
+        return "".join(self.lines)
+
+    @classmethod
+    def parse(cls, path: str, text: str) -> "IncrementalFile":
+        """Parse ``text`` in full; raises ``SyntaxError`` as ``ast.parse`` does."""
+        lines = split_lines(text)
+        with timed("parse"):
+            tree = ast.parse(text, filename=path)
+        with timed("extract"):
+            classes, functions, relationships, segments = cls._extract(path, tree.body)
+            overrides = cls._overrides(path, segments)
+        result = MCPFile(
+            path=path,
+            classes=classes,
+            functions=functions,
+            relationships=relationships + overrides,
+            docstring=ast.get_docstring(tree)
+        )
+        return cls(path, lines, result, segments, len(overrides))
+
+    @staticmethod
+    def _extract(
+        path: str,
+        body: List[ast.stmt]
+    ) -> Tuple[List[MCPClass], List[MCPFunction], List[MCPRelationship], List[Segment]]:
+        """Extract top-level statements one at a time, recording what each produced."""
+        visitor = ExtractionVisitor(path)
+        segments: List[Segment] = []
+        edges = visitor.edges
+        for stmt in body:
+            before = (len(visitor.classes), len(visitor.functions), len(edges), visitor.class_count())
+            visitor.visit_body([stmt], visitor.classes, visitor.functions, None)
+            segments.append(Segment(
+                start=first_line(stmt),
+                end=stmt.end_lineno or stmt.lineno,
+                classes=len(visitor.classes) - before[0],
+                functions=len(visitor.functions) - before[1],
+                relationships=len(edges) - before[2],
+                class_facts=tuple(visitor.class_facts(before[3]))
+            ))
+        classes = [MCPClass.model_validate(c.to_dict()) for c in visitor.classes]
+        functions = [MCPFunction.model_validate(f.to_dict()) for f in visitor.functions]
+        relationships = [
+            MCPRelationship(source=source, target=target, type=type, location=path)  # type: ignore[arg-type]
+            for source, target, type in edges
+        ]
+        return classes, functions, relationships, segments
+
+    @staticmethod
+    def _overrides(path: str, segments: Sequence[Segment]) -> List[MCPRelationship]:
+        facts = [fact for segment in segments for fact in segment.class_facts]
+        return [
+            MCPRelationship(source=source, target=target, type=RELATIONSHIP_TYPES[OVERRIDES], location=path)  # type: ignore[arg-type]
+            for source, target in resolve_overrides(facts)
+        ]
+
+    def apply_diff(self, diff: str) -> "IncrementalFile":
+        new_lines, edit = parse_unified_diff(diff, self.lines)
+        return self._apply(new_lines, edit)
+
+    def update(self, text: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> "IncrementalFile":
+        """The state for the new ``text``.
+
+        ``start_line``..``end_line`` (old line numbers) bound the edit when
+        known; every line outside them must be unchanged. Otherwise the
+        changed lines are found by comparing the texts. A range outside the
+        old text, or one the new text is too short for, raises
+        ``LineRangeError``.
+        """
+        new_lines = split_lines(text)
+        if start_line is None or end_line is None:
+            edit = changed_lines(self.lines, new_lines)
+        else:
+            added = len(new_lines) - len(self.lines)
+            if not 1 <= start_line <= end_line + 1 <= len(self.lines) + 1 or end_line + added < start_line - 1:
+                raise LineRangeError(
+                    f"lines {start_line}..{end_line} are not an edit of a {len(self.lines)}-line file"
+                    f" into a {len(new_lines)}-line one"
+                )
+            edit = LineEdit(start_line, end_line, tuple(new_lines[start_line - 1:end_line + added]))
+        return self._apply(new_lines, edit)
+
+    def _apply(self, new_lines: List[str], edit: LineEdit) -> "IncrementalFile":
+        if edit.start > edit.end and not edit.lines:
+            return self
+        # The encoding cookie may only be on the first two lines.
+        if edit.start <= 2:
+            return IncrementalFile.parse(self.path, "".join(new_lines))
+        segments = self.segments
+        # Segments touching the edit or right next to it: a line added after a
+        # function may belong to its body, one added before it may decorate it.
+        first = 0
+        while first < len(segments) and segments[first].end < edit.start - 1:
+            first += 1
+        last = first
+        while last < len(segments) and segments[last].start <= edit.end + 1:
+            last += 1
+        start, end = edit.start, edit.end
+        if first < last:
+            start, end = min(start, segments[first].start), max(end, segments[last - 1].end)
+        # Statements sharing a line with the region (``a = 1; b = 2``) join it.
+        while first > 0 and segments[first - 1].end >= start:
+            first -= 1
+            start = min(start, segments[first].start)
+        while last < len(segments) and segments[last].start <= end:
+            end = max(end, segments[last].end)
+            last += 1
+        delta = len(new_lines) - len(self.lines)
+        try:
+            with timed("parse"):
+                tree = ast.parse("".join(new_lines[start - 1:end + delta]), filename=self.path)
+        except SyntaxError:
+            return IncrementalFile.parse(self.path, "".join(new_lines))
+        ast.increment_lineno(tree, start - 1)
+        with timed("extract"):
+            state = self._splice(new_lines, first, last, delta, *self._extract(self.path, tree.body))
+        state.reparsed_lines = end + delta - start + 1
+        if first == 0:
+            # The module docstring comes from the first statement, which may have changed.
+            head = state.segments[0] if state.segments else None
+            docstring = None
+            if head is not None:
+                docstring = ast.get_docstring(ast.parse("".join(new_lines[head.start - 1:head.end])))
+            state.result = state.result.model_copy(update={"docstring": docstring})
+        return state
+
+    def _splice(
+        self,
+        new_lines: List[str],
+        first: int,
+        last: int,
+        delta: int,
+        classes: List[MCPClass],
+        functions: List[MCPFunction],
+        relationships: List[MCPRelationship],
+        region_segments: List[Segment]
+    ) -> "IncrementalFile":
+        """A new state with segments ``first``..``last - 1`` replaced and the ones after shifted."""
+        segments = self.segments
+        result = self.result
+        before = [sum(s.classes for s in segments[:first]), sum(s.functions for s in segments[:first])]
+        edges_before = sum(s.relationships for s in segments[:first])
+        removed = segments[first:last]
+        after = [before[0] + sum(s.classes for s in removed), before[1] + sum(s.functions for s in removed)]
+        edges_after = edges_before + sum(s.relationships for s in removed)
+        after_classes = result.classes[after[0]:]
+        after_functions = result.functions[after[1]:]
+        after_segments = segments[last:]
+        if delta:
+            after_classes = [_shift_class(c, delta) for c in after_classes]
+            after_functions = [_shift_function(f, delta) for f in after_functions]
+            after_segments = [replace(s, start=s.start + delta, end=s.end + delta) for s in after_segments]
+        new_segments = segments[:first] + region_segments + after_segments
+        overrides = self._overrides(self.path, new_segments)
+        # Every entry is already a validated model.
+        new_result = MCPFile.model_construct(
+            path=self.path,
+            classes=result.classes[:before[0]] + classes + after_classes,
+            functions=result.functions[:before[1]] + functions + after_functions,
+            relationships=(
+                result.relationships[:edges_before]
+                + relationships
+                + result.relationships[edges_after:len(result.relationships) - self.overrides]
+                + overrides
+            ),
+            docstring=result.docstring
+        )
+        return IncrementalFile(self.path, new_lines, new_result, new_segments, len(overrides))
+
+
+class IncrementalCache:
+    """Incremental states of recently edited files. Safe to share between threads."""
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self.incremental = 0
+        self.full = 0
+        self._entries: "OrderedDict[str, IncrementalFile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[IncrementalFile]:
+        with self._lock:
+            state = self._entries.get(path)
+            if state is not None:
+                self._entries.move_to_end(path)
+            return state
+
+    def put(self, state: IncrementalFile) -> None:
+        with self._lock:
+            if state.reparsed_lines < len(state.lines):
+                self.incremental += 1
+            else:
+                self.full += 1
+            self._entries[state.path] = state
+            self._entries.move_to_end(state.path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "incremental": self.incremental, "full": self.full}
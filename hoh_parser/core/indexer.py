@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .directory import DEFAULT_CHUNKSIZE, iter_parse_paths
+from .models import MCPFile, MCPIndexDelta, MCPParseError
+from .parser import PARSER_VERSION
+from hoh_parser.utils.discovery import iter_source_files
+
+MANIFEST_VERSION = 1
+
+# path -> (mtime_ns, size, sha256 of the content)
+Manifest = Dict[str, Tuple[int, int, str]]
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class IncrementalIndexer:
+    """Re-index a directory, parsing only files added or changed since last time.
+
+    A manifest of path -> (mtime, size, hash) is kept between runs (in
+    ``manifest_path`` when given, otherwise only on the instance). Files whose
+    mtime and size are unchanged are not even read; files whose stat changed
+    but whose content hash did not are not re-parsed. Files that fail to
+    parse are left out of the manifest, so every run reports them again until
+    they are fixed. The manifest is discarded when it was written by a
+    different parser version.
+    ``discover(root)`` lists the files to index on each run.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        manifest_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        discover: Callable[[str], Iterable[str]] = iter_source_files
+    ) -> None:
+        self.root = root
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self.discover = discover
+        self.manifest: Manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Manifest:
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION or data.get("parser_version") != PARSER_VERSION:
+            return {}
+        return {path: (entry[0], entry[1], entry[2]) for path, entry in data["files"].items()}
+
+    def save_manifest(self) -> None:
+        if not self.manifest_path:
+            return
+        data = {
+            "version": MANIFEST_VERSION,
+            "parser_version": PARSER_VERSION,
+            "root": self.root,
+            "files": self.manifest,
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def reindex(self) -> MCPIndexDelta:
+        """Bring the manifest up to date and return what changed."""
+        manifest: Manifest = {}
+        to_parse: List[str] = []
+        unchanged = 0
+        for path in self.discover(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            previous = self.manifest.get(path)
+            if previous is not None and previous[:2] == (st.st_mtime_ns, st.st_size):
+                manifest[path] = previous
+                unchanged += 1
+                continue
+            try:
+                digest = _file_digest(path)
+            except OSError:
+                continue
+            manifest[path] = (st.st_mtime_ns, st.st_size, digest)
+            if previous is not None and previous[2] == digest:
+                unchanged += 1
+            else:
+                to_parse.append(path)
+
+        changed: List[MCPFile] = []
+        errors: List[MCPParseError] = []
+        # A handful of edits is parsed faster in-process than by starting a pool.
+        workers = self.workers if len(to_parse) > DEFAULT_CHUNKSIZE else 1
+        for path, payload, error in iter_parse_paths(sorted(to_parse), workers=workers):
+            if payload is not None:
+                changed.append(MCPFile.model_validate_json(payload))
+            else:
+                errors.append(MCPParseError(path=path, error=error or ""))
+
+        deleted = sorted(set(self.manifest) - set(manifest))
+        for failed in errors:
+            del manifest[failed.path]
+        self.manifest = manifest
+        self.save_manifest()
+        return MCPIndexDelta(
+            root=self.root,
+            changed=changed,
+            deleted=deleted,
+            errors=errors,
+            unchanged=unchanged
+        )
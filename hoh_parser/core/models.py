@@ -18,19 +18,126 @@ class MCPClass(BaseModel):
     methods: List[MCPFunction] = []
     docstring: Optional[str] = None
 
+RelationshipType = Literal[
+    "defines", "calls", "inherits", "imports", "from-imports", "assigns",
+    "overrides", "property", "property_setter", "property_deleter",
+    "staticmethod", "classmethod", "composes"
+]
+
 class MCPRelationship(BaseModel):
     source: str
     target: str
-    type: Literal[
-        "defines", "calls", "inherits", "imports", "from-imports", "assigns",
-        "overrides", "property", "property_setter", "property_deleter",
-        "staticmethod", "classmethod", "composes"
-    ]
+    type: RelationshipType
     location: Optional[str] = None  # file or module
 
+class MCPSymbol(BaseModel):
+    path: str
+    qualified_name: str  # "func" or "Class.method", as requested
+    kind: Literal["class", "function"]
+    parent: Optional[str] = None  # enclosing class, as in the symbol table
+    lineno: int
+    end_lineno: Optional[int]
+    docstring: Optional[str] = None
+    bases: List[str] = []  # classes only
+    members: List[MCPFunction] = []  # a class's methods, or the functions nested in a function
+    relationships: List[MCPRelationship] = []  # from this definition's body only
+    source_code: Optional[str] = None  # only when requested
+
+class MCPSourceChunk(BaseModel):
+    name: str
+    kind: Literal["class", "function"]
+    parent: Optional[str] = None
+    lineno: int  # first line, including decorators
+    end_lineno: int
+    source_code: str
+    part: int = 0  # large symbols are split into ``parts`` consecutive chunks
+    parts: int = 1
+
 class MCPFile(BaseModel):
     path: str
     classes: List[MCPClass] = []
     functions: List[MCPFunction] = []
     relationships: List[MCPRelationship] = []
     docstring: Optional[str] = None
+    chunks: List[MCPSourceChunk] = []  # only when source was requested
+
+class MCPCompactFile(BaseModel):
+    """Compact wire form of ``MCPFile``.
+
+    ``relationships`` holds three integers per relationship: the indexes of
+    its source and target in ``strings`` and of its type in ``types``. The
+    location of every relationship is ``path``.
+    """
+    format: Literal["compact"] = "compact"
+    path: str
+    classes: List[MCPClass] = []
+    functions: List[MCPFunction] = []
+    strings: List[str] = []
+    types: List[str] = []
+    relationships: List[int] = []  # source, target, type, source, ...
+    docstring: Optional[str] = None
+    chunks: List[MCPSourceChunk] = []
+
+class MCPSelection(BaseModel):
+    """What to extract from a file; unset fields select everything."""
+    relationship_types: Optional[List[RelationshipType]] = None
+    symbols_only: bool = False  # classes and functions, no relationships
+    start_line: Optional[int] = None  # statements overlapping the range
+    end_line: Optional[int] = None
+    symbol: Optional[str] = None  # "func" or "Class.method"
+
+class MCPParseError(BaseModel):
+    path: str
+    error: str
+
+class MCPDirectory(BaseModel):
+    root: str
+    files: List[MCPFile] = []
+    errors: List[MCPParseError] = []
+
+class MCPIndexDelta(BaseModel):
+    root: str
+    changed: List[MCPFile] = []   # added or modified files, freshly parsed
+    deleted: List[str] = []       # tombstones: paths that no longer exist
+    errors: List[MCPParseError] = []
+    unchanged: int = 0
+
+class MCPParseResult(BaseModel):
+    path: str
+    file: Optional[MCPFile] = None
+    error: Optional[str] = None
+
+class MCPDefinition(BaseModel):
+    qualified_name: str  # module.Class.method
+    kind: Literal["class", "function", "method"]
+    path: str
+    lineno: int
+    end_lineno: Optional[int]
+    bases: List[str] = []  # classes only; resolved where possible
+
+class MCPGraphNode(BaseModel):
+    name: str
+    depth: int  # hops from the queried node
+
+class MCPReachability(BaseModel):
+    name: str
+    total: int  # nodes reached; ``nodes`` holds at most the requested limit
+    nodes: List[MCPGraphNode] = []
+
+class MCPRankedNode(BaseModel):
+    name: str
+    score: float
+
+class MCPSimilarSymbol(BaseModel):
+    path: str
+    name: str  # "func" or "Class.method"
+    kind: Literal["class", "function"]
+    lineno: int
+    end_lineno: int
+    score: float  # cosine similarity to the query
+
+class MCPCallSite(BaseModel):
+    caller: str  # qualified name of the calling function, or the module
+    callee: str  # qualified name of the resolved target
+    path: str
+    lineno: int
@@ -0,0 +1,162 @@
+"""On-demand extraction of single symbols.
+
+An agent often needs one class out of a very large module. ``OutlineCache``
+parses a file once and keeps its tree plus a map of its top-level
+definitions; ``get_symbol`` then walks down to the requested definition
+and extracts only that subtree (members, docstring, relationships and,
+optionally, source). Each result is memoized, and entries are checked
+against the file's size and modification time, so after the first touch
+a lookup costs a ``stat`` and a dict access whatever the file's size.
+"""
+import ast
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Literal, Optional, Tuple, Union
+
+from .chunks import LineIndex, iter_chunks, utf8_source
+from .extract import ExtractionVisitor, definition_span
+from .models import MCPFunction, MCPRelationship, MCPSymbol
+from hoh_parser.utils.file_ops import DEFAULT_MAX_FILE_BYTES, open_source
+from hoh_parser.utils.metrics import timed
+
+Definition = Union[ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef]
+_DEFINITIONS = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+class SymbolNotFoundError(ValueError):
+    """``path`` has no definition named ``qualified_name``."""
+
+    def __init__(self, path: str, qualified_name: str) -> None:
+        super().__init__(f"no definition named {qualified_name!r} in {path}")
+        self.path = path
+        self.qualified_name = qualified_name
+
+
+def _members(body: List[ast.stmt]) -> Dict[str, Definition]:
+    """Definitions directly in ``body`` by name; the last one wins, as at runtime."""
+    return {stmt.name: stmt for stmt in body if isinstance(stmt, _DEFINITIONS)}
+
+
+class FileOutline:
+    """One parsed file: its tree, its UTF-8 source and its top-level definitions. Safe to share between threads."""
+
+    def __init__(self, path: str, tree: ast.Module, source: bytes, stamp: Tuple[int, int]) -> None:
+        self.path = path
+        self.tree = tree
+        self.source = source
+        self.stamp = stamp  # (st_size, st_mtime_ns) the tree was parsed from
+        self.top_level = _members(tree.body)
+        self._symbols: Dict[Tuple[str, bool], MCPSymbol] = {}
+        self._lines: Optional[LineIndex] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES) -> "FileOutline":
+        stat = os.stat(path)
+        with open_source(path, max_bytes) as source:
+            with timed("parse"):
+                tree = ast.parse(source.data, filename=path)
+            return cls(path, tree, bytes(utf8_source(source.data, source.encoding)), (stat.st_size, stat.st_mtime_ns))
+
+    def _find(self, qualified_name: str) -> Tuple[Definition, Optional[str]]:
+        """The definition of ``Class.method``-style ``qualified_name`` and its symbol-table parent."""
+        parts = qualified_name.split(".")
+        node = self.top_level.get(parts[0])
+        parent: Optional[str] = None
+        for part in parts[1:]:
+            if node is None:
+                break
+            # Methods and the functions inside them belong to the nearest class.
+            if isinstance(node, ast.ClassDef):
+                parent = node.name
+            node = _members(node.body).get(part)
+        if node is None:
+            raise SymbolNotFoundError(self.path, qualified_name)
+        return node, parent
+
+    def symbol(self, qualified_name: str, include_source: bool = False) -> MCPSymbol:
+        key = (qualified_name, include_source)
+        with self._lock:
+            symbol = self._symbols.get(key)
+            if symbol is None:
+                with timed("extract"):
+                    symbol = self._symbols[key] = self._extract(qualified_name, include_source)
+            return symbol
+
+    def _extract(self, qualified_name: str, include_source: bool) -> MCPSymbol:
+        node, parent = self._find(qualified_name)
+        visitor = ExtractionVisitor(self.path)
+        kind: Literal["class", "function"] = "class" if isinstance(node, ast.ClassDef) else "function"
+        if isinstance(node, ast.ClassDef):
+            known = [self.top_level[b.id] for b in node.bases if isinstance(b, ast.Name) and b.id in self.top_level]
+            visitor.visit_definition(node, parent, known_classes=[k for k in known if isinstance(k, ast.ClassDef)])
+            record = visitor.classes[0]
+            bases, members, docstring = record.bases, record.methods, record.docstring
+        else:
+            visitor.visit_definition(node, parent, enclosing_class=parent)
+            # A listed function comes first, then the functions nested in it.
+            members = visitor.functions[1:] if isinstance(node, ast.FunctionDef) else visitor.functions
+            bases, docstring = [], ast.get_docstring(node)
+        source_code = None
+        if include_source:
+            if self._lines is None:
+                self._lines = LineIndex(self.source)
+            source_code = next(iter_chunks(self._lines, definition_span(kind, node, parent))).source_code
+        return MCPSymbol(
+            path=self.path,
+            qualified_name=qualified_name,
+            kind=kind,
+            parent=parent,
+            lineno=node.lineno,
+            end_lineno=node.end_lineno,
+            docstring=docstring,
+            bases=bases,
+            members=[MCPFunction.model_validate(m.to_dict()) for m in members],
+            relationships=[
+                MCPRelationship(source=source, target=target, type=type, location=self.path)  # type: ignore[arg-type]
+                for source, target, type in visitor.finish()
+            ],
+            source_code=source_code
+        )
+
+
+class OutlineCache:
+    """The most recently used ``max_entries`` file outlines. Safe to share between threads."""
+
+    def __init__(self, max_entries: int = 32, max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_file_bytes = max_file_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, FileOutline]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def outline(self, path: str) -> FileOutline:
+        stat = os.stat(path)
+        with self._lock:
+            outline = self._entries.get(path)
+            if outline is not None and outline.stamp == (stat.st_size, stat.st_mtime_ns):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return outline
+            self.misses += 1
+        # Parsed outside the lock; two threads racing on one file both parse it.
+        outline = FileOutline.load(path, self.max_file_bytes)
+        with self._lock:
+            self._entries[path] = outline
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return outline
+
+    def get_symbol(self, path: str, qualified_name: str, include_source: bool = False) -> MCPSymbol:
+        return self.outline(path).symbol(qualified_name, include_source)
+
+    def discard(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,598 @@
+"""Repository-wide symbol index with qualified-name resolution.
+
+Relationships in an ``MCPFile`` are file-local strings (``calls`` targets
+are bare names, ``inherits`` targets unqualified). The index collects, per
+module, every definition under its qualified name plus the import aliases,
+base expressions and call expressions needed to resolve those strings
+across files, then answers lookups from dictionaries.
+
+Resolution is kept per module, so that after a change only the changed
+modules and the modules whose imports lead to them (directly or through
+other importers) are resolved again.
+"""
+import ast
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .directory import DEFAULT_CHUNKSIZE, map_path_chunks
+from .extract import PARSE_ERRORS, ClassRecord, ExtractionVisitor, FunctionRecord
+from .models import MCPCallSite, MCPDefinition
+from .workers import WorkerPool
+from hoh_parser.utils.discovery import iter_source_files
+from hoh_parser.utils.file_ops import open_source
+from hoh_parser.utils.logging import get_logger
+
+logger = get_logger("hoh_parser.core.symbols")
+
+# Import chains are followed at most this many hops (re-exports of re-exports).
+MAX_RESOLVE_DEPTH = 8
+
+
+class ModuleFacts(NamedTuple):
+    module: str
+    path: str
+    # (local qualified name, kind, lineno, end_lineno)
+    definitions: List[Tuple[str, str, int, Optional[int]]]
+    # local alias -> absolute dotted name it was imported as
+    imports: Dict[str, str]
+    # modules pulled in with ``from m import *``
+    star_imports: List[str]
+    # (class local qualified name, dotted base expression)
+    bases: List[Tuple[str, str]]
+    # (caller local qualified name or "", enclosing class or "", dotted callee, lineno)
+    calls: List[Tuple[str, str, str, int]]
+
+
+class Definition(NamedTuple):
+    qualified_name: str
+    kind: str
+    path: str
+    lineno: int
+    end_lineno: Optional[int]
+
+
+class CallSite(NamedTuple):
+    caller: str
+    path: str
+    lineno: int
+
+
+class _Resolution(NamedTuple):
+    """What resolving one module added to the tables, so it can be taken out again."""
+    path: str
+    classes: List[str]  # qualified names given resolved bases
+    callees: Set[str]
+    resolved: int
+    unresolved: int
+
+
+def _package_root(directory: str, cache: Dict[str, str]) -> str:
+    """The directory module names are relative to: the parent of the topmost package."""
+    if directory not in cache:
+        if os.path.exists(os.path.join(directory, "__init__.py")):
+            parent = os.path.dirname(directory)
+            cache[directory] = directory if parent == directory else _package_root(parent, cache)
+        else:
+            cache[directory] = directory
+    return cache[directory]
+
+
+def module_name_for(path: str, cache: Optional[Dict[str, str]] = None) -> Tuple[str, bool]:
+    """Return the dotted module name of ``path`` and whether it is a package."""
+    cache = {} if cache is None else cache
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    root = _package_root(directory, cache)
+    parts = os.path.relpath(path, root)[:-len(".py")].split(os.sep)
+    is_package = parts[-1] == "__init__"
+    if is_package:
+        parts.pop()
+    return ".".join(parts), is_package
+
+
+def _dotted(expr: ast.expr) -> Optional[str]:
+    parts: List[str] = []
+    while isinstance(expr, ast.Attribute):
+        parts.append(expr.attr)
+        expr = expr.value
+    if not isinstance(expr, ast.Name):
+        return None
+    parts.append(expr.id)
+    return ".".join(reversed(parts))
+
+
+class FactsVisitor(ExtractionVisitor):
+    """ExtractionVisitor that also records what cross-file resolution needs."""
+
+    def __init__(self, filename: str, module: str, is_package: bool) -> None:
+        super().__init__(filename)
+        self.module = module
+        self.is_package = is_package
+        self.scope: List[Tuple[str, str]] = []  # (name, kind) of enclosing definitions
+        self.definitions: List[Tuple[str, str, int, Optional[int]]] = []
+        self.imports: Dict[str, str] = {}
+        self.star_imports: List[str] = []
+        self.base_exprs: List[Tuple[str, str]] = []
+        self.call_exprs: List[Tuple[str, str, str, int]] = []
+
+    def _qualify(self, name: str) -> str:
+        return ".".join([n for n, _ in self.scope] + [name])
+
+    def _enclosing_class_scope(self) -> str:
+        for i in range(len(self.scope) - 1, -1, -1):
+            if self.scope[i][1] == "class":
+                return ".".join(n for n, _ in self.scope[:i + 1])
+        return ""
+
+    def _define(self, node: ast.AST, name: str, kind: str) -> str:
+        qualname = self._qualify(name)
+        self.definitions.append((qualname, kind, getattr(node, "lineno", 0), getattr(node, "end_lineno", None)))
+        return qualname
+
+    def _visit_class(
+        self,
+        node: ast.ClassDef,
+        class_sink: Optional[List[ClassRecord]],
+        parent: Optional[str]
+    ) -> None:
+        qualname = self._define(node, node.name, "class")
+        for base in node.bases:
+            dotted = _dotted(base)
+            if dotted:
+                self.base_exprs.append((qualname, dotted))
+        self.scope.append((node.name, "class"))
+        super()._visit_class(node, class_sink, parent)
+        self.scope.pop()
+
+    def _visit_function(
+        self,
+        node: ast.FunctionDef,
+        function_sink: Optional[List[FunctionRecord]],
+        parent: Optional[str]
+    ) -> None:
+        kind = "method" if self.scope and self.scope[-1][1] == "class" else "function"
+        self._define(node, node.name, kind)
+        self.scope.append((node.name, "function"))
+        super()._visit_function(node, function_sink, parent)
+        self.scope.pop()
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        kind = "method" if self.scope and self.scope[-1][1] == "class" else "function"
+        self._define(node, node.name, kind)
+        self.scope.append((node.name, "function"))
+        self.generic_visit(node)
+        self.scope.pop()
+
+    def visit_Import(self, node: ast.Import) -> None:
+        super().visit_Import(node)
+        for alias in node.names:
+            if alias.asname:
+                self.imports[alias.asname] = alias.name
+            else:
+                head = alias.name.split(".", 1)[0]
+                self.imports[head] = head
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        super().visit_ImportFrom(node)
+        base = node.module or ""
+        if node.level:
+            package = self.module.split(".") if self.module else []
+            if not self.is_package:
+                package = package[:-1]
+            package = package[:len(package) - (node.level - 1)] if node.level > 1 else package
+            base = ".".join(package + ([node.module] if node.module else []))
+        for alias in node.names:
+            if alias.name == "*":
+                self.star_imports.append(base)
+            else:
+                self.imports[alias.asname or alias.name] = f"{base}.{alias.name}" if base else alias.name
+
+    def _visit_call(self, node: ast.Call) -> None:
+        dotted = _dotted(node.func)
+        if dotted:
+            caller = ".".join(n for n, _ in self.scope)
+            self.call_exprs.append((caller, self._enclosing_class_scope(), dotted, node.lineno))
+        super()._visit_call(node)
+
+
+def collect_module_facts(path: str, source: Optional[bytes] = None, cache: Optional[Dict[str, str]] = None) -> ModuleFacts:
+    module, is_package = module_name_for(path, cache)
+    visitor = FactsVisitor(path, module, is_package)
+    if source is None:
+        with open_source(path) as buffer:
+            tree = ast.parse(buffer.data, filename=path)
+    else:
+        tree = ast.parse(source, filename=path)
+    visitor.visit(tree)
+    return ModuleFacts(
+        module=module,
+        path=path,
+        definitions=visitor.definitions,
+        imports=visitor.imports,
+        star_imports=visitor.star_imports,
+        bases=visitor.base_exprs,
+        calls=visitor.call_exprs
+    )
+
+
+def _facts_chunk(paths: List[str]) -> List[Optional[ModuleFacts]]:
+    """Worker entry point; unparsable files yield None."""
+    cache: Dict[str, str] = {}
+    results: List[Optional[ModuleFacts]] = []
+    for path in paths:
+        try:
+            results.append(collect_module_facts(path, cache=cache))
+        except PARSE_ERRORS:
+            results.append(None)
+    return results
+
+
+class SymbolIndex:
+    """In-process index from qualified names to definitions and call sites.
+
+    Facts are added per module; resolution of imports, bases and calls runs
+    lazily on the first query after a change, after which every lookup is a
+    dictionary access. Safe to share between threads.
+    """
+
+    def __init__(self) -> None:
+        self._modules: Dict[str, ModuleFacts] = {}
+        # Every file per module name; files outside packages can share one.
+        self._candidates: Dict[str, Dict[str, ModuleFacts]] = {}
+        self._module_by_path: Dict[str, str] = {}
+        self._changed: Set[str] = set()  # modules added, replaced or removed since the last refresh
+        self._definitions: Dict[str, Definition] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._bases: Dict[str, List[str]] = {}
+        self._callers: Dict[str, List[CallSite]] = {}
+        self._defined: Dict[str, Tuple[str, List[str]]] = {}  # module -> (path, qualified names)
+        self._resolutions: Dict[str, _Resolution] = {}
+        self._targets: Dict[str, Set[str]] = {}  # module -> module names its imports may resolve through
+        self._importers: Dict[str, Set[str]] = {}  # the reverse of _targets
+        self.resolved_calls = 0
+        self.unresolved_calls = 0
+        self.last_refresh_modules = 0  # modules resolved again by the latest refresh
+        self._lock = threading.RLock()
+
+    @classmethod
+    def build(
+        cls,
+        root: str,
+        workers: Optional[int] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        pool: Optional[WorkerPool] = None,
+        paths: Optional[Iterable[str]] = None
+    ) -> "SymbolIndex":
+        """Index the files under ``root``; ``paths`` replaces ``iter_source_files(root)``."""
+        index = cls()
+        if paths is None:
+            paths = iter_source_files(root)
+        facts = map_path_chunks(_facts_chunk, sorted(paths), workers=workers, chunksize=chunksize, pool=pool)
+        index.add_all(facts)
+        return index
+
+    def add_all(self, facts: Iterable[Optional[ModuleFacts]]) -> None:
+        for module_facts in facts:
+            if module_facts is not None:
+                self.add(module_facts)
+
+    def add(self, facts: ModuleFacts) -> None:
+        with self._lock:
+            known = self._module_by_path.get(facts.path) == facts.module
+            self.remove_path(facts.path)
+            candidates = self._candidates.setdefault(facts.module, {})
+            candidates[facts.path] = facts
+            self._module_by_path[facts.path] = facts.module
+            if len(candidates) > 1 and not known:
+                logger.warning(
+                    "%s all map to module %r; indexing only %s",
+                    ", ".join(sorted(candidates)), facts.module, min(candidates)
+                )
+            self._select(facts.module)
+
+    def remove_path(self, path: str) -> None:
+        with self._lock:
+            module = self._module_by_path.pop(path, None)
+            if module is not None:
+                self._candidates[module].pop(path, None)
+                self._select(module)
+
+    def _select(self, module: str) -> None:
+        """Index the file with the smallest path among those named ``module``."""
+        candidates = self._candidates.get(module)
+        if candidates:
+            facts = candidates[min(candidates)]
+            if self._modules.get(module) is facts:
+                return
+            self._modules[module] = facts
+        else:
+            self._candidates.pop(module, None)
+            if self._modules.pop(module, None) is None:
+                return
+        self._changed.add(module)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._module_by_path
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+    # Resolution
+
+    def _refresh(self) -> None:
+        if not self._changed:
+            return
+        changed, self._changed = self._changed, set()
+        for module in changed:
+            self._undefine(module)
+        for module in changed:
+            if module in self._modules:
+                self._define(module, self._modules[module])
+        affected = self._dependents(changed)
+        for module in affected:
+            self._unresolve(module)
+            self._link(module)
+        modules = [module for module in sorted(affected) if module in self._modules]
+        self.last_refresh_modules = len(modules)
+        classes = {module: self._resolve_bases(module) for module in modules}
+        for module in modules:
+            self._resolve_calls(module, classes[module])
+
+    def _define(self, module: str, facts: ModuleFacts) -> None:
+        qualnames: Dict[str, None] = {}
+        for local, kind, lineno, end_lineno in facts.definitions:
+            qualname = f"{module}.{local}" if module else local
+            # A name defined twice (if/else, try/except) keeps its last definition, listed once.
+            self._definitions[qualname] = Definition(qualname, kind, facts.path, lineno, end_lineno)
+            if qualname not in qualnames:
+                self._by_name.setdefault(local.rsplit(".", 1)[-1], []).append(qualname)
+                qualnames[qualname] = None
+        self._defined[module] = (facts.path, list(qualnames))
+
+    def _undefine(self, module: str) -> None:
+        path, qualnames = self._defined.pop(module, ("", []))
+        for qualname in qualnames:
+            definition = self._definitions.get(qualname)
+            if definition is not None and definition.path == path:
+                del self._definitions[qualname]
+            short = qualname.rsplit(".", 1)[-1]
+            names = self._by_name[short]
+            names.remove(qualname)
+            if not names:
+                del self._by_name[short]
+
+    def _link(self, module: str) -> None:
+        """Record which module names ``module``'s imports go through; they decide its dependencies."""
+        for target in self._targets.pop(module, ()):
+            self._importers[target].discard(module)
+            if not self._importers[target]:
+                del self._importers[target]
+        facts = self._modules.get(module)
+        if facts is None:
+            return
+        targets: Set[str] = set()
+        for dotted in (*facts.imports.values(), *facts.star_imports):
+            parts = dotted.split(".")
+            # The longest indexed prefix is where resolution continues; longer
+            # prefixes matter should such a module be added.
+            start = next((i for i in range(len(parts), 0, -1) if ".".join(parts[:i]) in self._modules), 1)
+            targets.update(".".join(parts[:i]) for i in range(start, len(parts) + 1))
+        self._targets[module] = targets
+        for target in targets:
+            self._importers.setdefault(target, set()).add(module)
+
+    def _dependents(self, changed: Set[str]) -> Set[str]:
+        """``changed`` plus every module whose resolution can pass through one of them."""
+        affected = set(changed)
+        pending = list(changed)
+        while pending:
+            module = pending.pop()
+            dependents = set(self._importers.get(module, ()))
+            if "." in module:
+                # A package reaches its submodules as attributes, without importing them.
+                dependents.add(module.rsplit(".", 1)[0])
+            for dependent in dependents - affected:
+                affected.add(dependent)
+                pending.append(dependent)
+        return affected
+
+    def _unresolve(self, module: str) -> None:
+        resolution = self._resolutions.pop(module, None)
+        if resolution is None:
+            return
+        for qualname in resolution.classes:
+            self._bases.pop(qualname, None)
+        for callee in resolution.callees:
+            sites = [site for site in self._callers.get(callee, []) if site.path != resolution.path]
+            if sites:
+                self._callers[callee] = sites
+            else:
+                self._callers.pop(callee, None)
+        self.resolved_calls -= resolution.resolved
+        self.unresolved_calls -= resolution.unresolved
+
+    def _resolve_bases(self, module: str) -> List[str]:
+        classes: List[str] = []
+        for local, dotted in self._modules[module].bases:
+            qualname = f"{module}.{local}" if module else local
+            resolved = self._resolve_in_module(module, dotted.split("."), 0)
+            self._bases.setdefault(qualname, []).append(resolved or dotted)
+            classes.append(qualname)
+        return classes
+
+    def _resolve_calls(self, module: str, classes: List[str]) -> None:
+        facts = self._modules[module]
+        callees: Set[str] = set()
+        resolved = unresolved = 0
+        for caller, class_scope, dotted, lineno in facts.calls:
+            callee = self._resolve_call(module, caller, class_scope, dotted)
+            if callee is None:
+                unresolved += 1
+                continue
+            resolved += 1
+            callees.add(callee)
+            caller_qualname = ".".join(p for p in (module, caller) if p)
+            self._callers.setdefault(callee, []).append(CallSite(caller_qualname, facts.path, lineno))
+        self._resolutions[module] = _Resolution(facts.path, classes, callees, resolved, unresolved)
+        self.resolved_calls += resolved
+        self.unresolved_calls += unresolved
+
+    def _resolve_member(self, qualname: str, rest: List[str]) -> Optional[str]:
+        for part in rest:
+            member = self._find_member(qualname, part)
+            if member is None:
+                return None
+            qualname = member
+        return qualname
+
+    def _find_member(self, class_qualname: str, name: str) -> Optional[str]:
+        """Look ``name`` up on a class and then, breadth-first, on its bases."""
+        queue = [class_qualname]
+        seen: Set[str] = set()
+        while queue:
+            current = queue.pop(0)
+            if current in seen:
+                continue
+            seen.add(current)
+            candidate = f"{current}.{name}"
+            if candidate in self._definitions:
+                return candidate
+            queue.extend(self._bases.get(current, []))
+        return None
+
+    def _resolve_absolute(self, parts: List[str], depth: int) -> Optional[str]:
+        dotted = ".".join(parts)
+        if dotted in self._definitions:
+            return dotted
+        for i in range(len(parts) - 1, 0, -1):
+            module = ".".join(parts[:i])
+            if module in self._modules:
+                return self._resolve_in_module(module, parts[i:], depth)
+        return None
+
+    def _resolve_in_module(self, module: str, parts: List[str], depth: int) -> Optional[str]:
+        """Resolve a dotted name as seen from the top level of ``module``."""
+        if depth > MAX_RESOLVE_DEPTH:
+            return None
+        head, rest = parts[0], parts[1:]
+        local = f"{module}.{head}" if module else head
+        if local in self._definitions:
+            return self._resolve_member(local, rest)
+        facts = self._modules.get(module)
+        if facts is None:
+            return None
+        if head in facts.imports:
+            return self._resolve_absolute(facts.imports[head].split(".") + rest, depth + 1)
+        if rest and local in self._modules:
+            return self._resolve_in_module(local, rest, depth + 1)
+        for star in facts.star_imports:
+            resolved = self._resolve_in_module(star, parts, depth + 1)
+            if resolved is not None:
+                return resolved
+        return None
+
+    def _resolve_call(self, module: str, caller: str, class_scope: str, dotted: str) -> Optional[str]:
+        parts = dotted.split(".")
+        if parts[0] in ("self", "cls") and class_scope and len(parts) > 1:
+            class_qualname = f"{module}.{class_scope}" if module else class_scope
+            return self._resolve_member(class_qualname, parts[1:])
+        # Enclosing function scopes, innermost first, then the module.
+        scope = caller.split(".") if caller else []
+        while scope:
+            local = ".".join([module] + scope + [parts[0]]) if module else ".".join(scope + [parts[0]])
+            if local in self._definitions:
+                return self._resolve_member(local, parts[1:])
+            scope.pop()
+        return self._resolve_in_module(module, parts, 0)
+
+    # Queries
+
+    def resolve(self, module: str, dotted: str) -> Optional[str]:
+        """Qualified name that ``dotted`` refers to at the top level of ``module``."""
+        with self._lock:
+            self._refresh()
+            return self._resolve_in_module(module, dotted.split("."), 0)
+
+    def definition(self, qualified_name: str) -> Optional[Definition]:
+        with self._lock:
+            self._refresh()
+            return self._definitions.get(qualified_name)
+
+    def find_definition(self, name: str) -> List[MCPDefinition]:
+        """Definitions with this qualified name or, failing that, this short name."""
+        with self._lock:
+            self._refresh()
+            if name in self._definitions:
+                qualnames = [name]
+            else:
+                qualnames = self._by_name.get(name, [])
+            return [self._definition_model(q) for q in qualnames]
+
+    def _definition_model(self, qualname: str) -> MCPDefinition:
+        definition = self._definitions[qualname]
+        return MCPDefinition(
+            qualified_name=definition.qualified_name,
+            kind=definition.kind,  # type: ignore[arg-type]
+            path=definition.path,
+            lineno=definition.lineno,
+            end_lineno=definition.end_lineno,
+            bases=self._bases.get(qualname, [])
+        )
+
+    def find_callers(self, qualified_name: str) -> List[MCPCallSite]:
+        with self._lock:
+            self._refresh()
+            return [
+                MCPCallSite(caller=site.caller, callee=qualified_name, path=site.path, lineno=site.lineno)
+                for site in self._callers.get(qualified_name, [])
+            ]
+
+    def _module_of(self, dotted: str) -> str:
+        """The longest indexed module ``dotted`` lies in, else ``dotted`` itself."""
+        parts = dotted.split(".")
+        for i in range(len(parts), 0, -1):
+            module = ".".join(parts[:i])
+            if module in self._modules:
+                return module
+        return dotted
+
+    def graph_edges(self) -> List[Tuple[str, str, str]]:
+        """Resolved ``(source, target, type)`` edges between qualified names.
+
+        ``defines`` links modules and classes to their members, ``calls``
+        callers to resolved callees, ``inherits`` classes to their bases and
+        ``imports`` modules to the modules they import from.
+        """
+        with self._lock:
+            self._refresh()
+            edges: List[Tuple[str, str, str]] = []
+            for qualname in self._definitions:
+                if "." in qualname:
+                    edges.append((qualname.rsplit(".", 1)[0], qualname, "defines"))
+            for callee, sites in self._callers.items():
+                edges.extend((site.caller, callee, "calls") for site in sites)
+            for class_qualname, bases in self._bases.items():
+                edges.extend((class_qualname, base, "inherits") for base in bases)
+            for module, facts in self._modules.items():
+                for dotted in (*facts.imports.values(), *facts.star_imports):
+                    edges.append((module, self._module_of(dotted), "imports"))
+            return edges
+
+    def kinds(self) -> Dict[str, str]:
+        """Qualified name -> ``class``, ``function`` or ``method`` for every definition."""
+        with self._lock:
+            self._refresh()
+            return {qualname: definition.kind for qualname, definition in self._definitions.items()}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh()
+            return {
+                "modules": len(self._modules),
+                "definitions": len(self._definitions),
+                "resolved_calls": self.resolved_calls,
+                "unresolved_calls": self.unresolved_calls,
+                "last_refresh_modules": self.last_refresh_modules,
+                "shadowed_files": len(self._module_by_path) - len(self._modules),
+            }
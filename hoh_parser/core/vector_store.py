@@ -0,0 +1,244 @@
+"""Embedding vectors with exact and IVF similarity search.
+
+Vectors are unit-length float32 rows of one matrix, memory-mapped from
+``vectors.f32`` when the store has a directory (in memory otherwise), so a
+large store costs page cache rather than heap and a restarted server opens
+it without reading it. ``index.json`` maps ids to rows and records each
+row's content hash and metadata. Rows freed by ``remove`` are reused.
+
+Search is a matrix-vector product over all rows, or, for large stores, an
+inverted-file (IVF) index: rows are clustered by spherical k-means and a
+query scores only the rows of the ``nprobe`` clusters nearest to it.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+VECTORS_NAME = "vectors.f32"
+INDEX_NAME = "index.json"
+
+
+class IVFIndex(NamedTuple):
+    centroids: np.ndarray  # (lists, dimension), unit length
+    indptr: np.ndarray  # list -> offset of its first row in rows
+    rows: np.ndarray  # store rows grouped by list
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    normalized: np.ndarray = (vectors / np.maximum(norms, 1e-12)).astype(np.float32, copy=False)
+    return normalized
+
+
+def build_ivf(vectors: np.ndarray, rows: np.ndarray, lists: int, iterations: int = 10, seed: int = 0) -> IVFIndex:
+    """Cluster ``vectors[rows]`` into ``lists`` inverted lists by spherical k-means."""
+    data = vectors[rows]
+    rng = np.random.default_rng(seed)
+    # Centroids are trained on a sample; assigning every row is one more pass.
+    sample = data[rng.choice(len(data), min(len(data), lists * 64), replace=False)]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)]
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = normalize(sums)
+    assignment = np.argmax(data @ centroids.T, axis=1)
+    order = np.argsort(assignment, kind="stable")
+    indptr = np.zeros(lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignment, minlength=lists), out=indptr[1:])
+    return IVFIndex(centroids, indptr, rows[order])
+
+
+class VectorStore:
+    """Id -> vector store; see the module docstring. Safe to share between threads."""
+
+    def __init__(self, dimension: int, directory: Optional[str] = None, model: str = "") -> None:
+        self.dimension = dimension
+        self.directory = directory
+        self.model = model
+        self.rows: Dict[str, int] = {}
+        self.hashes: List[Optional[str]] = []  # per row; None when the row is free
+        self.meta: List[Optional[Dict[str, Any]]] = []
+        self.paths: Dict[str, Set[str]] = {}  # source file -> ids
+        self._by_hash: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._ivf: Optional[IVFIndex] = None
+        self._lock = threading.RLock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _load(self) -> None:
+        assert self.directory
+        try:
+            with open(os.path.join(self.directory, INDEX_NAME)) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = None
+        # Vectors of another model or size are useless: start over.
+        if index is None or index["dimension"] != self.dimension or index["model"] != self.model:
+            self._map(0)
+            return
+        self.hashes = index["hashes"]
+        self.meta = index["meta"]
+        self._map(len(self.hashes))
+        for row, (hash, meta) in enumerate(zip(self.hashes, self.meta)):
+            if hash is None or meta is None:
+                self._free.append(row)
+                continue
+            self._by_hash.setdefault(hash, row)
+            self.rows[meta["id"]] = row
+            self.paths.setdefault(meta["path"], set()).add(meta["id"])
+
+    def _map(self, capacity: int) -> None:
+        """(Re)size the matrix to ``capacity`` rows, keeping existing ones."""
+        if not self.directory:
+            grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+            grown[:len(self._matrix)] = self._matrix[:capacity]
+            self._matrix = grown
+            return
+        path = os.path.join(self.directory, VECTORS_NAME)
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        with open(path, "ab") as f:
+            f.truncate(capacity * self.dimension * 4)
+        # A zero-length file cannot be mapped.
+        self._matrix = (
+            np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+            if capacity else np.zeros((0, self.dimension), dtype=np.float32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.rows
+
+    def hash_of(self, id: str) -> Optional[str]:
+        row = self.rows.get(id)
+        return None if row is None else self.hashes[row]
+
+    def vector_for_hash(self, hash: str) -> Optional[np.ndarray]:
+        """A stored vector of content with ``hash``, whatever id it belongs to."""
+        with self._lock:
+            row = self._by_hash.get(hash)
+            return None if row is None else np.array(self._matrix[row])
+
+    def put(self, id: str, hash: str, vector: np.ndarray, meta: Dict[str, Any]) -> None:
+        """Store ``vector`` (unit length) for ``id``; ``meta`` must name the source ``path``."""
+        with self._lock:
+            row = self.rows.get(id)
+            if row is not None:
+                self._forget_hash(row)
+            elif self._free:
+                row = self._free.pop()
+            else:
+                row = len(self.hashes)
+                self.hashes.append(None)
+                self.meta.append(None)
+                if row >= len(self._matrix):
+                    self._map(max(1024, 2 * len(self._matrix)))
+            self._matrix[row] = vector
+            self.hashes[row] = hash
+            self.meta[row] = {**meta, "id": id}
+            self.rows[id] = row
+            self._by_hash.setdefault(hash, row)
+            self.paths.setdefault(meta["path"], set()).add(id)
+            self._ivf = None
+
+    def update_meta(self, id: str, meta: Dict[str, Any]) -> None:
+        with self._lock:
+            self.meta[self.rows[id]] = {**meta, "id": id}
+
+    def _forget_hash(self, row: int) -> None:
+        hash = self.hashes[row]
+        if hash is not None and self._by_hash.get(hash) == row:
+            del self._by_hash[hash]
+
+    def remove(self, id: str) -> None:
+        with self._lock:
+            row = self.rows.pop(id, None)
+            if row is None:
+                return
+            self._forget_hash(row)
+            meta = self.meta[row]
+            assert meta is not None
+            ids = self.paths.get(meta["path"])
+            if ids is not None:
+                ids.discard(id)
+                if not ids:
+                    del self.paths[meta["path"]]
+            self.hashes[row] = None
+            self.meta[row] = None
+            self._free.append(row)
+            self._ivf = None
+
+    def remove_path(self, path: str) -> None:
+        with self._lock:
+            for id in list(self.paths.get(path, ())):
+                self.remove(id)
+
+    def _live_rows(self) -> np.ndarray:
+        return np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))
+
+    def ivf(self) -> IVFIndex:
+        """The IVF index, rebuilt on first use after any change."""
+        with self._lock:
+            if self._ivf is None:
+                rows = self._live_rows()
+                self._ivf = build_ivf(self._matrix, rows, lists=max(1, int(np.sqrt(len(rows)))))
+            return self._ivf
+
+    def search(
+        self,
+        query: np.ndarray,
+        top: int = 10,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """``(meta, cosine similarity)`` of the ``top`` rows nearest ``query``, best first.
+
+        All rows are scored unless ``nprobe`` is given, in which case only the
+        rows in the ``nprobe`` nearest IVF lists are.
+        """
+        with self._lock:
+            if not self.rows:
+                return []
+            if nprobe is None:
+                # Scored in place: gathering the live rows first would copy the matrix.
+                rows = np.arange(len(self.hashes))
+                scores = self._matrix[:len(rows)] @ query
+                scores[self._free] = -np.inf
+            else:
+                ivf = self.ivf()
+                probe = np.argsort(-(ivf.centroids @ query))[:nprobe]
+                rows = np.concatenate([ivf.rows[ivf.indptr[i]:ivf.indptr[i + 1]] for i in probe])
+                scores = self._matrix[rows] @ query
+            count = min(top, len(rows) if nprobe is not None else len(self.rows))
+            if count <= 0:
+                return []
+            best = np.argpartition(-scores, count - 1)[:count]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [(self.meta[row], float(score)) for row, score in zip(rows[best].tolist(), scores[best].tolist())]
+
+    def flush(self) -> None:
+        """Write the id map (and flush the mapped vectors) when the store has a directory."""
+        if not self.directory:
+            return
+        with self._lock:
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            index = {"dimension": self.dimension, "model": self.model, "hashes": self.hashes, "meta": self.meta}
+            path = os.path.join(self.directory, INDEX_NAME)
+            with open(path + ".tmp", "w") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"vectors": len(self.rows), "rows": len(self.hashes), "paths": len(self.paths), "dimension": self.dimension}
@@ -0,0 +1,329 @@
+"""Filesystem watching that keeps parse results warm.
+
+``FileWatcher`` follows one or more roots and calls back with the source
+files that changed or disappeared. On Linux it uses inotify (through
+ctypes, one watch per directory discovery would enter); elsewhere, or when
+inotify cannot be set up, it falls back to polling ``stat`` results.
+
+Events are coalesced per path and delivered in batches: a batch is flushed
+once no event has arrived for ``debounce`` seconds, or ``max_delay``
+seconds after its first event however busy the tree is, so a branch
+checkout touching thousands of files becomes a handful of callbacks.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from hoh_parser.utils.discovery import DEFAULT_INCLUDE, SourceFilter, iter_source_files
+from hoh_parser.utils.logging import get_logger
+
+logger = get_logger("hoh_parser.core.watch")
+
+# on_change(changed, deleted); both lists are sorted paths.
+ChangeCallback = Callable[[List[str], List[str]], None]
+
+# (path, deleted)
+Event = Tuple[str, bool]
+
+# inotify(7) event bits.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _load_libc() -> ctypes.CDLL:
+    if not sys.platform.startswith("linux"):
+        raise OSError("inotify is only available on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    try:
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except AttributeError as exc:
+        raise OSError(f"libc has no inotify: {exc}") from exc
+    return libc
+
+
+class PollingBackend:
+    """Detects changes by comparing (mtime, size) snapshots of the roots."""
+
+    name = "polling"
+
+    def __init__(
+        self,
+        roots: Sequence[str],
+        include: Sequence[str],
+        stop: threading.Event,
+        interval: float = 1.0,
+        exclude: Sequence[str] = (),
+        gitignore: bool = True
+    ) -> None:
+        self.roots = roots
+        self.include = include
+        self.exclude = exclude
+        self.gitignore = gitignore
+        self.interval = interval
+        self._stop = stop
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        for root in self.roots:
+            for path in iter_source_files(root, self.include, self.exclude, self.gitignore):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def files(self) -> List[str]:
+        return list(self._snapshot)
+
+    def poll(self, timeout: float) -> List[Event]:
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            self._stop.wait(timeout)
+            return []
+        if wait > 0 and self._stop.wait(wait):
+            return []
+        self._next_scan = time.monotonic() + self.interval
+        previous, self._snapshot = self._snapshot, self._scan()
+        events: List[Event] = [(path, True) for path in previous if path not in self._snapshot]
+        events.extend((path, False) for path, stat in self._snapshot.items() if previous.get(path) != stat)
+        return events
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyBackend:
+    """inotify watches on every directory discovery enters under the roots.
+
+    Directories created later are watched as they appear and their files
+    reported; a queue overflow triggers a rescan that reports every file.
+    Events are checked against the discovery rules of their root, so
+    nothing under an excluded or ignored directory is watched or reported.
+    """
+
+    name = "inotify"
+
+    def __init__(
+        self,
+        roots: Sequence[str],
+        include: Sequence[str],
+        exclude: Sequence[str] = (),
+        gitignore: bool = True
+    ) -> None:
+        self.roots = roots
+        self._filters = [SourceFilter(root, include, exclude, gitignore) for root in roots]
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        self._dirs: Dict[int, Tuple[str, SourceFilter]] = {}  # wd -> (directory, its root's rules)
+        self._known: Set[str] = set()
+        for selected in self._filters:
+            self._add_tree(selected.root, selected)
+
+    def _add_tree(self, top: str, selected: SourceFilter) -> List[str]:
+        found: List[str] = []
+        for directory, files in selected.iter_tree(top):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                # Usually ENOSPC: fs.inotify.max_user_watches is exhausted.
+                logger.warning("cannot watch %s: %s", directory, os.strerror(ctypes.get_errno()))
+                continue
+            self._dirs[wd] = (directory, selected)
+            found.extend(files)
+        self._known.update(found)
+        return found
+
+    def files(self) -> List[str]:
+        return list(self._known)
+
+    def _rescan(self) -> List[Event]:
+        previous = self._known
+        self._known = set()
+        for selected in self._filters:
+            self._add_tree(selected.root, selected)
+        return [(path, True) for path in previous - self._known] + [(path, False) for path in self._known]
+
+    def poll(self, timeout: float) -> List[Event]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events: List[Event] = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                events.extend(self._rescan())
+                continue
+            watched = self._dirs.get(wd)
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if watched is None or not name:
+                continue
+            directory, selected = watched
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    events.extend((found, False) for found in self._add_tree(path, selected))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    prefix = path + os.sep
+                    gone = [known for known in self._known if known.startswith(prefix)]
+                    self._known.difference_update(gone)
+                    events.extend((known, True) for known in gone)
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                if path in self._known:
+                    self._known.discard(path)
+                    events.append((path, True))
+                continue
+            if not selected(path):
+                continue
+            self._known.add(path)
+            events.append((path, False))
+        return events
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class FileWatcher:
+    """Background thread delivering debounced batches of source file changes.
+
+    ``backend`` is ``"auto"`` (inotify, else polling), ``"inotify"`` or
+    ``"polling"``. ``include``, ``exclude`` and ``gitignore`` select files as
+    ``iter_source_files`` does. With ``warm`` the first batch lists every file
+    found at start, so the callback can fill caches before the first query;
+    it is skipped when there are more than ``warm_limit`` files, which would
+    only push each other out of a cache that size.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[str],
+        on_change: ChangeCallback,
+        include: Optional[Sequence[str]] = None,
+        debounce: float = 0.2,
+        max_delay: float = 2.0,
+        backend: str = "auto",
+        poll_interval: float = 1.0,
+        warm: bool = True,
+        exclude: Optional[Sequence[str]] = None,
+        gitignore: bool = True,
+        warm_limit: Optional[int] = None
+    ) -> None:
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.on_change = on_change
+        self.include = include or DEFAULT_INCLUDE
+        self.exclude = exclude or ()
+        self.gitignore = gitignore
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.backend_name = backend
+        self.poll_interval = poll_interval
+        self.warm = warm
+        self.warm_limit = warm_limit
+        self.batches = 0
+        self.changed = 0
+        self.deleted = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backend: Optional[Union[PollingBackend, InotifyBackend]] = None
+
+    def _make_backend(self) -> Union[PollingBackend, InotifyBackend]:
+        if self.backend_name in ("auto", "inotify"):
+            try:
+                return InotifyBackend(self.roots, self.include, self.exclude, self.gitignore)
+            except OSError as exc:
+                if self.backend_name == "inotify":
+                    raise
+                logger.info("inotify unavailable (%s), polling every %.1fs", exc, self.poll_interval)
+        return PollingBackend(self.roots, self.include, self._stop, self.poll_interval, self.exclude, self.gitignore)
+
+    def start(self) -> None:
+        self._backend = self._make_backend()
+        self._thread = threading.Thread(target=self._run, name="hoh-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+
+    def _deliver(self, pending: Dict[str, bool]) -> None:
+        changed = sorted(path for path, deleted in pending.items() if not deleted)
+        deleted = sorted(path for path, deleted in pending.items() if deleted)
+        self.batches += 1
+        self.changed += len(changed)
+        self.deleted += len(deleted)
+        try:
+            self.on_change(changed, deleted)
+        except Exception:
+            logger.exception("watch callback failed for %d changed, %d deleted files", len(changed), len(deleted))
+
+    def _run(self) -> None:
+        backend = self._backend
+        assert backend is not None
+        if self.warm:
+            files = backend.files()
+            if self.warm_limit is not None and len(files) > self.warm_limit:
+                logger.info("not warming caches: %d files under the roots, caches hold %d", len(files), self.warm_limit)
+            else:
+                self._deliver({path: False for path in files})
+        pending: Dict[str, bool] = {}
+        first = last = 0.0
+        while not self._stop.is_set():
+            events = backend.poll(self.debounce if pending else 0.5)
+            now = time.monotonic()
+            if events:
+                if not pending:
+                    first = now
+                last = now
+                for path, deleted in events:
+                    pending[path] = deleted
+            if pending and (now - last >= self.debounce or now - first >= self.max_delay):
+                batch, pending = pending, {}
+                self._deliver(batch)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self._backend.name if self._backend is not None else None,
+            "roots": self.roots,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "batches": self.batches,
+            "changed": self.changed,
+            "deleted": self.deleted,
+        }
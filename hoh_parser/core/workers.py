@@ -0,0 +1,202 @@
+"""A long-lived process pool for directory-wide parsing.
+
+Starting a process pool per request means every worker pays interpreter
+start-up and the import of the parser (pydantic models included) before it
+parses a single file. ``WorkerPool`` is started once, when the server
+starts, and kept: workers come from a fork server that has already
+imported ``preload``, so a new worker costs a ``fork`` rather than a fresh
+interpreter, and ``start`` brings every worker up before the first request.
+
+Workers are recycled to bound memory growth (ASTs and interned strings of
+large files leave fragmented heaps behind). Each task reports its worker's
+RSS; once a worker goes over ``max_rss_bytes``, or the pool has run
+``max_tasks`` tasks per worker, the next ``submit`` moves to a fresh
+generation of workers while the old one finishes what it was given.
+Whole generations are replaced because ``ProcessPoolExecutor``'s own
+``max_tasks_per_child`` can deadlock on Python 3.11.
+"""
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_PRELOAD = ("hoh_parser.core.directory", "hoh_parser.core.symbols")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is missing; 0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _init_worker(preload: Sequence[str]) -> None:
+    # Already imported in the fork server; this covers the spawn start method.
+    for module in preload:
+        importlib.import_module(module)
+
+
+def _run_task(func: Callable[..., T], args: Tuple[Any, ...]) -> Tuple[T, int, int]:
+    """Worker entry point: ``func(*args)`` plus the worker's pid and RSS afterwards."""
+    return func(*args), os.getpid(), current_rss()
+
+
+def _warm(hold: float) -> Tuple[None, int, int]:
+    # Held so that a worker done warming up does not take the next warm-up task.
+    time.sleep(hold)
+    return None, os.getpid(), current_rss()
+
+
+class WorkerPool:
+    """Pre-started worker processes shared by every request; see the module docstring. Safe to share between threads."""
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        max_tasks: Optional[int] = 1000,
+        max_rss_bytes: Optional[int] = None,
+        preload: Sequence[str] = DEFAULT_PRELOAD
+    ) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self.max_tasks = max_tasks  # per worker, per generation
+        self.max_rss_bytes = max_rss_bytes
+        self.preload = tuple(preload)
+        self.tasks = 0  # completed, all generations
+        self.generations = 0
+        self.recycled: Dict[str, int] = {"tasks": 0, "rss": 0, "broken": 0}
+        self.start_seconds: Optional[float] = None
+        self.max_rss = 0  # highest RSS any worker reported
+        self._generation_tasks = 0  # submitted to the current generation
+        self._recycle: Optional[str] = None  # why the next submit replaces the workers
+        self._rss: Dict[int, int] = {}  # pid -> last reported RSS, current generation
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _context(self) -> Any:
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" not in methods:
+            return multiprocessing.get_context("spawn")
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(list(self.preload))
+        return context
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Called with the lock held.
+        self.generations += 1
+        self._generation_tasks = 0
+        self._rss = {}
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self._context(),
+            initializer=_init_worker,
+            initargs=(self.preload,)
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> float:
+        """Start every worker and wait until each has imported ``preload``; returns the seconds taken."""
+        begin = time.perf_counter()
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+            executor = self._executor
+        # Workers are spawned as tasks arrive, one per task that finds none idle.
+        for hold in (0.05, 0.2, 1.0):
+            for future in [executor.submit(_warm, hold) for _ in range(self.processes)]:
+                self._record(future.result())
+            if len(self._rss) >= self.processes:
+                break
+        self.start_seconds = time.perf_counter() - begin
+        return self.start_seconds
+
+    def submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        """Run ``func(*args)`` (picklable, module-level) in a worker; starts the pool if needed."""
+        with self._lock:
+            if self._recycle is not None and self._executor is not None:
+                self.recycled[self._recycle] += 1
+                # Already submitted work still runs to completion on the old workers.
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._recycle = None
+            if self._executor is None:
+                self._executor = self._new_executor()
+            try:
+                inner = self._executor.submit(_run_task, func, args)
+            except BrokenProcessPool:
+                self.recycled["broken"] += 1
+                self._executor = self._new_executor()
+                inner = self._executor.submit(_run_task, func, args)
+            self._generation_tasks += 1
+            if self.max_tasks is not None and self._generation_tasks >= self.max_tasks * self.processes:
+                self._recycle = "tasks"
+            generation = self.generations
+        outer: "Future[T]" = Future()
+        outer.set_running_or_notify_cancel()  # like the executor's own futures once running
+        inner.add_done_callback(lambda done: self._done(done, outer, generation))
+        return outer
+
+    def _record(self, outcome: Tuple[Any, int, int]) -> None:
+        _, pid, rss = outcome
+        with self._lock:
+            self._rss[pid] = rss
+            self.max_rss = max(self.max_rss, rss)
+
+    def _done(self, inner: "Future[Tuple[T, int, int]]", outer: "Future[T]", generation: int) -> None:
+        exc = inner.exception()
+        if exc is not None:
+            if isinstance(exc, BrokenProcessPool):
+                with self._lock:
+                    # A worker died (e.g. killed for memory); replace the lot.
+                    if generation == self.generations and self._recycle is None:
+                        self._recycle = "broken"
+            outer.set_exception(exc)
+            return
+        result, pid, rss = inner.result()
+        with self._lock:
+            self.tasks += 1
+            self.max_rss = max(self.max_rss, rss)
+            if generation == self.generations:
+                self._rss[pid] = rss
+                if self.max_rss_bytes is not None and rss > self.max_rss_bytes and self._recycle is None:
+                    self._recycle = "rss"
+        outer.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started": self._executor is not None,
+                "processes": self.processes,
+                "workers": len(self._rss),  # that have reported since the generation started
+                "generation": self.generations,
+                "tasks": self.tasks,
+                "generation_tasks": self._generation_tasks,
+                "recycled": dict(self.recycled),
+                "rss_bytes": sum(self._rss.values()),
+                "max_worker_rss_bytes": self.max_rss,
+                "start_seconds": self.start_seconds,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._rss = {}
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
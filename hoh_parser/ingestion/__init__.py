@@ -0,0 +1 @@
+# Ingestion subpackage init
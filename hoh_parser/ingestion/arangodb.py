@@ -0,0 +1,361 @@
+"""Bulk ingestion of parse results into ArangoDB.
+
+Parse results become the node and edge documents described in the README:
+``files``, ``classes`` and ``functions`` nodes keyed by qualified name, and
+``contains``, ``calls``, ``inherits`` and ``references`` edges. Documents are
+buffered per collection and written with ArangoDB's bulk import API
+(``/_api/import``, ``onDuplicate=update``) over one pooled HTTP client, a
+few batches in flight at a time, so re-ingesting a file upserts instead of
+duplicating.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from hoh_parser.config import Settings
+from hoh_parser.core.directory import iter_parse_directory
+from hoh_parser.core.models import MCPFile
+from hoh_parser.core.symbols import SymbolIndex, module_name_for
+from hoh_parser.utils.logging import get_logger
+
+logger = get_logger("hoh_parser.ingestion.arangodb")
+
+NODE_COLLECTIONS = ("files", "classes", "functions")
+EDGE_COLLECTIONS = ("contains", "calls", "inherits", "references")
+
+# Edge collection per relationship type.
+EDGE_COLLECTION_FOR = {
+    "defines": "contains",
+    "property": "contains",
+    "property_setter": "contains",
+    "property_deleter": "contains",
+    "staticmethod": "contains",
+    "classmethod": "contains",
+    "calls": "calls",
+    "inherits": "inherits",
+    "overrides": "inherits",
+    "imports": "references",
+    "from-imports": "references",
+    "assigns": "references",
+    "composes": "references",
+}
+
+# Node collection assumed for a target that resolves to nothing we parsed.
+_UNRESOLVED_COLLECTION = {
+    "imports": "files",
+    "from-imports": "files",
+    "inherits": "classes",
+    "composes": "classes",
+}
+
+_KIND_COLLECTION = {"class": "classes", "function": "functions", "method": "functions"}
+
+# Characters ArangoDB does not allow in a document key.
+_INVALID_KEY_CHARS = re.compile(r"[^A-Za-z0-9_\-:.@()+,=;$!*'%]")
+_MAX_KEY_LENGTH = 254
+
+# Statuses worth retrying: rate limiting, and server or proxy trouble.
+_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class IngestionError(Exception):
+    pass
+
+
+def document_key(qualified_name: str) -> str:
+    """A valid ``_key`` for a qualified name; stable across runs."""
+    key = _INVALID_KEY_CHARS.sub("_", qualified_name)
+    if len(key) > _MAX_KEY_LENGTH:
+        digest = hashlib.sha1(qualified_name.encode()).hexdigest()
+        key = f"{key[:_MAX_KEY_LENGTH - len(digest) - 1]}-{digest}"
+    return key
+
+
+def _edge(collection: str, from_id: str, to_id: str, type: str, **extra: Any) -> Tuple[str, Dict[str, Any]]:
+    key = hashlib.sha1(f"{from_id}|{to_id}|{type}".encode()).hexdigest()
+    return collection, {"_key": key, "_from": from_id, "_to": to_id, "type": type, **extra}
+
+
+def file_documents(
+    data: Dict[str, Any],
+    module: str,
+    index: Optional[SymbolIndex] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(collection, document)`` for one file in the ``MCPFile`` layout.
+
+    Relationship targets are resolved to the file's own classes and functions
+    first, then through ``index`` when one is given; anything else points at
+    a node keyed by the target name as written.
+    """
+    path = data["path"]
+    file_id = f"files/{document_key(module)}"
+    yield "files", {
+        "_key": document_key(module),
+        "type": "file",
+        "name": module.rsplit(".", 1)[-1],
+        "qualified_name": module,
+        "file_path": path,
+        "docstring": data["docstring"],
+    }
+    # Names as they appear in relationships -> node id.
+    local: Dict[str, str] = {path: file_id}
+
+    for cls in data["classes"]:
+        qualname = f"{module}.{cls['name']}"
+        class_id = f"classes/{document_key(qualname)}"
+        local[cls["name"]] = class_id
+        methods = []
+        for method in cls["methods"]:
+            method_qualname = f"{qualname}.{method['name']}"
+            method_id = f"functions/{document_key(method_qualname)}"
+            local[f"{cls['name']}.{method['name']}"] = method_id
+            methods.append(method_qualname)
+            yield "functions", {
+                "_key": document_key(method_qualname),
+                "type": "function",
+                "name": method["name"],
+                "qualified_name": method_qualname,
+                "docstring": method["docstring"],
+                "start_line": method["lineno"],
+                "end_line": method["end_lineno"],
+                "parent": qualname,
+                "file_path": path,
+            }
+            yield _edge("contains", class_id, method_id, "defines")
+        yield "classes", {
+            "_key": document_key(qualname),
+            "type": "class",
+            "name": cls["name"],
+            "qualified_name": qualname,
+            "docstring": cls["docstring"],
+            "start_line": cls["lineno"],
+            "end_line": cls["end_lineno"],
+            "parent": module,
+            "methods": methods,
+            "inherits_from": cls["bases"],
+            "contained_in": module,
+            "file_path": path,
+        }
+        yield _edge("contains", file_id, class_id, "defines")
+
+    for func in data["functions"]:
+        parent = f"{module}.{func['parent']}" if func["parent"] else module
+        qualname = f"{parent}.{func['name']}"
+        function_id = f"functions/{document_key(qualname)}"
+        local.setdefault(func["name"], function_id)
+        yield "functions", {
+            "_key": document_key(qualname),
+            "type": "function",
+            "name": func["name"],
+            "qualified_name": qualname,
+            "docstring": func["docstring"],
+            "start_line": func["lineno"],
+            "end_line": func["end_lineno"],
+            "parent": parent,
+            "file_path": path,
+        }
+        yield _edge("contains", file_id, function_id, "defines")
+
+    for rel in data["relationships"]:
+        type, target = rel["type"], rel["target"]
+        from_id = local.get(rel["source"], file_id)
+        to_id = local.get(target)
+        if to_id is None and index is not None:
+            resolved = index.resolve(module, target)
+            definition = index.definition(resolved) if resolved else None
+            if definition is not None:
+                to_id = f"{_KIND_COLLECTION[definition.kind]}/{document_key(definition.qualified_name)}"
+        if to_id is None:
+            to_id = f"{_UNRESOLVED_COLLECTION.get(type, 'functions')}/{document_key(target)}"
+        yield _edge(EDGE_COLLECTION_FOR[type], from_id, to_id, type, target_name=target)
+
+
+class ArangoBulkWriter:
+    """Buffered, batched writer for ArangoDB's bulk import API.
+
+    ``add`` serializes a document into its collection's buffer; a full buffer
+    becomes one ``/_api/import`` request, run on a small thread pool sharing
+    one pooled ``httpx.Client``. At most ``2 * concurrency`` batches are
+    pending, so a fast producer blocks rather than buffering without bound.
+    Failed requests (connection errors, 408/429/5xx) are retried with
+    exponential backoff; ``flush`` waits for everything written so far.
+    """
+
+    def __init__(
+        self,
+        url: str = "http://localhost:8529",
+        database: str = "_system",
+        user: str = "root",
+        password: str = "",
+        batch_size: int = 10000,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 60.0
+    ) -> None:
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._client = httpx.Client(
+            base_url=f"{url.rstrip('/')}/_db/{database}",
+            auth=(user, password),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="hoh-ingest")
+        self._buffers: Dict[str, List[str]] = {}
+        self._pending: Deque["Future[Dict[str, Any]]"] = deque()
+        self._lock = threading.Lock()  # guards the counters updated from the pool
+        self.requests = 0
+        self.retries = 0
+        self.documents = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ArangoBulkWriter":
+        return cls(
+            url=settings.arangodb_url,
+            database=settings.arangodb_database,
+            user=settings.arangodb_user,
+            password=settings.arangodb_password,
+            batch_size=settings.arangodb_batch_size,
+            concurrency=settings.arangodb_concurrency,
+            max_retries=settings.arangodb_max_retries,
+        )
+
+    def __enter__(self) -> "ArangoBulkWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.request(method, url, **kwargs)
+                if response.status_code not in _RETRY_STATUSES:
+                    return response
+                problem = f"HTTP {response.status_code}"
+            except httpx.TransportError as exc:
+                problem = f"{type(exc).__name__}: {exc}"
+            if attempt == self.max_retries:
+                raise IngestionError(f"{method} {url} failed after {attempt + 1} attempts: {problem}")
+            with self._lock:
+                self.retries += 1
+            delay = self.backoff * 2 ** attempt
+            logger.warning("%s %s: %s, retrying in %.1fs", method, url, problem, delay)
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def ensure_collections(self) -> None:
+        """Create the node and edge collections; existing ones are left alone."""
+        for names, type in ((NODE_COLLECTIONS, 2), (EDGE_COLLECTIONS, 3)):
+            for name in names:
+                response = self._request("POST", "/_api/collection", json={"name": name, "type": type})
+                if response.status_code != 409 and response.is_error:
+                    raise IngestionError(f"creating collection {name}: HTTP {response.status_code} {response.text}")
+
+    def _import(self, collection: str, lines: List[str]) -> Dict[str, Any]:
+        response = self._request(
+            "POST",
+            "/_api/import",
+            params={"collection": collection, "type": "documents", "onDuplicate": "update"},
+            content="\n".join(lines).encode(),
+        )
+        with self._lock:
+            self.requests += 1
+        if response.is_error:
+            raise IngestionError(f"import into {collection}: HTTP {response.status_code} {response.text}")
+        return dict(response.json())
+
+    def _collect(self, future: "Future[Dict[str, Any]]") -> None:
+        result = future.result()
+        self.created += result.get("created", 0)
+        self.updated += result.get("updated", 0)
+        self.errors += result.get("errors", 0)
+
+    def _submit(self, collection: str) -> None:
+        lines = self._buffers.pop(collection)
+        self._pending.append(self._pool.submit(self._import, collection, lines))
+        while len(self._pending) >= 2 * self.concurrency:
+            self._collect(self._pending.popleft())
+
+    def add(self, collection: str, document: Dict[str, Any]) -> None:
+        buffer = self._buffers.setdefault(collection, [])
+        buffer.append(json.dumps(document, separators=(",", ":")))
+        self.documents += 1
+        if len(buffer) >= self.batch_size:
+            self._submit(collection)
+
+    def flush(self) -> None:
+        for collection in list(self._buffers):
+            self._submit(collection)
+        while self._pending:
+            self._collect(self._pending.popleft())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": self.documents,
+            "created": self.created,
+            "updated": self.updated,
+            "errors": self.errors,
+            "requests": self.requests,
+            "retries": self.retries,
+        }
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown()
+            self._client.close()
+
+
+def ingest_files(
+    writer: ArangoBulkWriter,
+    files: Iterable[MCPFile],
+    index: Optional[SymbolIndex] = None
+) -> None:
+    package_roots: Dict[str, str] = {}
+    for file in files:
+        module, _ = module_name_for(file.path, package_roots)
+        for collection, document in file_documents(file.model_dump(), module, index):
+            writer.add(collection, document)
+    writer.flush()
+
+
+def ingest_directory(
+    root: str,
+    writer: ArangoBulkWriter,
+    workers: Optional[int] = None,
+    index: Optional[SymbolIndex] = None
+) -> Dict[str, int]:
+    """Parse every Python file under ``root`` and ingest the results.
+
+    Parse results are consumed as JSON straight from the worker processes,
+    without building models. Returns the writer's counters plus the number
+    of files that could not be parsed.
+    """
+    package_roots: Dict[str, str] = {}
+    failed = 0
+    for path, payload, error in iter_parse_directory(root, workers=workers):
+        if payload is None:
+            logger.warning("skipping %s: %s", path, error)
+            failed += 1
+            continue
+        module, _ = module_name_for(path, package_roots)
+        for collection, document in file_documents(json.loads(payload), module, index):
+            writer.add(collection, document)
+    writer.flush()
+    return {**writer.stats(), "failed_files": failed}
@@ -0,0 +1,295 @@
+"""Source file discovery with ``.gitignore``-style ignore rules.
+
+Directories are listed with ``os.scandir`` and ignored directories are never
+entered, so a repository's ``.git``, virtualenvs, ``node_modules`` and build
+output cost one directory entry each. Paths are yielded as they are found,
+letting parsing start before discovery finishes.
+
+Rules are evaluated like git does: patterns from ``DEFAULT_EXCLUDES``, then
+every ``.gitignore`` from the root down to the file's directory (each
+relative to its own directory), then the caller's ``exclude`` patterns; the
+last matching pattern wins and ``!pattern`` re-includes.
+"""
+import fnmatch
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Sequence, Set, Tuple
+
+DEFAULT_INCLUDE: Tuple[str, ...] = ("*.py",)
+
+# build/ and dist/ only at the root: packages may have subpackages named so.
+DEFAULT_EXCLUDES: Tuple[str, ...] = (
+    ".git/", ".hg/", ".svn/", "__pycache__/", ".tox/", ".nox/", ".eggs/", "*.egg-info/",
+    ".mypy_cache/", ".pytest_cache/", "node_modules/", "site-packages/", "/build/", "/dist/",
+)
+
+# A directory holding one of these is a virtualenv or conda environment,
+# whatever it is called.
+ENVIRONMENT_MARKERS = frozenset({"pyvenv.cfg", "conda-meta"})
+
+
+class IgnoreRule(NamedTuple):
+    base: str  # directory of the defining .gitignore, relative to the root, with trailing "/"
+    regex: Pattern[str]
+    negate: bool
+    dir_only: bool
+
+
+def _translate(pattern: str) -> str:
+    """Regex source for one gitignore glob (no leading ``!`` or trailing ``/``)."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    out: List[str] = [] if anchored else ["(?:.*/)?"]
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            if pattern[i] == "\\" and i + 1 < n:
+                i += 1
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def compile_rules(patterns: Iterable[str], base: str = "") -> List[IgnoreRule]:
+    rules: List[IgnoreRule] = []
+    for line in patterns:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line:
+            rules.append(IgnoreRule(base, re.compile(_translate(line) + r"\Z"), negate, dir_only))
+    return rules
+
+
+def _read_gitignore(path: str, base: str) -> List[IgnoreRule]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return compile_rules(f, base)
+    except OSError:
+        return []
+
+
+def is_ignored(rules: Sequence[IgnoreRule], relpath: str, is_dir: bool) -> bool:
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if relpath.startswith(rule.base) and rule.regex.match(relpath, len(rule.base)):
+            ignored = not rule.negate
+    return ignored
+
+
+class _Walk:
+    def __init__(
+        self,
+        include: Sequence[str],
+        exclude: Sequence[str],
+        gitignore: bool,
+        default_excludes: bool
+    ) -> None:
+        # One alternation for all name globs; path globs are matched separately.
+        names = [fnmatch.translate(p) for p in include if "/" not in p]
+        self.include_names = re.compile("|".join(names)) if names else None
+        self.include_paths = [re.compile(_translate(p) + r"\Z") for p in include if "/" in p]
+        self.base_rules = compile_rules(DEFAULT_EXCLUDES) if default_excludes else []
+        self.final_rules = compile_rules(exclude)
+        self.gitignore = gitignore
+
+    def included(self, name: str, relpath: str) -> bool:
+        if self.include_names is not None and self.include_names.match(name):
+            return True
+        return any(r.match(relpath) for r in self.include_paths)
+
+    def scan(
+        self,
+        path: str,
+        relpath: str,
+        rules: List[IgnoreRule]
+    ) -> Tuple[List[str], List[Tuple[str, str, List[IgnoreRule]]]]:
+        """List one directory: the files to yield and the subdirectories to enter."""
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return [], []
+        names: Set[str] = {entry.name for entry in entries}
+        if relpath and not names.isdisjoint(ENVIRONMENT_MARKERS):
+            return [], []
+        if self.gitignore and ".gitignore" in names:
+            rules = rules + _read_gitignore(os.path.join(path, ".gitignore"), relpath)
+        files: List[str] = []
+        subdirs: List[Tuple[str, str, List[IgnoreRule]]] = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+                if is_dir and entry.is_symlink():
+                    continue
+            except OSError:
+                continue
+            child = relpath + entry.name
+            if is_ignored(rules, child, is_dir) or is_ignored(self.final_rules, child, is_dir):
+                continue
+            if is_dir:
+                subdirs.append((entry.path, child + "/", rules))
+            elif self.included(entry.name, child):
+                files.append(entry.path)
+        return files, subdirs
+
+    def tree(self, path: str, relpath: str, rules: List[IgnoreRule]) -> Iterator[Tuple[str, List[str]]]:
+        """Depth-first ``scan`` from one directory."""
+        stack = [(path, relpath, rules)]
+        while stack:
+            path = stack[-1][0]
+            files, subdirs = self.scan(*stack.pop())
+            yield path, files
+            stack.extend(reversed(subdirs))
+
+
+class SourceFilter:
+    """Decides for single paths what ``iter_source_files(root, ...)`` would yield.
+
+    For callers told about paths one at a time (file watchers) rather than
+    walking the tree. Every directory between ``root`` and the path is
+    checked the way the walk would check it, ``.gitignore`` files included;
+    those are re-read when they change.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        gitignore: bool = True,
+        default_excludes: bool = True
+    ) -> None:
+        self.root = root
+        self._walk = _Walk(include or DEFAULT_INCLUDE, exclude or (), gitignore, default_excludes)
+        self._gitignores: Dict[str, Tuple[int, List[IgnoreRule]]] = {}  # directory -> (mtime_ns, rules)
+
+    def _gitignore_rules(self, directory: str, relpath: str) -> List[IgnoreRule]:
+        path = os.path.join(directory, ".gitignore")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._gitignores.pop(directory, None)
+            return []
+        cached = self._gitignores.get(directory)
+        if cached is None or cached[0] != mtime:
+            cached = self._gitignores[directory] = (mtime, _read_gitignore(path, relpath))
+        return cached[1]
+
+    def _locate(self, path: str, is_dir: bool) -> Optional[Tuple[str, List[IgnoreRule]]]:
+        """``path`` relative to the root and the rules in force in its directory; None if discovery skips it."""
+        rel = os.path.relpath(path, self.root)
+        if rel == os.curdir:
+            return ("", self._walk.base_rules) if is_dir else None
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        parts = rel.split(os.sep)
+        rules = self._walk.base_rules
+        directory, relpath = self.root, ""
+        for i, part in enumerate(parts):
+            if relpath and any(os.path.exists(os.path.join(directory, m)) for m in ENVIRONMENT_MARKERS):
+                return None
+            if self._walk.gitignore:
+                rules = rules + self._gitignore_rules(directory, relpath)
+            child = relpath + part
+            child_is_dir = is_dir or i < len(parts) - 1
+            if is_ignored(rules, child, child_is_dir) or is_ignored(self._walk.final_rules, child, child_is_dir):
+                return None
+            directory, relpath = os.path.join(directory, part), child + "/"
+        return "/".join(parts), rules
+
+    def __call__(self, path: str, is_dir: bool = False) -> bool:
+        located = self._locate(path, is_dir)
+        if located is None:
+            return False
+        return is_dir or self._walk.included(os.path.basename(path), located[0])
+
+    def iter_tree(self, directory: str) -> Iterator[Tuple[str, List[str]]]:
+        """``iter_source_tree`` output for ``directory`` and below, evaluated as part of ``root``."""
+        located = self._locate(directory, True)
+        if located is not None:
+            relpath, rules = located
+            yield from self._walk.tree(directory, relpath + "/" if relpath else "", rules)
+
+
+def iter_source_tree(
+    root: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    gitignore: bool = True,
+    default_excludes: bool = True,
+    threads: int = 0
+) -> Iterator[Tuple[str, List[str]]]:
+    """Yield ``(directory, matching files in it)`` for every directory entered.
+
+    See ``iter_source_files`` for the arguments and ordering.
+    """
+    walk = _Walk(include or DEFAULT_INCLUDE, exclude or (), gitignore, default_excludes)
+    if threads <= 0:
+        yield from walk.tree(root, "", walk.base_rules)
+        return
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="hoh-discover")
+    try:
+        pending: Dict["Future[Tuple[List[str], List[Tuple[str, str, List[IgnoreRule]]]]]", str] = {
+            pool.submit(walk.scan, root, "", walk.base_rules): root
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                files, subdirs = future.result()
+                for subdir in subdirs:
+                    pending[pool.submit(walk.scan, *subdir)] = subdir[0]
+                yield path, files
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_source_files(
+    root: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    gitignore: bool = True,
+    default_excludes: bool = True,
+    threads: int = 0
+) -> Iterator[str]:
+    """Yield files under ``root`` matching ``include`` and not ignored.
+
+    ``include`` globs match file names (or, when they contain ``/``, paths
+    relative to ``root``) and default to ``*.py``; ``exclude`` takes
+    gitignore-style patterns. Without ``threads`` directories are listed
+    depth-first, each directory's files in name order before its
+    subdirectories; with ``threads`` directories are listed concurrently and
+    the order is unspecified.
+    """
+    for _, files in iter_source_tree(root, include, exclude, gitignore, default_excludes, threads):
+        yield from files
@@ -1,11 +1,69 @@
-from typing import List
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional, Union
+import io
+import mmap
 import os
+import tokenize
+
+from hoh_parser.utils.discovery import iter_source_files
+
+# Files larger than this are refused by ``open_source`` unless the caller
+# raises or lifts the limit; generated modules can run to tens of MB.
+DEFAULT_MAX_FILE_BYTES = 32 * 1024 * 1024
+
+# Below this size a plain read() is cheaper than setting up a mapping.
+MMAP_THRESHOLD = 1024 * 1024
+
+class FileTooLargeError(ValueError):
+    def __init__(self, path: str, size: int, limit: int) -> None:
+        super().__init__(f"{path} is {size} bytes, over the {limit} byte limit")
+        self.path = path
+        self.size = size
+        self.limit = limit
+
+# Raw file contents; ast.parse and hashlib accept either.
+SourceData = Union[bytes, mmap.mmap]
+
+class SourceBuffer(NamedTuple):
+    data: SourceData
+    size: int
+    encoding: str  # as declared by BOM or PEP 263 cookie, else utf-8
 
 def list_py_files(directory: str) -> List[str]:
-    """Recursively list all Python files in a directory."""
-    py_files: List[str] = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py'):
-                py_files.append(os.path.join(root, file))
-    return py_files
+    """Recursively list all Python files in a directory.
+
+    VCS metadata, virtualenvs, build output and anything matched by a
+    ``.gitignore`` are skipped; see ``discovery.iter_source_files``.
+    """
+    return list(iter_source_files(directory))
+
+@contextmanager
+def open_source(path: str, max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES) -> Iterator[SourceBuffer]:
+    """Open a Python source file as undecoded bytes.
+
+    Large files are memory-mapped rather than read, so the contents live in
+    the page cache instead of the heap. Files over ``max_bytes`` raise
+    ``FileTooLargeError`` before anything is read; ``None`` disables the check.
+    An invalid coding cookie raises ``SyntaxError``, as ``ast.parse`` would.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_bytes is not None and size > max_bytes:
+            raise FileTooLargeError(path, size, max_bytes)
+        if size < MMAP_THRESHOLD:
+            data = f.read()
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+            yield SourceBuffer(data, len(data), encoding)
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            encoding, _ = tokenize.detect_encoding(mapped.readline)
+            mapped.seek(0)
+            yield SourceBuffer(mapped, size, encoding)
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # A view of the mapping is still referenced (e.g. by a
+                # traceback); it is unmapped once that is collected.
+                pass
@@ -1,8 +1,10 @@
 import logging
 from typing import Optional
-from hoh_parser.config import settings
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
+    # Imported here: loading settings reads .env and builds a pydantic model,
+    # which modules that merely define a logger should not pay for on import.
+    from hoh_parser.config import settings
     logger = logging.getLogger(name)
     if not logger.hasHandlers():
         handler = logging.StreamHandler()
@@ -0,0 +1,145 @@
+"""Stage timers, latency histograms and an opt-in sampling profiler.
+
+Timers feed fixed-bucket histograms that ``render_metrics`` writes in the
+Prometheus text exposition format. Nothing here imports the configuration,
+so the parser core can be instrumented without depending on it.
+"""
+import cProfile
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Mapping, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Seconds; per-file stages sit at the low end, whole-directory requests at the top.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per value of a single label."""
+
+    def __init__(self, name: str, help: str, label: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        # label value -> [count per bucket..., count above the last bucket]
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: str, seconds: float) -> None:
+        with self._lock:
+            counts = self._counts.get(value)
+            if counts is None:
+                counts = self._counts[value] = [0] * (len(self.buckets) + 1)
+                self._sums[value] = 0.0
+            counts[bisect_left(self.buckets, seconds)] += 1
+            self._sums[value] += seconds
+
+    @contextmanager
+    def time(self, value: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(value, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """``{label value: {"count": n, "sum": seconds}}``."""
+        with self._lock:
+            return {value: {"count": sum(counts), "sum": self._sums[value]} for value, counts in self._counts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((value, list(counts), self._sums[value]) for value, counts in self._counts.items())
+        for value, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{self.label}="{value}"}} {total:.9g}')
+            lines.append(f'{self.name}_count{{{self.label}="{value}"}} {cumulative}')
+        return lines
+
+
+STAGE_SECONDS = Histogram("hoh_stage_seconds", "Time spent in each parse stage.", "stage")
+REQUEST_SECONDS = Histogram("hoh_request_seconds", "JSON-RPC method latency.", "method")
+
+HISTOGRAMS = (STAGE_SECONDS, REQUEST_SECONDS)
+
+
+def timed(stage: str) -> ContextManager[None]:
+    """``with timed("parse"): ...`` records the block under ``hoh_stage_seconds``."""
+    return STAGE_SECONDS.time(stage)
+
+
+def render_metrics(gauges: Optional[Mapping[str, float]] = None) -> str:
+    """All histograms, plus ``gauges`` (name -> value), in Prometheus text format."""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for name, value in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """Runs one call in every ``every`` under cProfile and dumps the profile.
+
+    Profiles are written to ``directory`` as ``<name>-<unix ms>-<n>.prof``
+    (readable with ``pstats`` or snakeviz). ``every=0`` disables sampling;
+    ``configure`` may be called at any time. Only one call is profiled at
+    once; a sample falling due while another is running is skipped.
+    """
+
+    def __init__(self, every: int = 0, directory: str = "profiles") -> None:
+        self.every = every
+        self.directory = directory
+        self.calls = 0
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+
+    def configure(self, every: int, directory: Optional[str] = None) -> None:
+        with self._lock:
+            self.every = max(0, every)
+            if directory is not None:
+                self.directory = directory
+            self.calls = 0
+
+    def call(self, name: str, func: Callable[..., T], *args: Any) -> T:
+        if not self.every:
+            return func(*args)
+        with self._lock:
+            self.calls += 1
+            due = self.calls % self.every == 0
+            directory = self.directory
+        if not due or not self._active.acquire(blocking=False):
+            return func(*args)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args)
+        finally:
+            self._active.release()
+            with self._lock:
+                self.samples += 1
+                sample = self.samples
+            os.makedirs(directory, exist_ok=True)
+            profile.dump_stats(os.path.join(directory, f"{name}-{int(time.time() * 1000)}-{sample}.prof"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"every": self.every, "directory": self.directory, "calls": self.calls, "samples": self.samples}
@@ -1,19 +1,74 @@
 import hoh_parser.api.jsonrpc
 from fastapi import FastAPI
-from hoh_parser.api.jsonrpc import get_jsonrpc_router
+from fastapi.responses import PlainTextResponse
+from hoh_parser.api.jsonrpc import (
+    get_jsonrpc_router, parse_cache, parse_executor, profiler, refresh_paths, worker_pool
+)
+from hoh_parser.api.routes import get_http_router
 from hoh_parser.config import settings
+from hoh_parser.core.watch import FileWatcher
 from hoh_parser.utils.logging import get_logger
+from hoh_parser.utils.metrics import render_metrics
+from typing import Dict, Optional
 
 logger = get_logger("hoh_parser.main")
 
 app = FastAPI(title="Hammer of Hephaestus MCP Server")
 app.mount("/jsonrpc", get_jsonrpc_router())
+app.include_router(get_http_router())
+
+watcher: Optional[FileWatcher] = None
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Stage and request latency histograms plus cache and executor counters (Prometheus format)."""
+    gauges: Dict[str, float] = {}
+    sources = (
+        ("cache", parse_cache.stats()),
+        ("executor", parse_executor.stats()),
+        ("workers", worker_pool.stats()),
+        ("profiler", profiler.stats())
+    )
+    for prefix, stats in sources:
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauges[f"hoh_{prefix}_{key}"] = value
+    return PlainTextResponse(render_metrics(gauges), media_type="text/plain; version=0.0.4")
 
 @app.on_event("startup")
 def startup_event() -> None:
+    global watcher
     logger.info("Starting HoH MCP Server with log level: %s", settings.log_level)
     if settings.debug:
         logger.debug("Debug mode is enabled.")
+    if settings.worker_pool:
+        seconds = worker_pool.start()
+        logger.info("Started %d parse workers in %.2f s", worker_pool.processes, seconds)
+    if settings.watch_roots:
+        watcher = FileWatcher(
+            settings.watch_roots,
+            refresh_paths,
+            include=settings.discovery_include,
+            exclude=settings.discovery_exclude,
+            gitignore=settings.discovery_gitignore,
+            debounce=settings.watch_debounce,
+            max_delay=settings.watch_max_delay,
+            backend=settings.watch_backend,
+            poll_interval=settings.watch_poll_interval,
+            warm_limit=settings.cache_max_entries
+        )
+        watcher.start()
+        logger.info("Watching %s (%s)", ", ".join(watcher.roots), watcher.stats()["backend"])
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    if watcher is not None:
+        watcher.stop()
+    parse_executor.shutdown()
+    worker_pool.shutdown()
+    parse_cache.close()
+    if hoh_parser.api.jsonrpc.embedding_pipeline is not None:
+        hoh_parser.api.jsonrpc.embedding_pipeline.store.flush()
 
 if __name__ == "__main__":
     import uvicorn
@@ -8,5 +8,8 @@ setup(
     author_email="todd@bucy-medrano.me",
     packages=find_packages(),
     install_requires=[],  # All runtime deps are in requirements.txt
+    entry_points={
+        "console_scripts": ["hoh-parse=hoh_parser.cli:main"],
+    },
     python_requires=">=3.11",
 )
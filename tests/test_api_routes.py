@@ -1 +1,136 @@
-# File intentionally left blank after REST API removal.
+import json
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from hoh_parser.api.routes import get_http_router
+
+@pytest_asyncio.fixture
+async def async_client():
+    app = FastAPI()
+    app.include_router(get_http_router())
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        yield ac
+
+@pytest.fixture
+def source_tree(tmp_path):
+    (tmp_path / "a.py").write_text("import os\n\nclass A:\n    def m(self):\n        os.getcwd()\n")
+    (tmp_path / "b.py").write_text("def b():\n    pass\n")
+    (tmp_path / "c.py").write_text("def broken(:\n")
+    return tmp_path
+
+def _lines(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+@pytest.mark.asyncio
+async def test_stream_parse_directory_files(async_client, source_tree):
+    response = await async_client.get("/stream/parse_directory", params={"root": str(source_tree), "workers": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(response)
+    assert [line["path"].rsplit("/", 1)[-1] for line in lines] == ["a.py", "b.py", "c.py"]
+    assert lines[0]["classes"][0]["name"] == "A"
+    assert lines[2]["error"].startswith("SyntaxError")
+
+@pytest.mark.asyncio
+async def test_stream_parse_directory_records(async_client, source_tree):
+    params = {"root": str(source_tree), "workers": 1, "format": "records"}
+    response = await async_client.get("/stream/parse_directory", params=params)
+    records = _lines(response)
+    kinds = [(r["kind"], r.get("name") or r.get("target")) for r in records if r["path"].endswith("a.py")]
+    assert kinds[:3] == [("file", None), ("class", "A"), ("function", "m")]
+    assert ("relationship", "os") in kinds
+    assert ("relationship", "getcwd") in kinds
+    assert records[-1]["kind"] == "error"
+
+@pytest.mark.asyncio
+async def test_parse_file_multipart_upload(async_client):
+    code = b"class Uploaded:\n    pass\n"
+    response = await async_client.post("/parse_file", files={"file": ("up.py", code, "text/x-python")})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["path"] == "up.py"
+    assert data["classes"][0]["name"] == "Uploaded"
+
+@pytest.mark.asyncio
+async def test_parse_file_raw_body(async_client):
+    code = "# -*- coding: latin-1 -*-\ndef caf\xe9():\n    pass\n".encode("latin-1")
+    response = await async_client.post(
+        "/parse_file/raw",
+        params={"filename": "latin.py"},
+        content=code,
+        headers={"content-type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert response.json()["functions"][0]["name"] == "caf\xe9"
+
+@pytest.mark.asyncio
+async def test_parse_file_upload_syntax_error(async_client):
+    response = await async_client.post("/parse_file/raw", params={"filename": "bad.py"}, content=b"def bad(:\n")
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content", [
+    b"x = '\xff\xfe'\n",  # not UTF-8
+    b"# coding: no-such-codec\nx = 1\n",
+    b"x = 1\0\n",  # ValueError on older Pythons
+    b"x = " + b"a." * 100000 + b"b\n",  # too deep to parse
+])
+async def test_parse_file_upload_undecodable(async_client, content):
+    response = await async_client.post("/parse_file/raw", params={"filename": "bad.py"}, content=content)
+    assert response.status_code == 422
+    assert response.json()["detail"].split(":")[0] in ("SyntaxError", "UnicodeDecodeError", "ValueError", "RecursionError")
+
+@pytest.mark.asyncio
+async def test_symbol_table_route(async_client, source_tree):
+    response = await async_client.get("/symbol_table", params={"filepath": str(source_tree / "a.py")})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["classes"][0]["name"] == "A"
+    compact = await async_client.get("/symbol_table", params={"filepath": str(source_tree / "a.py"), "format": "compact"})
+    assert compact.json()["format"] == "compact"
+    missing = await async_client.get("/symbol_table", params={"filepath": str(source_tree / "nope.py")})
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_symbol_table_route_bad_paths(async_client, source_tree, monkeypatch):
+    directory = await async_client.get("/symbol_table", params={"filepath": str(source_tree)})
+    assert directory.status_code == 400 and "IsADirectoryError" in directory.json()["detail"]
+    from hoh_parser.api.jsonrpc import parse_cache
+    monkeypatch.setattr(parse_cache, "max_file_bytes", 8)
+    oversize = await async_client.get("/symbol_table", params={"filepath": str(source_tree / "b.py")})
+    assert oversize.status_code == 413
+
+@pytest.mark.asyncio
+async def test_symbol_table_route_selection(async_client, source_tree):
+    path = str(source_tree / "a.py")
+    selected = await async_client.get("/symbol_table", params={"filepath": path, "relationship_types": ["imports"]})
+    assert [r["type"] for r in selected.json()["relationships"]] == ["imports"]
+    method = await async_client.get("/symbol_table", params={"filepath": path, "symbol": "A.m", "symbols_only": True})
+    assert method.json()["classes"][0]["methods"][0]["name"] == "m" and method.json()["relationships"] == []
+    unknown = await async_client.get("/symbol_table", params={"filepath": path, "symbol": "A.missing"})
+    assert unknown.status_code == 400 and "A.missing" in unknown.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_stream_parse_directory_on_worker_pool(async_client, source_tree, monkeypatch):
+    import hoh_parser.api.jsonrpc
+    from hoh_parser.core.workers import WorkerPool
+    pool = WorkerPool(processes=2)
+    pool.start()
+    monkeypatch.setattr(hoh_parser.api.jsonrpc, "worker_pool", pool)
+    try:
+        response = await async_client.get("/stream/parse_directory", params={"root": str(source_tree)})
+        assert [line["path"].rsplit("/", 1)[-1] for line in _lines(response)] == ["a.py", "b.py", "c.py"]
+        assert pool.stats()["tasks"] >= 1
+    finally:
+        pool.shutdown(wait=True)
+    assert hoh_parser.api.jsonrpc.parse_executor.stats()["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_stream_parse_directory_busy(async_client, source_tree, monkeypatch):
+    from hoh_parser.api.jsonrpc import parse_executor
+    monkeypatch.setattr(parse_executor, "limit", 0)
+    response = await async_client.get("/stream/parse_directory", params={"root": str(source_tree), "workers": 1})
+    assert response.status_code == 503
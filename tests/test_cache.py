@@ -0,0 +1,60 @@
+from hoh_parser.core import cache as cache_module
+from hoh_parser.core.cache import ParseCache
+
+def _write(path, code: str) -> str:
+    path.write_text(code)
+    return str(path)
+
+def test_cache_hit_and_miss(tmp_path) -> None:
+    cache = ParseCache(max_entries=4)
+    path = _write(tmp_path / "a.py", "def a():\n    pass\n")
+    first = cache.parse_file(path)
+    second = cache.parse_file(path)
+    assert second is first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_invalidated_by_content_change(tmp_path) -> None:
+    cache = ParseCache()
+    path = _write(tmp_path / "a.py", "def a():\n    pass\n")
+    assert cache.parse_file(path).functions[0].name == "a"
+    _write(tmp_path / "a.py", "def b():\n    pass\n")
+    assert cache.parse_file(path).functions[0].name == "b"
+    assert cache.stats()["misses"] == 2
+
+def test_cache_lru_eviction(tmp_path) -> None:
+    cache = ParseCache(max_entries=2)
+    paths = [_write(tmp_path / f"m{i}.py", f"x = {i}\n") for i in range(3)]
+    for path in paths:
+        cache.parse_file(path)
+    cache.parse_file(paths[2])
+    cache.parse_file(paths[0])
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+
+def test_cache_persists_to_disk(tmp_path) -> None:
+    cache_dir = str(tmp_path / "cache")
+    path = _write(tmp_path / "a.py", "class A:\n    pass\n")
+    cold = ParseCache(cache_dir=cache_dir)
+    cold.parse_file(path)
+    cold.close()
+    warm = ParseCache(cache_dir=cache_dir)
+    assert warm.parse_file(path).classes[0].name == "A"
+    assert warm.stats()["disk_hits"] == 1
+    assert warm.stats()["misses"] == 0
+
+def test_cache_key_includes_parser_version(monkeypatch) -> None:
+    before = ParseCache.key_for("a.py", b"x = 1\n")
+    monkeypatch.setattr(cache_module, "PARSER_VERSION", "999")
+    assert ParseCache.key_for("a.py", b"x = 1\n") != before
+
+def test_cache_key_includes_selection() -> None:
+    from hoh_parser.core.extract import Selection
+    full = ParseCache.key_for("a.py", b"x = 1\n")
+    symbols = ParseCache.key_for("a.py", b"x = 1\n", Selection(relationships=frozenset()))
+    assert symbols != full
+    cache = ParseCache()
+    assert cache.parse_source(b"x = len([])\n", "a.py", Selection(relationships=frozenset())).relationships == []
+    assert cache.parse_source(b"x = len([])\n", "a.py").relationships != []
@@ -0,0 +1,45 @@
+from hoh_parser.core.chunks import LineIndex, SourceSpan, iter_chunks, utf8_source
+from hoh_parser.core.parser import parse_python_file, parse_python_source
+
+CODE = '''import functools
+
+class A:
+    """Doc."""
+    @functools.cache
+    def m(self):
+        return "é"
+
+def f(x):
+    a = 1
+    b = 2
+    c = 3
+    return a + b + c + x
+'''
+
+def test_chunks_are_exact_source() -> None:
+    result = parse_python_source(CODE, "m.py", include_source=True)
+    chunks = {(c.kind, c.name): c for c in result.chunks}
+    assert chunks[("function", "m")].source_code == '@functools.cache\n    def m(self):\n        return "é"'
+    assert chunks[("function", "m")].lineno == 5 and chunks[("function", "m")].parent == "A"
+    assert chunks[("class", "A")].source_code.startswith('class A:\n    """Doc."""')
+    assert chunks[("function", "f")].source_code == CODE[CODE.index("def f"):].rstrip("\n")
+    assert parse_python_source(CODE, "m.py").chunks == []
+
+def test_sub_chunking_splits_by_lines() -> None:
+    result = parse_python_source(CODE, "m.py", include_source=True, max_chunk_lines=2)
+    parts = [c for c in result.chunks if c.name == "f"]
+    assert [(c.part, c.parts, c.lineno, c.end_lineno) for c in parts] == [(0, 3, 9, 10), (1, 3, 11, 12), (2, 3, 13, 13)]
+    assert "".join(c.source_code + "\n" for c in parts) == CODE[CODE.index("def f"):]
+
+def test_crlf_and_declared_encoding(tmp_path) -> None:
+    path = tmp_path / "latin.py"
+    path.write_bytes("# -*- coding: latin-1 -*-\r\ndef g():\r\n    return 'ü'\r\n".encode("latin-1"))
+    [chunk] = parse_python_file(str(path), include_source=True).chunks
+    assert chunk.source_code == "def g():\r\n    return 'ü'"
+
+def test_line_index_over_buffer() -> None:
+    data = utf8_source(b"\xef\xbb\xbfx = 1\ndef h():\n    pass\n")
+    index = LineIndex(bytearray(data))
+    assert list(index.offsets) == [0, 6, 15, 24]
+    [chunk] = iter_chunks(index, SourceSpan("function", "h", None, 2, 0, 3, 8))
+    assert chunk.source_code == "def h():\n    pass"
@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+from hoh_parser.cli import main
+from hoh_parser.core.models import MCPFile
+
+def _make_tree(root) -> None:
+    os.makedirs(os.path.join(root, "pkg"))
+    with open(os.path.join(root, "a.py"), "w") as f:
+        f.write("def a():\n    return 1\n")
+    with open(os.path.join(root, "pkg", "b.py"), "w") as f:
+        f.write("class B:\n    def m(self):\n        pass\n")
+
+def _lines(capsysbinary):
+    return [json.loads(line) for line in capsysbinary.readouterr().out.splitlines()]
+
+def test_files_and_directories(tmp_path, capsysbinary) -> None:
+    _make_tree(str(tmp_path))
+    extra = tmp_path / "extra.py"
+    extra.write_text("import os\n")
+    assert main([str(tmp_path / "pkg"), str(extra)]) == 0
+    lines = _lines(capsysbinary)
+    assert [os.path.basename(line["path"]) for line in lines] == ["b.py", "extra.py"]
+    assert MCPFile.model_validate(lines[0]).classes[0].name == "B"
+
+def test_errors_set_exit_status(tmp_path, capsysbinary) -> None:
+    _make_tree(str(tmp_path))
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+    assert main([str(tmp_path), "--workers", "2", "--chunksize", "1"]) == 1
+    lines = _lines(capsysbinary)
+    assert len(lines) == 3
+    assert [line["error"].split(":")[0] for line in lines if "error" in line] == ["SyntaxError"]
+
+def test_stdin_source(monkeypatch, capsysbinary) -> None:
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"def f():\n    g()\n")))
+    assert main(["-"]) == 0
+    [line] = _lines(capsysbinary)
+    assert line["path"] == "<stdin>" and line["functions"][0]["name"] == "f"
+
+def test_paths_from(tmp_path, monkeypatch, capsysbinary) -> None:
+    _make_tree(str(tmp_path))
+    listing = f"{tmp_path / 'a.py'}\n\n{tmp_path / 'pkg' / 'b.py'}\n"
+    monkeypatch.setattr(sys, "stdin", io.StringIO(listing))
+    assert main(["--paths-from", "-"]) == 0
+    assert [os.path.basename(line["path"]) for line in _lines(capsysbinary)] == ["a.py", "b.py"]
+
+def test_import_skips_settings_and_pydantic() -> None:
+    code = (
+        "import sys, hoh_parser.cli, hoh_parser.utils.logging; "
+        "print(sorted(m for m in ('pydantic', 'dotenv', 'hoh_parser.config', 'fastapi') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert out.strip() == "[]"
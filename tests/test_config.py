@@ -15,6 +15,8 @@ def test_settings_defaults():
     assert settings.arangodb_url == "http://localhost:8529"
     assert settings.arangodb_user == "root"
     assert settings.arangodb_password == ""
+    assert settings.cache_max_entries == 1024
+    assert settings.cache_dir is None
 
 def test_settings_env(monkeypatch):
     monkeypatch.setenv("DEBUG", "true")
@@ -0,0 +1,54 @@
+import os
+from hoh_parser.core.directory import iter_parse_paths, parse_directory
+from hoh_parser.core.models import MCPDirectory
+
+def _make_tree(root) -> None:
+    os.makedirs(os.path.join(root, "pkg"))
+    with open(os.path.join(root, "a.py"), "w") as f:
+        f.write("def a():\n    return 1\n")
+    with open(os.path.join(root, "pkg", "b.py"), "w") as f:
+        f.write("class B:\n    def m(self):\n        pass\n")
+    with open(os.path.join(root, "pkg", "broken.py"), "w") as f:
+        f.write("def broken(:\n")
+
+def test_parse_directory_serial(tmp_path) -> None:
+    _make_tree(str(tmp_path))
+    result = parse_directory(str(tmp_path), workers=1)
+    assert isinstance(result, MCPDirectory)
+    assert sorted(os.path.basename(f.path) for f in result.files) == ["a.py", "b.py"]
+    assert [os.path.basename(e.path) for e in result.errors] == ["broken.py"]
+    assert result.errors[0].error.startswith("SyntaxError")
+
+def test_parse_directory_process_pool(tmp_path) -> None:
+    _make_tree(str(tmp_path))
+    serial = parse_directory(str(tmp_path), workers=1)
+    parallel = parse_directory(str(tmp_path), workers=2, chunksize=1)
+    assert parallel.model_dump() == serial.model_dump()
+
+def test_iter_parse_paths_keeps_input_order(tmp_path) -> None:
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(f"x{i} = {i}\n")
+        paths.append(str(path))
+    results = list(iter_parse_paths(reversed(paths), workers=2, chunksize=3))
+    assert [path for path, _, _ in results] == list(reversed(paths))
+    assert all(payload is not None and error is None for _, payload, error in results)
+
+def test_parse_directory_oversize_files(tmp_path) -> None:
+    _make_tree(str(tmp_path))
+    skipped = parse_directory(str(tmp_path), workers=1, max_bytes=30)
+    assert [os.path.basename(f.path) for f in skipped.files] == ["a.py"]
+    assert any(e.error.startswith("FileTooLargeError") for e in skipped.errors)
+    outlined = parse_directory(str(tmp_path), workers=1, max_bytes=30, oversize="outline")
+    assert sorted(os.path.basename(f.path) for f in outlined.files) == ["a.py", "b.py"]
+
+def test_one_pathological_file_does_not_sink_the_batch(tmp_path) -> None:
+    _make_tree(str(tmp_path))
+    # Valid syntax, but too deep for the parser's recursion limit.
+    (tmp_path / "deep.py").write_text("x = " + "a." * 100000 + "b\n")
+    result = parse_directory(str(tmp_path), workers=1)
+    assert sorted(os.path.basename(f.path) for f in result.files) == ["a.py", "b.py"]
+    errors = {os.path.basename(e.path): e.error for e in result.errors}
+    assert sorted(errors) == ["broken.py", "deep.py"]
+    assert errors["deep.py"].startswith("RecursionError")
@@ -0,0 +1,75 @@
+import os
+from hoh_parser.utils.discovery import SourceFilter, compile_rules, is_ignored, iter_source_files, iter_source_tree
+
+def _touch(root, relpath: str, content: str = "") -> None:
+    path = os.path.join(root, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def _make_repo(root) -> None:
+    for relpath in (
+        "app/main.py", "app/util.py", "app/gen/models_pb2.py", "app/gen/keep.py",
+        "docs/conf.py", "tests/test_app.py", "README.md",
+        ".git/hooks/x.py", "node_modules/pkg/y.py", "build/lib/app/main.py",
+        "dist/app/main.py", "app/build/steps.py", "app.egg-info/z.py", "app/__pycache__/main.py",
+        "env/lib/python3.11/site-packages/dep.py", "scratch/notes.py",
+    ):
+        _touch(root, relpath)
+    _touch(root, "env/pyvenv.cfg", "home = /usr/bin\n")
+    _touch(root, ".gitignore", "# comment\n/scratch/\n*_pb2.py\n")
+    _touch(root, "app/gen/.gitignore", "*.py\n!keep.py\n")
+
+def _relpaths(root, paths) -> list:
+    return sorted(os.path.relpath(p, root) for p in paths)
+
+def test_default_excludes_and_gitignore(tmp_path) -> None:
+    root = str(tmp_path)
+    _make_repo(root)
+    assert _relpaths(root, iter_source_files(root)) == [
+        "app/build/steps.py", "app/gen/keep.py", "app/main.py", "app/util.py", "docs/conf.py", "tests/test_app.py"
+    ]
+
+def test_include_exclude_and_threads(tmp_path) -> None:
+    root = str(tmp_path)
+    _make_repo(root)
+    found = _relpaths(root, iter_source_files(root, include=["*.py", "*.md"], exclude=["tests/", "docs/**"]))
+    assert found == ["README.md", "app/build/steps.py", "app/gen/keep.py", "app/main.py", "app/util.py"]
+    assert _relpaths(root, iter_source_files(root, include=["app/*.py"])) == ["app/main.py", "app/util.py"]
+    everything = _relpaths(root, iter_source_files(root, gitignore=False, default_excludes=False))
+    assert "node_modules/pkg/y.py" in everything and "scratch/notes.py" in everything
+    assert "env/lib/python3.11/site-packages/dep.py" not in everything  # virtualenv marker
+    assert _relpaths(root, iter_source_files(root, threads=4)) == _relpaths(root, iter_source_files(root))
+
+def test_source_filter_agrees_with_the_walk(tmp_path) -> None:
+    root = str(tmp_path)
+    _make_repo(root)
+    selected = SourceFilter(root, exclude=["tests/"])
+    walked = set(iter_source_files(root, exclude=["tests/"]))
+    every = [os.path.join(d, name) for d, _, names in os.walk(root) for name in names]
+    assert [p for p in every if selected(p) != (p in walked)] == []
+    assert selected(os.path.join(root, "app"), is_dir=True)
+    assert not selected(os.path.join(root, "scratch", "new"), is_dir=True)
+    assert list(selected.iter_tree(root)) == list(iter_source_tree(root, exclude=["tests/"]))
+    assert _relpaths(root, [p for _, files in selected.iter_tree(os.path.join(root, "app")) for p in files]) == [
+        "app/build/steps.py", "app/gen/keep.py", "app/main.py", "app/util.py"
+    ]
+    assert list(selected.iter_tree(os.path.join(root, "node_modules"))) == []
+
+def test_serial_order_is_files_then_subdirectories(tmp_path) -> None:
+    root = str(tmp_path)
+    for relpath in ("b.py", "a/z.py", "a.py", "a/b/c.py"):
+        _touch(root, relpath)
+    assert [os.path.relpath(p, root) for p in iter_source_files(root)] == ["a.py", "b.py", "a/z.py", "a/b/c.py"]
+
+def test_gitignore_patterns() -> None:
+    rules = compile_rules(["*.log", "/top.py", "doc/*.py", "**/cache/", "data/**", "x?[0-9].py", r"\!bang.py"])
+    assert is_ignored(rules, "deep/dir/a.log", False)
+    assert is_ignored(rules, "top.py", False) and not is_ignored(rules, "sub/top.py", False)
+    assert is_ignored(rules, "doc/a.py", False) and not is_ignored(rules, "doc/sub/a.py", False)
+    assert is_ignored(rules, "a/b/cache", True) and not is_ignored(rules, "a/b/cache", False)
+    assert is_ignored(rules, "data/a/b.py", False)
+    assert is_ignored(rules, "xa1.py", False) and not is_ignored(rules, "xab.py", False)
+    assert is_ignored(rules, "!bang.py", False)
+    nested = compile_rules(["*.py"], base="pkg/")
+    assert is_ignored(nested, "pkg/sub/m.py", False) and not is_ignored(nested, "other/m.py", False)
@@ -0,0 +1,80 @@
+import numpy as np
+
+from hoh_parser.core.embeddings import EmbeddingPipeline, HashingEncoder, token_batches
+from hoh_parser.core.parser import parse_python_source
+from hoh_parser.core.vector_store import VectorStore
+
+
+SOURCE = '''
+def read_config(path):
+    """Load the settings file."""
+    with open(path) as f:
+        return f.read()
+
+class HttpClient:
+    def send_request(self, url):
+        return fetch(url)
+'''
+
+
+class CountingEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__(dimension=64)
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(len(texts))
+        return super().encode(texts)
+
+
+def test_hashing_encoder_is_deterministic_unit_length():
+    encoder = HashingEncoder(dimension=64)
+    a, b, c = encoder.encode(["read_config path", "readConfig path", "send the request"])
+    assert np.allclose(np.linalg.norm([a, b, c], axis=1), 1.0)
+    assert np.allclose(a, b)  # identifiers split into the same parts
+    assert np.allclose(HashingEncoder(dimension=64).encode(["send the request"])[0], c)
+
+
+def test_token_batches_respect_padded_budget():
+    lengths = [5, 100, 7, 6, 90, 300]
+    batches = token_batches(lengths, 200)
+    assert sorted(i for batch in batches for i in batch) == list(range(6))
+    assert batches == [[0, 3, 2], [4, 1], [5]]
+    assert all(len(batch) == 1 or len(batch) * max(lengths[i] for i in batch) <= 200 for batch in batches)
+
+
+def test_pipeline_encodes_only_new_content(tmp_path):
+    encoder = CountingEncoder()
+    pipeline = EmbeddingPipeline(encoder, VectorStore(encoder.dimension, str(tmp_path), encoder.name))
+    file = parse_python_source(SOURCE, "mod.py", include_source=True)
+    counts = pipeline.embed_files([file])
+    assert (counts["symbols"], counts["encoded"]) == (3, 3)
+    assert pipeline.embed_files([file])["unchanged"] == 3
+    edited = parse_python_source(SOURCE.replace("fetch(url)", "fetch(url, timeout=5)"), "mod.py", include_source=True)
+    counts = pipeline.embed_files([edited])
+    assert (counts["encoded"], counts["unchanged"]) == (2, 1)  # the method and its class
+    copy = parse_python_source(SOURCE.replace("fetch(url)", "fetch(url, timeout=5)"), "copy.py", include_source=True)
+    assert pipeline.embed_files([copy])["reused"] == 3
+    assert pipeline.embed_files([parse_python_source("x = 1\n", "mod.py", include_source=True)])["removed"] == 3
+    assert sum(encoder.calls) == 5
+    [(meta, score)] = pipeline.search("load settings config file", top=1)
+    assert (meta["path"], meta["name"]) == ("copy.py", "read_config")
+
+
+def test_store_persists_and_ivf_finds_neighbours(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store = VectorStore(32, str(tmp_path), model="test")
+    for i, vector in enumerate(vectors):
+        store.put(f"id{i}", f"h{i}", vector, {"path": f"f{i % 7}.py"})
+    store.remove_path("f0.py")
+    store.flush()
+    reopened = VectorStore(32, str(tmp_path), model="test")
+    assert len(reopened) == len(store) and reopened.paths.keys() == store.paths.keys()
+    [(meta, score)] = reopened.search(vectors[1], top=1)
+    assert meta["id"] == "id1" and score > 0.999
+    assert [m["id"] for m, _ in reopened.search(vectors[3], top=1, nprobe=4)] == ["id3"]
+    assert all(m["path"] != "f0.py" for m, _ in reopened.search(vectors[0], top=20))
+    assert reopened.search(vectors[0], top=0) == reopened.search(vectors[0], top=-1, nprobe=4) == []
+    assert len(VectorStore(32, str(tmp_path), model="other")) == 0
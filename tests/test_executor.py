@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import pytest
+
+from hoh_parser.api.executor import BoundedExecutor, ServerBusyError
+
+@pytest.mark.asyncio
+async def test_bounded_executor_runs_off_loop():
+    executor = BoundedExecutor(max_workers=2, max_queue=0)
+    loop_thread = threading.get_ident()
+    worker_thread = await executor.run(threading.get_ident)
+    assert worker_thread != loop_thread
+    assert executor.stats()["in_flight"] == 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_bounded_executor_rejects_when_full():
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(ServerBusyError):
+        await executor.run(release.wait)
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_bounded_executor_holds_slot_of_cancelled_call():
+    executor = BoundedExecutor(max_workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+    def work():
+        started.set()
+        return release.wait()
+    task = asyncio.ensure_future(executor.run(work))
+    await asyncio.get_running_loop().run_in_executor(None, started.wait)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # The thread is still running, so its slot is still taken.
+    assert executor.stats()["in_flight"] == 1
+    with pytest.raises(ServerBusyError):
+        await executor.run(threading.get_ident)
+    release.set()
+    for _ in range(100):
+        if executor.stats()["in_flight"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert executor.stats()["in_flight"] == 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_bounded_executor_run_all_admits_the_whole_batch():
+    executor = BoundedExecutor(max_workers=2, max_queue=1)
+    release = threading.Event()
+    blocker = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0)
+    calls = []
+    with pytest.raises(ServerBusyError):
+        await executor.run_all(calls.append, [(1,), (2,), (3,)])
+    assert calls == [] and executor.stats()["in_flight"] == 1
+    release.set()
+    await blocker
+    assert await executor.run_all(abs, [(-1,), (-2,), (-3,)]) == [1, 2, 3]
+    assert executor.stats()["in_flight"] == 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_bounded_executor_run_all_cancels_queued_calls_on_failure():
+    executor = BoundedExecutor(max_workers=1, max_queue=2)
+    release = threading.Event()
+    started = []
+    def work(fail):
+        started.append(fail)
+        if fail:
+            raise RuntimeError("first call failed")
+        release.wait(0.5)
+    with pytest.raises(RuntimeError):
+        await executor.run_all(work, [(True,), (False,), (False,)])
+    release.set()
+    for _ in range(100):
+        if executor.stats()["in_flight"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert executor.stats()["in_flight"] == 0
+    # The second call may have started; the third waited behind it and never does.
+    assert started[0] is True and len(started) < 3
+    executor.shutdown()
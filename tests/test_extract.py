@@ -0,0 +1,78 @@
+import ast
+import pytest
+from hoh_parser.core.extract import RELATIONSHIP_TYPES, EdgeTable, Selection, extract_compact
+from hoh_parser.core.models import MCPFile, MCPRelationship
+from hoh_parser.core.parser import parse_python_source
+
+def test_relationship_codes_cover_model_types() -> None:
+    model_types = MCPRelationship.model_fields["type"].annotation.__args__
+    assert set(RELATIONSHIP_TYPES) == set(model_types)
+
+def test_edge_table_interns_strings() -> None:
+    table = EdgeTable()
+    table.add("a.py", "print", 1)
+    table.add("a.py", "print", 1)
+    table.add("a.py", "len", 1)
+    assert table.strings == ["a.py", "print", "len"]
+    assert len(table) == 3
+    assert list(table)[2] == ("a.py", "len", "calls")
+
+def test_compact_file_matches_model_layout() -> None:
+    code = '''
+"""Module doc."""
+import os
+
+class A(Base):
+    """A doc."""
+    @property
+    def p(self):
+        return os.getcwd()
+
+def f(x):
+    y = x
+    return y
+'''
+    compact = extract_compact(ast.parse(code), "m.py")
+    assert isinstance(compact.to_dict()["relationships"][0], dict)
+    assert MCPFile.model_validate(compact.to_dict()) == parse_python_source(code, "m.py")
+    assert parse_python_source(code, "m.py").model_dump() == compact.to_dict()
+
+SELECTION_CODE = """import os
+
+class A(Base):
+    def m(self):
+        os.getcwd()
+
+    def n(self):
+        x = len([])
+
+def f():
+    try:
+        import json
+    except ImportError:
+        y = 1
+    return print(y)
+"""
+
+def test_selection_relationship_types_skip_work() -> None:
+    tree = ast.parse(SELECTION_CODE)
+    full = extract_compact(tree, "m.py")
+    for types in ({"inherits"}, {"imports", "assigns"}, {"calls"}):
+        selected = extract_compact(tree, "m.py", selection=Selection(relationships=frozenset(types)))
+        assert list(selected.edges) == [edge for edge in full.edges if edge[2] in types]
+    symbols = extract_compact(tree, "m.py", selection=Selection(relationships=frozenset()))
+    assert len(symbols.edges) == 0
+    assert symbols.to_dict()["classes"] == full.to_dict()["classes"]
+    with pytest.raises(ValueError):
+        extract_compact(tree, "m.py", selection=Selection(relationships=frozenset({"nope"})))
+
+def test_selection_line_range_and_symbol() -> None:
+    tree = ast.parse(SELECTION_CODE)
+    ranged = extract_compact(tree, "m.py", selection=Selection(start_line=10, end_line=20))
+    assert [f.name for f in ranged.functions] == ["f"] and ranged.classes == []
+    method = extract_compact(tree, "m.py", selection=Selection(symbol="A.n"))
+    assert [m.name for m in method.classes[0].methods] == ["n"]
+    assert ("m.py", "len", "calls") in list(method.edges)
+    assert ("m.py", "getcwd", "calls") not in list(method.edges)
+    with pytest.raises(ValueError):
+        extract_compact(tree, "m.py", selection=Selection(symbol="A.missing"))
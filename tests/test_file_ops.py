@@ -33,3 +33,20 @@ def test_list_py_files_recursive():
         assert py1 in files
         assert py2 in files
         assert all(f.endswith('.py') for f in files)
+
+def test_open_source_maps_large_files(tmp_path, monkeypatch):
+    import mmap
+    import pytest
+    from hoh_parser.utils import file_ops
+    from hoh_parser.utils.file_ops import FileTooLargeError, open_source
+    path = tmp_path / "big.py"
+    path.write_bytes("# -*- coding: latin-1 -*-\nx = '\xe9'\n".encode("latin-1") + b"y = 1\n" * 100)
+    with open_source(str(path)) as source:
+        assert isinstance(source.data, bytes) and source.encoding == "iso-8859-1"
+    monkeypatch.setattr(file_ops, "MMAP_THRESHOLD", 0)
+    with open_source(str(path)) as source:
+        assert isinstance(source.data, mmap.mmap)
+        assert source.data[:1] == b"#" and source.size == path.stat().st_size
+    with pytest.raises(FileTooLargeError):
+        with open_source(str(path), max_bytes=100):
+            pass
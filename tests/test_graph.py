@@ -0,0 +1,58 @@
+import pytest
+
+from hoh_parser.core.graph import RelationshipGraph
+from hoh_parser.core.symbols import SymbolIndex
+
+
+EDGES = [
+    ("a", "b", "calls"),
+    ("b", "c", "calls"),
+    ("c", "d", "calls"),
+    ("a", "b", "calls"),
+    ("x", "a", "imports"),
+    ("p", "q", "imports"),
+    ("q", "r", "imports"),
+    ("r", "p", "imports"),
+    ("s", "s", "imports"),
+]
+
+
+def test_reachable_forward_reverse_and_limits():
+    graph = RelationshipGraph.from_edges(EDGES)
+    assert graph.reachable("a", ["calls"]) == (3, [("b", 1), ("c", 2), ("d", 3)])
+    assert graph.reachable("d", ["calls"], reverse=True) == (3, [("c", 1), ("b", 2), ("a", 3)])
+    assert graph.reachable("d", None, reverse=True, max_depth=2) == (2, [("c", 1), ("b", 2)])
+    assert graph.reachable("x", limit=2) == (4, [("a", 1), ("b", 2)])
+    assert graph.reachable("missing") == (0, [])
+
+
+def test_cycles_are_strongly_connected_components():
+    graph = RelationshipGraph.from_edges(EDGES)
+    assert graph.cycles(["imports"]) == [["p", "q", "r"], ["s"]]
+    assert graph.cycles(["calls"]) == []
+
+
+def test_pagerank_ranks_sinks_of_chains_highest():
+    graph = RelationshipGraph.from_edges(EDGES)
+    assert graph.pagerank().sum() == pytest.approx(1.0)
+    assert [name for name, _ in graph.top_ranked(["calls"], 2)] == ["d", "c"]
+    assert [name for name, _ in graph.top_ranked(["calls"], 5, among=["a", "b", "zzz"])] == ["b", "a"]
+    assert graph.top_ranked(["calls"], 0) == graph.top_ranked(["calls"], -1) == []
+    assert graph.top_ranked(["calls"], -1, among=[]) == []
+
+
+def test_unknown_relationship_type():
+    with pytest.raises(ValueError, match="calls_to"):
+        RelationshipGraph.from_edges(EDGES).csr(["calls_to"])
+
+
+def test_graph_edges_from_symbol_index(tmp_path):
+    (tmp_path / "lib.py").write_text("class Base:\n    pass\ndef util():\n    pass\n")
+    (tmp_path / "use.py").write_text("from lib import Base, util\nclass C(Base):\n    def m(self):\n        util()\n")
+    edges = set(SymbolIndex.build(str(tmp_path), workers=1).graph_edges())
+    assert {
+        ("use.C", "use.C.m", "defines"),
+        ("use.C.m", "lib.util", "calls"),
+        ("use.C", "lib.Base", "inherits"),
+        ("use", "lib", "imports"),
+    } <= edges
@@ -0,0 +1,104 @@
+import difflib
+
+import pytest
+
+from hoh_parser.core.incremental import IncrementalFile, LineEdit, LineRangeError, changed_lines, parse_unified_diff, split_lines
+from hoh_parser.core.parser import parse_python_source
+
+
+SOURCE = '''# header
+# comment
+
+"""Module docstring."""
+import os
+
+
+class Base:
+    def run(self):
+        pass
+
+
+class Worker(Base):
+    def run(self):
+        return os.getcwd()
+
+
+def main():
+    Worker().run()
+'''
+
+
+def full(text):
+    return parse_python_source(text, "mod.py").model_dump()
+
+
+def test_parse_matches_full_parse():
+    assert IncrementalFile.parse("mod.py", SOURCE).result.model_dump() == full(SOURCE)
+
+
+def test_edit_reparses_only_the_touched_statement():
+    state = IncrementalFile.parse("mod.py", SOURCE)
+    text = SOURCE.replace("        return os.getcwd()\n", "        path = os.getcwd()\n        return path\n")
+    updated = state.update(text)
+    assert updated.reparsed_lines == 4  # class Worker only
+    assert updated.result.model_dump() == full(text)
+    assert updated.result.functions[0].lineno == state.result.functions[0].lineno + 1
+    assert updated.result.classes[0] is state.result.classes[0]  # untouched entries are reused
+
+
+def test_overrides_and_docstring_follow_edits():
+    state = IncrementalFile.parse("mod.py", SOURCE)
+    text = SOURCE.replace("    def run(self):\n        pass\n", "    def start(self):\n        pass\n")
+    updated = state.update(text)
+    assert not any(r.type == "overrides" for r in updated.result.relationships)
+    assert updated.result.model_dump() == full(text)
+    text = text.replace('"""Module docstring."""\n', "")
+    assert updated.update(text).result.docstring is None
+
+
+def test_apply_unified_diff():
+    state = IncrementalFile.parse("mod.py", SOURCE)
+    new = SOURCE.replace("def main():\n", "@entry\ndef main(argv):\n") + "\nmain([])\n"
+    diff = "".join(difflib.unified_diff(state.lines, split_lines(new), "a/mod.py", "b/mod.py"))
+    updated = state.apply_diff(diff)
+    assert updated.text == new
+    assert updated.result.model_dump() == full(new)
+    with pytest.raises(ValueError, match="does not apply"):
+        updated.apply_diff(diff)
+
+
+def test_edit_that_only_parses_with_the_rest_of_the_file_falls_back():
+    state = IncrementalFile.parse("mod.py", SOURCE)
+    # Two lines below the class: not valid alone, but part of the class body.
+    text = SOURCE.replace("        pass\n\n\n", "        pass\n\n\n    extra = 1\n")
+    updated = state.update(text)
+    assert updated.reparsed_lines == len(updated.lines)
+    assert updated.result.classes[0].end_lineno == 13
+    assert updated.result.model_dump() == full(text)
+    with pytest.raises(SyntaxError):
+        state.update(SOURCE.replace("def main():", "def main(:"))
+
+
+@pytest.mark.parametrize("start_line, end_line", [(0, 1), (5, 3), (17, 30), (21, 20)])
+def test_update_rejects_line_range_outside_the_file(start_line, end_line):
+    state = IncrementalFile.parse("mod.py", SOURCE)
+    assert len(state.lines) == 19
+    with pytest.raises(LineRangeError):
+        state.update(SOURCE, start_line, end_line)
+
+
+def test_update_rejects_line_range_the_new_text_cannot_hold():
+    state = IncrementalFile.parse("mod.py", SOURCE)
+    with pytest.raises(LineRangeError):
+        state.update("x = 1\n", 18, 19)
+    # Appending at the end is an insertion before line len + 1.
+    text = SOURCE + "main()\n"
+    assert state.update(text, 20, 19).result.model_dump() == full(text)
+
+
+def test_changed_lines_and_diff_helpers():
+    old = split_lines("a\nb\nc\n")
+    assert changed_lines(old, split_lines("a\nx\ny\nc\n")) == LineEdit(2, 2, ("x\n", "y\n"))
+    assert changed_lines(old, split_lines("a\nc\n")) == LineEdit(2, 2, ())
+    new, edit = parse_unified_diff("@@ -3,0 +4 @@\n+d\n", old)
+    assert new == split_lines("a\nb\nc\nd\n") and edit.start == 4 and edit.lines == ("d\n",)
@@ -0,0 +1,88 @@
+import os
+from hoh_parser.core import indexer as indexer_module
+from hoh_parser.core.indexer import IncrementalIndexer
+
+def _names(delta) -> list:
+    return sorted(os.path.basename(f.path) for f in delta.changed)
+
+def test_first_reindex_parses_everything(tmp_path) -> None:
+    (tmp_path / "a.py").write_text("def a():\n    pass\n")
+    (tmp_path / "b.py").write_text("def b():\n    pass\n")
+    delta = IncrementalIndexer(str(tmp_path), workers=1).reindex()
+    assert _names(delta) == ["a.py", "b.py"]
+    assert delta.deleted == []
+    assert delta.unchanged == 0
+
+def test_reindex_follows_discovery_rules(tmp_path) -> None:
+    (tmp_path / "a.py").write_text("def a():\n    pass\n")
+    (tmp_path / ".gitignore").write_text("generated.py\n")
+    (tmp_path / "generated.py").write_text("def g():\n    pass\n")
+    os.makedirs(tmp_path / "venv" / "lib")
+    (tmp_path / "venv" / "pyvenv.cfg").write_text("")
+    (tmp_path / "venv" / "lib" / "dep.py").write_text("def dep():\n    pass\n")
+    assert _names(IncrementalIndexer(str(tmp_path), workers=1).reindex()) == ["a.py"]
+    everything = IncrementalIndexer(str(tmp_path), workers=1, discover=lambda root: [str(tmp_path / "generated.py")])
+    assert _names(everything.reindex()) == ["generated.py"]
+
+def test_reindex_only_changed_added_and_deleted(tmp_path) -> None:
+    a = tmp_path / "a.py"
+    b = tmp_path / "b.py"
+    a.write_text("def a():\n    pass\n")
+    b.write_text("def b():\n    pass\n")
+    indexer = IncrementalIndexer(str(tmp_path), workers=1)
+    indexer.reindex()
+
+    assert indexer.reindex().changed == []
+    a.write_text("def a2():\n    pass\n")
+    b.unlink()
+    (tmp_path / "c.py").write_text("x = 1\n")
+    delta = indexer.reindex()
+    assert _names(delta) == ["a.py", "c.py"]
+    assert delta.deleted == [str(b)]
+    assert [f.name for f in delta.changed[0].functions] == ["a2"]
+
+def test_touch_without_content_change_is_not_reparsed(tmp_path) -> None:
+    a = tmp_path / "a.py"
+    a.write_text("x = 1\n")
+    indexer = IncrementalIndexer(str(tmp_path), workers=1)
+    indexer.reindex()
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    delta = indexer.reindex()
+    assert delta.changed == []
+    assert delta.unchanged == 1
+
+def test_manifest_persists_between_instances(tmp_path) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text("x = 1\n")
+    (src / "broken.py").write_text("def broken(:\n")
+    manifest = str(tmp_path / "manifest.json")
+    first = IncrementalIndexer(str(src), manifest_path=manifest, workers=1).reindex()
+    assert len(first.errors) == 1
+    second = IncrementalIndexer(str(src), manifest_path=manifest, workers=1).reindex()
+    # The broken file is reported again until it is fixed.
+    assert second.changed == [] and [os.path.basename(e.path) for e in second.errors] == ["broken.py"]
+    assert second.unchanged == 1
+
+def test_file_that_stops_parsing_is_reported_not_deleted(tmp_path) -> None:
+    a = tmp_path / "a.py"
+    a.write_text("x = 1\n")
+    indexer = IncrementalIndexer(str(tmp_path), workers=1)
+    indexer.reindex()
+    a.write_text("def broken(:\n")
+    for _ in range(2):
+        delta = indexer.reindex()
+        assert [e.path for e in delta.errors] == [str(a)] and delta.deleted == []
+    a.write_text("x = 2\n")
+    assert _names(indexer.reindex()) == ["a.py"]
+
+def test_manifest_from_other_parser_version_is_ignored(tmp_path, monkeypatch) -> None:
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.py").write_text("x = 1\n")
+    manifest = str(tmp_path / "manifest.json")
+    IncrementalIndexer(str(src), manifest_path=manifest, workers=1).reindex()
+    monkeypatch.setattr(indexer_module, "PARSER_VERSION", "999")
+    delta = IncrementalIndexer(str(src), manifest_path=manifest, workers=1).reindex()
+    assert _names(delta) == ["a.py"]
@@ -0,0 +1,123 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from hoh_parser.ingestion.arangodb import ArangoBulkWriter, IngestionError, document_key, ingest_directory
+
+class StubArango:
+    """Minimal stand-in for ArangoDB's collection and bulk import endpoints."""
+
+    def __init__(self, fail_first: int = 0) -> None:
+        self.fail_first = fail_first
+        self.imports: list = []  # (collection, query, documents)
+        self.collections: list = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                url = urlparse(self.path)
+                if stub.fail_first:
+                    stub.fail_first -= 1
+                    self._reply(503, {"error": True})
+                elif url.path.endswith("/_api/collection"):
+                    stub.collections.append(json.loads(body))
+                    self._reply(200, {})
+                else:
+                    query = parse_qs(url.query)
+                    docs = [json.loads(line) for line in body.splitlines()]
+                    stub.imports.append((query["collection"][0], query, docs))
+                    self._reply(201, {"error": False, "created": len(docs), "errors": 0, "updated": 0})
+
+            def _reply(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def documents(self, collection: str) -> list:
+        return [doc for name, _, docs in self.imports if name == collection for doc in docs]
+
+@pytest.fixture
+def stub():
+    server = StubArango()
+    yield server
+    server.server.shutdown()
+
+def _make_tree(root) -> None:
+    (root / "shapes.py").write_text(
+        "import math\n"
+        "class Shape:\n"
+        "    def area(self):\n"
+        "        pass\n"
+        "class Circle(Shape):\n"
+        "    def area(self):\n"
+        "        return math.pi\n"
+        "def make():\n"
+        "    return Circle()\n"
+    )
+    (root / "broken.py").write_text("def broken(:\n")
+
+def test_document_key() -> None:
+    assert document_key("pkg.mod.Class.method") == "pkg.mod.Class.method"
+    assert document_key("a b/<c>") == "a_b__c_"
+    long = document_key("x" * 400)
+    assert len(long) <= 254 and long != document_key("x" * 401)
+
+def test_ingest_directory(stub, tmp_path) -> None:
+    _make_tree(tmp_path)
+    with ArangoBulkWriter(url=stub.url, database="code", batch_size=3, backoff=0) as writer:
+        writer.ensure_collections()
+        stats = ingest_directory(str(tmp_path), writer, workers=1)
+    assert [c["name"] for c in stub.collections] == [
+        "files", "classes", "functions", "contains", "calls", "inherits", "references"
+    ]
+    assert stats["failed_files"] == 1
+    assert stats["documents"] == stats["created"] == sum(len(docs) for _, _, docs in stub.imports)
+    assert all(len(docs) <= 3 for _, _, docs in stub.imports)
+    assert all(q["onDuplicate"] == ["update"] for _, q, _ in stub.imports)
+
+    classes = {d["_key"]: d for d in stub.documents("classes")}
+    assert classes["shapes.Circle"]["methods"] == ["shapes.Circle.area"]
+    assert {d["_key"] for d in stub.documents("functions")} == {"shapes.Shape.area", "shapes.Circle.area", "shapes.make"}
+    edges = {(d["_from"], d["_to"], d["type"]) for name in ("inherits", "calls", "references") for d in stub.documents(name)}
+    assert ("classes/shapes.Circle", "classes/shapes.Shape", "inherits") in edges
+    assert ("functions/shapes.Circle.area", "functions/shapes.Shape.area", "overrides") in edges
+    assert ("files/shapes", "classes/shapes.Circle", "calls") in edges
+    assert ("files/shapes", "files/math", "imports") in edges
+
+def test_reingest_uses_same_keys(stub, tmp_path) -> None:
+    _make_tree(tmp_path)
+    runs = []
+    for _ in range(2):
+        stub.imports.clear()
+        with ArangoBulkWriter(url=stub.url, backoff=0) as writer:
+            ingest_directory(str(tmp_path), writer, workers=1)
+        runs.append(sorted((name, d["_key"]) for name, _, docs in stub.imports for d in docs))
+    assert runs[0] == runs[1]
+
+def test_retries_with_backoff(tmp_path) -> None:
+    stub = StubArango(fail_first=2)
+    try:
+        with ArangoBulkWriter(url=stub.url, max_retries=2, backoff=0) as writer:
+            writer.add("files", {"_key": "a"})
+            writer.flush()
+            assert writer.stats()["retries"] == 2 and writer.stats()["created"] == 1
+        stub.fail_first = 5
+        writer = ArangoBulkWriter(url=stub.url, max_retries=1, backoff=0)
+        writer.add("files", {"_key": "b"})
+        with pytest.raises(IngestionError):
+            writer.close()
+    finally:
+        stub.server.shutdown()
@@ -6,6 +6,7 @@ from httpx import AsyncClient, ASGITransport
 from asgi_lifespan import LifespanManager
 
 import base64
+import os
 import tempfile
 
 import types
@@ -50,6 +51,8 @@ async def test_health_check(async_client):
         print("DEBUG: response.json() =", data)
     assert data["result"]["status"] == "ok"
     assert "server_time" in data["result"]
+    assert {"hits", "misses"} <= set(data["result"]["cache"])
+    assert {"started", "processes", "recycled"} <= set(data["result"]["workers"])
 
 @pytest.mark.asyncio
 async def test_get_capabilities(async_client):
@@ -82,6 +85,7 @@ async def test_parse_file(async_client):
     assert response.status_code == 200
     assert "functions" in data["result"]
     assert any(f["name"] == "foo" for f in data["result"]["functions"])
+    assert data["result"]["path"] == "foo.py"
 
 @pytest.mark.asyncio
 async def test_symbol_table(async_client):
@@ -102,3 +106,289 @@ async def test_symbol_table(async_client):
     assert response.status_code == 200
     assert "functions" in data["result"]
     assert any(f["name"] == "bar" for f in data["result"]["functions"])
+
+@pytest.mark.asyncio
+async def test_parse_directory(async_client, tmp_path):
+    (tmp_path / "mod.py").write_text("def baz():\n    pass\n")
+    (tmp_path / "bad.py").write_text("def bad(:\n")
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "parse_directory",
+        "params": {"root": str(tmp_path), "workers": 1},
+        "id": 5
+    }
+    response = await async_client.post("/jsonrpc/", json=payload)
+    data = response.json()
+    assert response.status_code == 200
+    assert [f["functions"][0]["name"] for f in data["result"]["files"]] == ["baz"]
+    assert data["result"]["errors"][0]["path"].endswith("bad.py")
+
+@pytest.mark.asyncio
+async def test_parse_file_busy(async_client, monkeypatch):
+    monkeypatch.setattr(hoh_parser.api.jsonrpc.parse_executor, "limit", 0)
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "parse_file",
+        "params": {"filename": "foo.py", "content_b64": base64.b64encode(b"x = 1\n").decode()},
+        "id": 6
+    }
+    response = await async_client.post("/jsonrpc/", json=payload)
+    assert response.json()["error"]["code"] == -32001
+    health = await async_client.post("/jsonrpc/", json={"jsonrpc": "2.0", "method": "health_check", "params": {}, "id": 7})
+    assert health.json()["result"]["executor"]["rejected"] >= 1
+
+@pytest.mark.asyncio
+async def test_parse_files_busy_refuses_the_whole_batch(async_client, monkeypatch):
+    from hoh_parser.api import jsonrpc
+    parsed = []
+    monkeypatch.setattr(jsonrpc, "_parse_items", lambda items: parsed.extend(items) or [])
+    # Room for one slice of the batch but not all of them.
+    monkeypatch.setattr(jsonrpc.parse_executor, "limit", jsonrpc.parse_executor.in_flight + 1)
+    items = [{"filename": f"m{i}.py", "content_b64": base64.b64encode(b"x = 1\n").decode()} for i in range(3)]
+    payload = {"jsonrpc": "2.0", "method": "parse_files", "params": {"items": items}, "id": 1}
+    response = await async_client.post("/jsonrpc/", json=payload)
+    assert response.json()["error"]["code"] == -32001
+    assert parsed == []
+
+@pytest.mark.asyncio
+async def test_parse_files_batch(async_client):
+    sources = {
+        "a.py": "def a():\n    pass\n",
+        "bad.py": "def bad(:\n",
+        "c.py": "class C:\n    pass\n",
+    }
+    items = [{"filename": name, "content_b64": base64.b64encode(code.encode()).decode()} for name, code in sources.items()]
+    items.append({"filename": "garbled.py", "content_b64": "!!not base64"})
+    payload = {"jsonrpc": "2.0", "method": "parse_files", "params": {"items": items}, "id": 8}
+    response = await async_client.post("/jsonrpc/", json=payload)
+    results = response.json()["result"]
+    assert [r["path"] for r in results] == ["a.py", "bad.py", "c.py", "garbled.py"]
+    assert results[0]["file"]["functions"][0]["name"] == "a"
+    assert results[1]["file"] is None and results[1]["error"].startswith("SyntaxError")
+    assert results[2]["file"]["classes"][0]["name"] == "C"
+    assert results[3]["error"].startswith("Error")
+
+@pytest.mark.asyncio
+async def test_find_definition_and_callers(async_client, tmp_path):
+    (tmp_path / "lib.py").write_text("def util():\n    pass\n")
+    (tmp_path / "use.py").write_text("from lib import util\ndef run():\n    util()\n")
+    root = str(tmp_path)
+    response = await async_client.post("/jsonrpc/", json={
+        "jsonrpc": "2.0", "method": "index_directory", "params": {"root": root, "workers": 1}, "id": 9
+    })
+    assert response.json()["result"]["definitions"] == 2
+    response = await async_client.post("/jsonrpc/", json={
+        "jsonrpc": "2.0", "method": "find_definition", "params": {"root": root, "name": "util"}, "id": 10
+    })
+    [definition] = response.json()["result"]
+    assert definition["qualified_name"] == "lib.util" and definition["path"].endswith("lib.py")
+    response = await async_client.post("/jsonrpc/", json={
+        "jsonrpc": "2.0", "method": "find_callers", "params": {"root": root, "qualified_name": "lib.util"}, "id": 11
+    })
+    assert [(c["caller"], c["lineno"]) for c in response.json()["result"]] == [("use.run", 3)]
+
+def test_refresh_paths_warms_cache_and_index(tmp_path):
+    from hoh_parser.api.jsonrpc import parse_cache, refresh_paths, symbol_indexes
+    from hoh_parser.core.symbols import SymbolIndex
+    root = str(tmp_path)
+    path = tmp_path / "mod.py"
+    path.write_text("def old():\n    pass\n")
+    symbol_indexes[root] = SymbolIndex.build(root, workers=1)
+    try:
+        path.write_text("def new():\n    pass\n")
+        refresh_paths([str(path)], [])
+        hits = parse_cache.hits
+        assert parse_cache.parse_file(str(path)).functions[0].name == "new"
+        assert parse_cache.hits == hits + 1
+        assert [d.qualified_name for d in symbol_indexes[root].find_definition("new")] == ["mod.new"]
+        refresh_paths([], [str(path)])
+        assert symbol_indexes[root].find_definition("new") == []
+    finally:
+        del symbol_indexes[root]
+
+def test_refresh_paths_matches_however_the_root_was_spelled(tmp_path):
+    from hoh_parser.api.jsonrpc import _index_directory, refresh_paths, symbol_indexes
+    real = tmp_path / "src"
+    real.mkdir()
+    (tmp_path / "link").symlink_to(real)
+    path = real / "mod.py"
+    path.write_text("def old():\n    pass\n")
+    _index_directory(os.path.join(str(tmp_path), "link", ""), workers=1)
+    try:
+        assert str(real) in symbol_indexes
+        assert not any(root.endswith("link") or root.endswith("/") for root in symbol_indexes)
+        path.write_text("def new():\n    pass\n")
+        refresh_paths([str(path)], [])
+        assert [d.qualified_name for d in symbol_indexes[str(real)].find_definition("new")] == ["mod.new"]
+    finally:
+        symbol_indexes.pop(str(real), None)
+
+@pytest.mark.asyncio
+async def test_configure_profiling(async_client, tmp_path, monkeypatch):
+    from hoh_parser.api import jsonrpc
+    settings = jsonrpc.settings  # test_config may have re-imported hoh_parser.config
+    monkeypatch.setattr(settings, "profile_every", 0)
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    elsewhere = tmp_path / "elsewhere"
+    payload = {"jsonrpc": "2.0", "method": "configure_profiling", "params": {"every": 1, "directory": str(elsewhere)}, "id": 1}
+    await async_client.post("/jsonrpc/", json=payload)
+    # The output directory is the server's to choose.
+    assert settings.profile_dir == str(tmp_path)
+    payload["params"] = {"every": 1}
+    response = await async_client.post("/jsonrpc/", json=payload)
+    assert response.json()["result"]["every"] == 1
+    try:
+        await jsonrpc.symbol_table(__file__)
+        assert len(list(tmp_path.glob("_symbol_table-*.prof"))) == 1
+        assert not elsewhere.exists()
+    finally:
+        jsonrpc.profiler.configure(0)
+
+@pytest.mark.asyncio
+async def test_symbol_table_compact_format(async_client, tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text("def bar(y):\n    return len(y)\n")
+    payload = {"jsonrpc": "2.0", "method": "symbol_table", "params": {"filepath": str(path), "format": "compact"}, "id": 1}
+    result = (await async_client.post("/jsonrpc/", json=payload)).json()["result"]
+    assert result["format"] == "compact"
+    assert [f["name"] for f in result["functions"]] == ["bar"]
+    _, target, type = result["relationships"][:3]
+    assert (result["strings"][target], result["types"][type]) == ("len", "calls")
+
+@pytest.mark.asyncio
+async def test_parse_file_with_selection(async_client):
+    code = b"class A(B):\n    def m(self):\n        return len(self)\n"
+    params = {
+        "filename": "sel.py",
+        "content_b64": base64.b64encode(code).decode(),
+        "selection": {"relationship_types": ["inherits"]},
+    }
+    payload = {"jsonrpc": "2.0", "method": "parse_file", "params": params, "id": 1}
+    result = (await async_client.post("/jsonrpc/", json=payload)).json()["result"]
+    assert [r["type"] for r in result["relationships"]] == ["inherits"]
+    assert result["classes"][0]["methods"][0]["name"] == "m"
+    params["selection"] = {"symbol": "A.missing"}
+    error = (await async_client.post("/jsonrpc/", json=payload)).json()["error"]
+    assert error["code"] == -32602
+    assert "A.missing" in error["data"]["message"]
+
+@pytest.mark.asyncio
+async def test_graph_queries(async_client, tmp_path):
+    (tmp_path / "a.py").write_text("import b\ndef f():\n    b.g()\n")
+    (tmp_path / "b.py").write_text("import a\ndef g():\n    pass\ndef h():\n    a.f()\n")
+    root = str(tmp_path)
+    await async_client.post("/jsonrpc/", json={
+        "jsonrpc": "2.0", "method": "index_directory", "params": {"root": root, "workers": 1}, "id": 1
+    })
+    async def call(method, **params):
+        response = await async_client.post("/jsonrpc/", json={"jsonrpc": "2.0", "method": method, "params": params, "id": 2})
+        return response.json()["result"]
+    result = await call("graph_reachable", root=root, name="b.g", relationship_types=["calls"], reverse=True)
+    assert result["total"] == 2 and [n["name"] for n in result["nodes"]] == ["a.f", "b.h"]
+    assert await call("graph_cycles", root=root) == [["a", "b"]]
+    ranked = await call("graph_centrality", root=root, relationship_types=["calls"], kind="function", top=1)
+    assert ranked[0]["name"] == "b.g"
+    payload = {"jsonrpc": "2.0", "method": "graph_centrality", "params": {"root": root, "top": 0}, "id": 3}
+    assert (await async_client.post("/jsonrpc/", json=payload)).json()["error"]["code"] == -32602
+
+@pytest.mark.asyncio
+async def test_embed_directory_and_search(async_client, tmp_path, monkeypatch):
+    from hoh_parser.api import jsonrpc
+    monkeypatch.setattr(jsonrpc, "embedding_pipeline", None)
+    (tmp_path / "net.py").write_text("def download_file(url):\n    return http_get(url)\n")
+    (tmp_path / "db.py").write_text("class Database:\n    def run_query(self, sql):\n        pass\n")
+    async def call(rpc_method, **params):
+        response = await async_client.post("/jsonrpc/", json={"jsonrpc": "2.0", "method": rpc_method, "params": params, "id": 1})
+        return response.json()["result"]
+    counts = await call("embed_directory", root=str(tmp_path), workers=1)
+    assert (counts["symbols"], counts["encoded"]) == (3, 3)
+    assert (await call("embed_directory", root=str(tmp_path), workers=1))["unchanged"] == 3
+    [hit] = await call("search_similar", query="download a file from a url", top=1, method="exact")
+    assert hit["name"] == "download_file" and hit["path"].endswith("net.py")
+    payload = {"jsonrpc": "2.0", "method": "search_similar", "params": {"query": "file", "top": -1}, "id": 2}
+    assert (await async_client.post("/jsonrpc/", json=payload)).json()["error"]["code"] == -32602
+
+def test_refresh_paths_flushes_the_vector_store(tmp_path, monkeypatch):
+    from hoh_parser.api import jsonrpc
+    from hoh_parser.core.embeddings import EmbeddingPipeline, HashingEncoder
+    from hoh_parser.core.vector_store import VectorStore
+    encoder = HashingEncoder(dimension=32)
+    store_dir = str(tmp_path / "vectors")
+    pipeline = EmbeddingPipeline(encoder, VectorStore(encoder.dimension, store_dir, encoder.name))
+    monkeypatch.setattr(jsonrpc, "embedding_pipeline", pipeline)
+    path = tmp_path / "mod.py"
+    path.write_text("def old():\n    pass\n")
+    jsonrpc._embed_directory(str(tmp_path), workers=1)
+    path.write_text("def old():\n    pass\n\ndef new():\n    pass\n")
+    jsonrpc.refresh_paths([str(path)], [])
+    # What a restarted server would load, without a clean shutdown in between.
+    reopened = VectorStore(encoder.dimension, store_dir, encoder.name)
+    assert len(reopened) == 2
+    jsonrpc.refresh_paths([], [str(path)])
+    assert len(VectorStore(encoder.dimension, store_dir, encoder.name)) == 0
+
+@pytest.mark.asyncio
+async def test_get_symbol(async_client, tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text("class A:\n    def m(self):\n        '''Doc.'''\n        return len(self)\n")
+    params = {"filepath": str(path), "qualified_name": "A.m", "include_source": True}
+    payload = {"jsonrpc": "2.0", "method": "get_symbol", "params": params, "id": 1}
+    result = (await async_client.post("/jsonrpc/", json=payload)).json()["result"]
+    assert (result["parent"], result["docstring"], result["lineno"]) == ("A", "Doc.", 2)
+    assert result["source_code"].startswith("def m(self):")
+    assert [r["target"] for r in result["relationships"]] == ["len"]
+    params["qualified_name"] = "A.missing"
+    error = (await async_client.post("/jsonrpc/", json=payload)).json()["error"]
+    assert error["code"] == -32602 and error["message"] == "No such symbol"
+    assert error["data"] == {"qualified_name": "A.missing", "path": str(path)}
+
+@pytest.mark.asyncio
+async def test_reparse_file(async_client, tmp_path):
+    path = tmp_path / "mod.py"
+    lines = ["import os\n", "\n"] + [f"def f{i}():\n    return {i}\n\n" for i in range(20)]
+    path.write_text("".join(lines))
+    async def call(**params):
+        payload = {"jsonrpc": "2.0", "method": "reparse_file", "params": {"filepath": str(path), **params}, "id": 1}
+        return (await async_client.post("/jsonrpc/", json=payload)).json()["result"]
+    assert len((await call())["functions"]) == 20
+    lines[5] = "def f3():\n    x = len([])\n    return x\n\n"
+    path.write_text("".join(lines))
+    result = await call(start_line=12, end_line=13)
+    assert [r["target"] for r in result["relationships"] if r["type"] == "calls"] == ["len"]
+    assert result["functions"][4]["lineno"] == 16
+    result = await call(diff="@@ -1 +1 @@\n-import os\n+import sys\n")
+    assert result["relationships"][0]["target"] == "sys"
+    health = await async_client.post("/jsonrpc/", json={"jsonrpc": "2.0", "method": "health_check", "params": {}, "id": 2})
+    assert health.json()["result"]["incremental_cache"]["incremental"] >= 1
+
+@pytest.mark.asyncio
+async def test_reparse_file_invalid_line_range(async_client, tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text("import os\n\ndef f():\n    pass\n")
+    async def call(**params):
+        payload = {"jsonrpc": "2.0", "method": "reparse_file", "params": {"filepath": str(path), **params}, "id": 1}
+        return (await async_client.post("/jsonrpc/", json=payload)).json()
+    await call()
+    for start_line, end_line in [(0, 1), (4, 2), (3, 9)]:
+        error = (await call(start_line=start_line, end_line=end_line))["error"]
+        assert error["code"] == -32602 and error["message"] == "Invalid line range"
+        assert error["data"]["path"] == str(path)
+    assert (await call(start_line=4, end_line=4))["result"]["functions"][0]["name"] == "f"
+
+@pytest.mark.asyncio
+async def test_reparse_file_stale_diff(async_client, tmp_path):
+    path = tmp_path / "stale.py"
+    path.write_text("import os\n")
+    async def call(**params):
+        payload = {"jsonrpc": "2.0", "method": "reparse_file", "params": {"filepath": str(path), **params}, "id": 1}
+        return (await async_client.post("/jsonrpc/", json=payload)).json()
+    diff = "@@ -1 +1 @@\n-import json\n+import sys\n"
+    error = (await call(diff=diff))["error"]
+    assert error["code"] == -32002
+    assert error["data"]["path"] == str(path) and "no earlier parse" in error["data"]["reason"]
+    await call()
+    error = (await call(diff=diff))["error"]
+    assert error["code"] == -32002 and "does not apply at line 1" in error["data"]["reason"]
+    # The client's way out: a full reparse.
+    path.write_text("import sys\n")
+    assert (await call())["result"]["relationships"][0]["target"] == "sys"
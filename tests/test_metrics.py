@@ -0,0 +1,41 @@
+import os
+import pstats
+
+from hoh_parser.utils.metrics import Histogram, SamplingProfiler, render_metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test.", "stage", buckets=(0.01, 0.1))
+    for seconds in (0.001, 0.05, 0.05, 3.0):
+        histogram.observe("parse", seconds)
+    lines = histogram.render()
+    assert 'test_seconds_bucket{stage="parse",le="0.01"} 1' in lines
+    assert 'test_seconds_bucket{stage="parse",le="0.1"} 3' in lines
+    assert 'test_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="parse"} 4' in lines
+    assert histogram.snapshot()["parse"]["count"] == 4
+
+
+def test_histogram_time_records_block():
+    histogram = Histogram("test_seconds", "Test.", "stage")
+    with histogram.time("extract"):
+        pass
+    assert histogram.snapshot()["extract"]["count"] == 1
+
+
+def test_render_metrics_includes_gauges():
+    text = render_metrics({"hoh_cache_hits": 3})
+    assert "# TYPE hoh_stage_seconds histogram" in text
+    assert "hoh_cache_hits 3\n" in text
+
+
+def test_sampling_profiler_dumps_every_nth_call(tmp_path):
+    profiler = SamplingProfiler()
+    assert profiler.call("noop", sum, [1, 2]) == 3
+    profiler.configure(2, str(tmp_path))
+    results = [profiler.call("work", sorted, [3, 1, 2]) for _ in range(5)]
+    assert results == [[1, 2, 3]] * 5
+    dumps = sorted(os.listdir(tmp_path))
+    assert len(dumps) == 2 and all(name.startswith("work-") for name in dumps)
+    pstats.Stats(str(tmp_path / dumps[0]))
+    assert profiler.stats()["samples"] == 2
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from hoh_parser.core.outline import OutlineCache
+from hoh_parser.core.parser import parse_python_file
+
+
+SOURCE = '''"""Module."""
+import os
+
+class Base:
+    def run(self):
+        pass
+
+@decorate
+class Worker(Base):
+    """Does work."""
+    def run(self):
+        def helper():
+            return os.getcwd()
+        self.client = Client()
+        return helper()
+
+    @property
+    def name(self):
+        return "worker"
+
+def main():
+    Worker().run()
+'''
+
+
+@pytest.fixture
+def module(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text(SOURCE)
+    return str(path)
+
+
+def test_class_matches_full_parse(module):
+    symbol = OutlineCache().get_symbol(module, "Worker")
+    [full] = [c for c in parse_python_file(module).classes if c.name == "Worker"]
+    assert (symbol.kind, symbol.docstring, symbol.bases) == ("class", "Does work.", ["Base"])
+    assert symbol.members == full.methods
+    edges = {(r.source, r.target, r.type) for r in symbol.relationships}
+    assert {
+        ("Worker", "Base", "inherits"),
+        ("Worker", "name", "property"),
+        ("Worker", "Client", "composes"),
+        ("Worker.run", "Base.run", "overrides"),
+        (module, "getcwd", "calls"),
+    } <= edges
+    assert not any(r.target == "Worker" for r in symbol.relationships)  # main() is not extracted
+
+
+def test_method_with_source(module):
+    symbol = OutlineCache().get_symbol(module, "Worker.name", include_source=True)
+    assert (symbol.kind, symbol.parent, symbol.lineno) == ("function", "Worker", 18)
+    assert symbol.source_code == '@property\n    def name(self):\n        return "worker"'
+
+
+def test_lookups_reuse_the_tree_until_the_file_changes(module):
+    cache = OutlineCache()
+    first = cache.get_symbol(module, "main")
+    assert cache.get_symbol(module, "main") is first
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+    with open(module, "a") as f:
+        f.write("\ndef extra():\n    pass\n")
+    os.utime(module, ns=(0, os.stat(module).st_mtime_ns + 1))
+    assert cache.get_symbol(module, "extra").lineno == 24
+    assert cache.stats()["misses"] == 2
+
+
+def test_unknown_symbol(module):
+    with pytest.raises(ValueError, match="Worker.missing"):
+        OutlineCache().get_symbol(module, "Worker.missing")
@@ -234,3 +234,89 @@ class Foo:
     assert ("Foo", "x", "property_deleter") in rel_types
     assert ("Foo", "sm", "staticmethod") in rel_types
     assert ("Foo", "cm", "classmethod") in rel_types
+
+def test_override_with_base_defined_later(tmp_path) -> None:
+    """Override edges are resolved after the walk, so base order does not matter."""
+    code = '''
+class Child(Base):
+    def run(self): pass
+
+class Base:
+    def run(self): pass
+'''
+    test_file = tmp_path / "late_base.py"
+    test_file.write_text(code)
+    result = parse_python_file(str(test_file))
+    overrides = [rel for rel in result.relationships if rel.type == "overrides"]
+    assert [(rel.source, rel.target) for rel in overrides] == [("Child.run", "Base.run")]
+
+def test_symbol_table_scope_rules(tmp_path) -> None:
+    """Only direct definitions are listed; nested relationships are still found."""
+    code = '''
+import sys
+
+if sys.version_info > (3,):
+    class Conditional:
+        pass
+
+def factory():
+    class Local:
+        def __init__(self):
+            self.helper = Helper()
+    def inner():
+        pass
+    return Local
+
+class Outer:
+    def method(self):
+        def helper():
+            pass
+'''
+    test_file = tmp_path / "scopes.py"
+    test_file.write_text(code)
+    result = parse_python_file(str(test_file))
+    assert [cls.name for cls in result.classes] == ["Outer"]
+    assert [(f.name, f.parent) for f in result.functions] == [("factory", None), ("inner", None)]
+    assert [(m.name, m.parent) for m in result.classes[0].methods] == [("method", "Outer"), ("helper", "Outer")]
+    rel_types = {(r.source, r.target, r.type) for r in result.relationships}
+    assert ("Local", "Helper", "composes") in rel_types
+    assert (str(test_file), "sys", "imports") in rel_types
+
+def test_long_expression_chain(tmp_path) -> None:
+    # As deep as it is long: must not hit the recursion limit.
+    test_file = tmp_path / "chain.py"
+    test_file.write_text("x = " + " + ".join(["f()"] * 1500) + "\n")
+    result = parse_python_file(str(test_file))
+    assert sum(rel.type == "calls" for rel in result.relationships) == 1500
+    assert [rel.target for rel in result.relationships if rel.type == "assigns"] == ["x"]
+
+def test_parse_python_source_from_memory() -> None:
+    from hoh_parser.core.parser import parse_python_source
+    code = "def from_str():\n    pass\n"
+    from_str = parse_python_source(code, "mem.py")
+    from_bytes = parse_python_source(code.encode(), "mem.py")
+    assert from_str.model_dump() == from_bytes.model_dump()
+    assert from_str.path == "mem.py"
+    latin = parse_python_source("# coding: latin-1\nx = '\xe9'\n".encode("latin-1"), "latin.py")
+    assert any(rel.target == "x" for rel in latin.relationships)
+
+def test_parse_python_file_size_guard(tmp_path) -> None:
+    import pytest
+    from hoh_parser.utils.file_ops import FileTooLargeError
+    code = (
+        "import os\nclass Big:\n    def method(self):\n        pass\n\n"
+        "async def run():\n    os.getcwd()\n\ndef main():\n    pass\n"
+    )
+    test_file = tmp_path / "generated.py"
+    test_file.write_text(code)
+    with pytest.raises(FileTooLargeError):
+        parse_python_file(str(test_file), max_bytes=10)
+    outline = parse_python_file(str(test_file), max_bytes=10, oversize="outline")
+    assert [(c.name, c.lineno, c.methods) for c in outline.classes] == [("Big", 2, [])]
+    assert [(f.name, f.lineno) for f in outline.functions] == [("main", 9)]
+    assert outline.relationships == []
+    full = parse_python_file(str(test_file), max_bytes=None)
+    assert full.classes[0].methods[0].name == "method"
+    # The outline lists the same top-level names as a full parse, whatever the file's size.
+    assert [c.name for c in outline.classes] == [c.name for c in full.classes]
+    assert [f.name for f in outline.functions] == [f.name for f in full.functions if f.parent is None]
@@ -0,0 +1,157 @@
+import os
+from hoh_parser.core.symbols import SymbolIndex, collect_module_facts, module_name_for
+
+def _write(root, relpath: str, source: str) -> str:
+    path = os.path.join(root, relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(source)
+    return path
+
+def _make_project(root) -> None:
+    _write(root, "app/__init__.py", "from .models import Base\n")
+    _write(root, "app/models.py", (
+        "class Base:\n"
+        "    def save(self):\n"
+        "        self.validate()\n"
+        "    def validate(self):\n"
+        "        pass\n"
+    ))
+    _write(root, "app/services/__init__.py", "")
+    _write(root, "app/services/users.py", (
+        "from .. import Base\n"
+        "import app.models as m\n"
+        "class User(Base):\n"
+        "    def register(self):\n"
+        "        self.save()\n"
+        "def create():\n"
+        "    def helper():\n"
+        "        pass\n"
+        "    helper()\n"
+        "    u = User()\n"
+        "    m.Base.validate(u)\n"
+    ))
+    _write(root, "main.py", "from app.services.users import *\ncreate()\n")
+
+def test_module_name_for(tmp_path) -> None:
+    _make_project(str(tmp_path))
+    assert module_name_for(str(tmp_path / "app" / "services" / "users.py")) == ("app.services.users", False)
+    assert module_name_for(str(tmp_path / "app" / "__init__.py")) == ("app", True)
+    assert module_name_for(str(tmp_path / "main.py")) == ("main", False)
+
+def test_facts_resolve_relative_imports(tmp_path) -> None:
+    _make_project(str(tmp_path))
+    facts = collect_module_facts(str(tmp_path / "app" / "services" / "users.py"))
+    assert facts.imports == {"Base": "app.Base", "m": "app.models"}
+    assert ("User", "Base") in facts.bases
+    assert ("create.helper", "function", 7, 8) in facts.definitions
+
+def test_find_definition_and_callers(tmp_path) -> None:
+    _make_project(str(tmp_path))
+    index = SymbolIndex.build(str(tmp_path), workers=1)
+    [user] = index.find_definition("User")
+    assert user.qualified_name == "app.services.users.User"
+    # Base is re-exported by the package __init__; the base still resolves to its definition.
+    assert user.bases == ["app.models.Base"]
+    assert [d.kind for d in index.find_definition("app.models.Base.save")] == ["method"]
+
+    # self.save() on a subclass resolves through the inherited base.
+    assert [c.caller for c in index.find_callers("app.models.Base.save")] == ["app.services.users.User.register"]
+    assert [c.caller for c in index.find_callers("app.models.Base.validate")] == [
+        "app.models.Base.save", "app.services.users.create"
+    ]
+    assert [c.caller for c in index.find_callers("app.services.users.create.helper")] == ["app.services.users.create"]
+    # Star import from another module.
+    assert [(c.caller, c.lineno) for c in index.find_callers("app.services.users.create")] == [("main", 2)]
+
+def test_build_skips_unparsable_modules(tmp_path) -> None:
+    _make_project(str(tmp_path))
+    _write(str(tmp_path), "deep.py", "x = " + "a." * 100000 + "b\n")
+    index = SymbolIndex.build(str(tmp_path), workers=1)
+    assert [d.qualified_name for d in index.find_definition("User")] == ["app.services.users.User"]
+    assert "deep.py" not in [os.path.basename(d.path) for d in index.find_definition("x")]
+
+def test_build_follows_discovery_rules(tmp_path) -> None:
+    _make_project(str(tmp_path))
+    _write(str(tmp_path), ".gitignore", "scratch/\n")
+    _write(str(tmp_path), "scratch/tmp.py", "def scratch():\n    pass\n")
+    _write(str(tmp_path), "build/lib/app/models.py", "class Stale:\n    pass\n")
+    index = SymbolIndex.build(str(tmp_path), workers=1)
+    assert index.find_definition("scratch") == [] and index.find_definition("Stale") == []
+    assert len(index) == 5
+    only = SymbolIndex.build(str(tmp_path), workers=1, paths=[str(tmp_path / "scratch" / "tmp.py")])
+    assert [d.qualified_name for d in only.find_definition("scratch")] == ["tmp.scratch"]
+
+def test_name_defined_twice_is_found_once(tmp_path) -> None:
+    _write(str(tmp_path), "compat.py", (
+        "try:\n"
+        "    from fast import loads\n"
+        "except ImportError:\n"
+        "    def loads(s):\n"
+        "        pass\n"
+        "if True:\n"
+        "    def loads(s):\n"
+        "        pass\n"
+    ))
+    index = SymbolIndex.build(str(tmp_path), workers=1)
+    assert [(d.qualified_name, d.lineno) for d in index.find_definition("loads")] == [("compat.loads", 7)]
+    index.add(collect_module_facts(str(tmp_path / "compat.py")))
+    assert len(index.find_definition("loads")) == 1
+
+def test_index_update_and_remove(tmp_path) -> None:
+    _make_project(str(tmp_path))
+    index = SymbolIndex.build(str(tmp_path), workers=1)
+    users = str(tmp_path / "app" / "services" / "users.py")
+    index.remove_path(users)
+    assert index.find_definition("User") == []
+    assert index.find_callers("app.models.Base.save") == []
+    index.add(collect_module_facts(users))
+    assert len(index.find_definition("User")) == 1
+
+def _snapshot(index: SymbolIndex) -> tuple:
+    return sorted(index.graph_edges()), index.stats()["resolved_calls"], index.stats()["unresolved_calls"]
+
+def test_refresh_resolves_only_dependent_modules(tmp_path) -> None:
+    root = str(tmp_path)
+    _make_project(root)
+    _write(root, "other/__init__.py", "")
+    _write(root, "other/tools.py", "def tool():\n    pass\ntool()\n")
+    index = SymbolIndex.build(root, workers=1)
+    assert index.stats()["last_refresh_modules"] == 7
+
+    # users.py, main.py (star import) and the packages above users.py; not other/.
+    users = _write(root, "app/services/users.py", "from .. import Base\nclass User(Base):\n    def run(self):\n        self.save()\n")
+    index.add(collect_module_facts(users))
+    assert _snapshot(index) == _snapshot(SymbolIndex.build(root, workers=1))
+    assert index.stats()["last_refresh_modules"] == 4
+
+    # models.py is reached through the package __init__ by everything in app.
+    models = _write(root, "app/models.py", "class Base:\n    def keep(self):\n        pass\n")
+    index.add(collect_module_facts(models))
+    assert _snapshot(index) == _snapshot(SymbolIndex.build(root, workers=1))
+    assert index.stats()["last_refresh_modules"] == 5
+    assert index.find_definition("app.models.Base.save") == []
+
+    # A module that did not exist yet, imported before it appears.
+    _write(root, "main.py", "from app.extra import helper\nhelper()\n")
+    index.add(collect_module_facts(os.path.join(root, "main.py")))
+    assert index.find_callers("app.extra.helper") == []
+    extra = _write(root, "app/extra.py", "def helper():\n    pass\n")
+    index.add(collect_module_facts(extra))
+    assert [c.caller for c in index.find_callers("app.extra.helper")] == ["main"]
+    assert _snapshot(index) == _snapshot(SymbolIndex.build(root, workers=1))
+
+def test_same_module_name_in_two_directories(tmp_path, caplog) -> None:
+    first = _write(str(tmp_path), "scripts/util.py", "def from_scripts():\n    pass\n")
+    _write(str(tmp_path), "tools/util.py", "def from_tools():\n    pass\n")
+    index = SymbolIndex.build(str(tmp_path), workers=1)
+    assert "all map to module 'util'" in caplog.text
+    assert [d.path for d in index.find_definition("util.from_scripts")] == [first]
+    assert index.find_definition("util.from_tools") == []
+    assert index.stats()["shadowed_files"] == 1
+    # Re-adding either file keeps the choice; removing it exposes the other.
+    index.add(collect_module_facts(str(tmp_path / "tools" / "util.py")))
+    assert index.find_definition("util.from_tools") == []
+    index.remove_path(first)
+    assert len(index.find_definition("util.from_tools")) == 1
+    assert index.stats()["shadowed_files"] == 0
@@ -0,0 +1,103 @@
+import os
+import queue
+import pytest
+from hoh_parser.core.watch import FileWatcher, InotifyBackend
+
+def _inotify_available(tmp_path) -> bool:
+    try:
+        InotifyBackend([str(tmp_path)], ["*.py"]).close()
+        return True
+    except OSError:
+        return False
+
+def _next_batch(batches: "queue.Queue", timeout: float = 5.0):
+    return batches.get(timeout=timeout)
+
+@pytest.mark.parametrize("backend", ["inotify", "polling"])
+def test_watcher_debounces_and_coalesces(tmp_path, backend) -> None:
+    if backend == "inotify" and not _inotify_available(tmp_path):
+        pytest.skip("inotify not available")
+    (tmp_path / "existing.py").write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("")
+    batches: "queue.Queue" = queue.Queue()
+    watcher = FileWatcher(
+        [str(tmp_path)], lambda changed, deleted: batches.put((changed, deleted)),
+        debounce=0.3, max_delay=5.0, backend=backend, poll_interval=0.05
+    )
+    watcher.start()
+    try:
+        assert watcher.stats()["backend"] == backend
+        root = watcher.roots[0]
+        # Warm-up batch lists everything present at start.
+        assert _next_batch(batches) == ([os.path.join(root, "existing.py")], [])
+
+        # A burst of writes becomes a single batch.
+        for i in range(20):
+            (tmp_path / f"m{i % 4}.py").write_text(f"x = {i}\n")
+        (tmp_path / "notes.txt").write_text("ignored")
+        (tmp_path / "existing.py").unlink()
+        changed, deleted = _next_batch(batches)
+        assert changed == [os.path.join(root, f"m{i}.py") for i in range(4)]
+        assert deleted == [os.path.join(root, "existing.py")]
+
+        # Files in directories created after start are picked up.
+        os.makedirs(tmp_path / "pkg")
+        (tmp_path / "pkg" / "new.py").write_text("y = 2\n")
+        changed, deleted = _next_batch(batches)
+        assert changed == [os.path.join(root, "pkg", "new.py")] and deleted == []
+        assert batches.empty()
+    finally:
+        watcher.stop()
+    assert not watcher.stats()["running"]
+
+def test_max_delay_bounds_a_continuous_burst(tmp_path) -> None:
+    batches: "queue.Queue" = queue.Queue()
+    watcher = FileWatcher(
+        [str(tmp_path)], lambda changed, deleted: batches.put(changed),
+        debounce=10.0, max_delay=0.3, backend="polling", poll_interval=0.05, warm=False
+    )
+    watcher.start()
+    try:
+        (tmp_path / "a.py").write_text("a = 1\n")
+        assert _next_batch(batches, timeout=3.0) == [os.path.join(watcher.roots[0], "a.py")]
+    finally:
+        watcher.stop()
+
+@pytest.mark.parametrize("backend", ["inotify", "polling"])
+def test_watcher_skips_excluded_and_ignored_directories(tmp_path, backend) -> None:
+    if backend == "inotify" and not _inotify_available(tmp_path):
+        pytest.skip("inotify not available")
+    (tmp_path / ".gitignore").write_text("generated/\n")
+    os.makedirs(tmp_path / "vendor")
+    batches: "queue.Queue" = queue.Queue()
+    watcher = FileWatcher(
+        [str(tmp_path)], lambda changed, deleted: batches.put((changed, deleted)),
+        exclude=["vendor/"], debounce=0.3, backend=backend, poll_interval=0.05, warm=False
+    )
+    watcher.start()
+    try:
+        root = watcher.roots[0]
+        (tmp_path / "vendor" / "lib.py").write_text("x = 1\n")
+        os.makedirs(tmp_path / "generated" / "deep")
+        (tmp_path / "generated" / "deep" / "out.py").write_text("x = 1\n")
+        os.makedirs(tmp_path / "pkg" / "vendor")
+        (tmp_path / "pkg" / "vendor" / "lib.py").write_text("x = 1\n")
+        (tmp_path / "pkg" / "mod.py").write_text("x = 1\n")
+        assert _next_batch(batches) == ([os.path.join(root, "pkg", "mod.py")], [])
+    finally:
+        watcher.stop()
+
+def test_warm_batch_skipped_over_limit(tmp_path) -> None:
+    for i in range(3):
+        (tmp_path / f"m{i}.py").write_text("x = 1\n")
+    batches: "queue.Queue" = queue.Queue()
+    watcher = FileWatcher(
+        [str(tmp_path)], lambda changed, deleted: batches.put(changed),
+        debounce=0.1, backend="polling", poll_interval=0.05, warm_limit=2
+    )
+    watcher.start()
+    try:
+        (tmp_path / "m0.py").write_text("x = 2\n")
+        assert _next_batch(batches) == [os.path.join(watcher.roots[0], "m0.py")]
+    finally:
+        watcher.stop()
@@ -0,0 +1,35 @@
+import json
+
+from hoh_parser.core.models import MCPCompactFile
+from hoh_parser.core.parser import parse_python_source
+from hoh_parser.core.wire import dump_json, to_compact
+
+SOURCE = """import os
+
+class A(Base):
+    def run(self):
+        os.getcwd()
+        helper(os.getcwd())
+
+def helper(x):
+    return len(x)
+"""
+
+
+def test_compact_relationships_round_trip():
+    result = parse_python_source(SOURCE, "mod.py")
+    compact = to_compact(result)
+    assert len(compact.relationships) == 3 * len(result.relationships)
+    assert len(compact.strings) == len(set(compact.strings))
+    triples = zip(*[iter(compact.relationships)] * 3)
+    decoded = [(compact.strings[s], compact.strings[t], compact.types[k]) for s, t, k in triples]
+    assert decoded == [(r.source, r.target, r.type) for r in result.relationships]
+    assert compact.classes == result.classes and compact.functions == result.functions
+
+
+def test_dump_json_formats():
+    result = parse_python_source(SOURCE, "mod.py")
+    assert json.loads(dump_json(result)) == json.loads(result.model_dump_json())
+    compact = json.loads(dump_json(result, "compact"))
+    assert compact["format"] == "compact"
+    assert MCPCompactFile.model_validate(compact) == to_compact(result)
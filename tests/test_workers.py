@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from hoh_parser.core.directory import parse_directory
+from hoh_parser.core.workers import WorkerPool, current_rss
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(processes=2)
+    yield pool
+    pool.shutdown(wait=True)
+
+def _make_tree(root) -> None:
+    for i in range(6):
+        with open(os.path.join(root, f"m{i}.py"), "w") as f:
+            f.write(f"class C{i}:\n    def m(self):\n        return f{i}()\n")
+    with open(os.path.join(root, "broken.py"), "w") as f:
+        f.write("def broken(:\n")
+
+def test_current_rss() -> None:
+    assert current_rss() > 1024 * 1024
+
+def test_start_warms_every_worker(pool) -> None:
+    assert not pool.started
+    assert pool.start() > 0
+    stats = pool.stats()
+    assert stats["started"] and stats["workers"] == 2
+    assert stats["rss_bytes"] > 0 and stats["start_seconds"] is not None
+
+def test_parse_directory_on_pool(pool, tmp_path) -> None:
+    _make_tree(str(tmp_path))
+    serial = parse_directory(str(tmp_path), workers=1)
+    pool.start()
+    on_pool = parse_directory(str(tmp_path), chunksize=2, pool=pool)
+    assert on_pool.model_dump() == serial.model_dump()
+    # Once more on the same workers.
+    assert parse_directory(str(tmp_path), chunksize=2, pool=pool).model_dump() == serial.model_dump()
+    assert pool.stats()["generation"] == 1
+
+def test_recycled_after_max_tasks() -> None:
+    pool = WorkerPool(processes=1, max_tasks=2)
+    try:
+        pids = [pool.submit(os.getpid).result() for _ in range(5)]
+        assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+        assert pool.stats()["recycled"]["tasks"] == 2
+        assert pool.stats()["tasks"] == 5
+    finally:
+        pool.shutdown(wait=True)
+
+def test_recycled_over_rss() -> None:
+    pool = WorkerPool(processes=1, max_tasks=None, max_rss_bytes=1)
+    try:
+        first = pool.submit(os.getpid).result()
+        assert pool.submit(os.getpid).result() != first
+        assert pool.stats()["recycled"]["rss"] == 1
+    finally:
+        pool.shutdown(wait=True)
+
+def test_task_errors_propagate(pool) -> None:
+    with pytest.raises(FileNotFoundError):
+        pool.submit(os.stat, "/nonexistent/file.py").result()
+    assert pool.submit(os.getpid).result() != os.getpid()